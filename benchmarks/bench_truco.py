@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+import platform
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+from benchmarks.synthetic import SCALES, build_synthetic_database
+from src.play_game_info import get_active_matches, get_round_info
+from src.truco import TrucoGame
+from src.win_probability import build_win_probability_table, lookup_win_probability
+
+BASELINE_PATH = os.path.join(os.path.dirname(__file__), "baseline.json")
+# Un resultado es regresión si su mediana supera a la del baseline por este factor
+REGRESSION_THRESHOLD = 1.25
+
+
+def _measure(fn, repeat: int) -> dict:
+    """Ejecutar fn varias veces y devolver estadísticas en milisegundos"""
+    fn()  # calentamiento (caché de páginas y sentencias preparadas)
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    timings.sort()
+    return {
+        "median_ms": statistics.median(timings),
+        "min_ms": timings[0],
+        "p95_ms": timings[min(len(timings) - 1, int(len(timings) * 0.95))],
+        "runs": repeat,
+    }
+
+
+def _pick_matches(game: TrucoGame) -> dict:
+    """Elegir partidas representativas de la base sintética"""
+    cursor = game.conn.cursor()
+    picks = {}
+    cursor.execute(
+        """
+        SELECT m.id FROM matches m
+        WHERE m.players_count = 6
+          AND EXISTS (SELECT 1 FROM rounds r WHERE r.match_id = m.id AND r.round_type = 'pica-pica')
+        ORDER BY m.id DESC LIMIT 1
+    """
+    )
+    picks["pica_pica"] = cursor.fetchone()[0]
+    cursor.execute(
+        """
+        SELECT m.id FROM matches m
+        WHERE m.status = 'en_progreso' AND m.players_count = 6
+        ORDER BY m.id DESC LIMIT 1
+    """
+    )
+    row = cursor.fetchone()
+    picks["active"] = row[0] if row else picks["pica_pica"]
+    cursor.execute(
+        "SELECT team_id FROM match_teams WHERE match_id = ? ORDER BY team_id",
+        (picks["pica_pica"],),
+    )
+    team_id = cursor.fetchone()[0]
+    cursor.execute("SELECT player_id FROM team_members WHERE team_id = ?", (team_id,))
+    picks["team_players"] = [row[0] for row in cursor.fetchall()]
+    return picks
+
+
+def simulate_play_rerun(game: TrucoGame, match_id: int, table) -> None:
+    """Reproducir las consultas de una ejecución de la pestaña 'Jugar Partida'"""
+    get_active_matches(game)
+    team_scores = game.get_team_scores(match_id)
+    players = game.get_match_players(match_id)
+    teams_with_names = game.get_match_teams_with_players(match_id)
+    game.get_match_teams_with_player_ids(match_id)
+    match_info = game.get_match_info(match_id)
+    round_type, _, _ = get_round_info(game, match_id, players, match_info)
+    lookup_win_probability(
+        table,
+        team_scores,
+        round_type,
+        match_info["players_count"],
+        match_info["pica_pica_end_points"],
+        bool(match_info["pica_pica_enabled"]),
+    )
+    game.is_match_finished(match_id)
+
+    # Historial de rondas
+    rounds = game.get_match_rounds(match_id)
+    game.get_match_teams_with_players(match_id)
+    for round_data in rounds:
+        game.format_round_summary(round_data)
+    assert teams_with_names
+
+
+def run_scale(scale: str, workdir: str, repeat: int) -> dict:
+    """Construir la base de una escala y medir cada operación"""
+    users, matches = SCALES[scale]
+    path = os.path.join(workdir, f"bench_{scale}.db")
+    build_start = time.perf_counter()
+    build_synthetic_database(path, users, matches)
+    build_seconds = time.perf_counter() - build_start
+
+    game = TrucoGame(path)
+    picks = _pick_matches(game)
+    table = build_win_probability_table(game, os.path.join(workdir, f"win_{scale}.npy"))
+    match_id = picks["pica_pica"]
+
+    def round_history():
+        for round_data in game.get_match_rounds(match_id):
+            game.format_round_summary(round_data)
+
+    # add_pica_pica_score escribe: cada medición agrega una fila a una ronda propia
+    cursor = game.conn.cursor()
+    cursor.execute(
+        """
+        INSERT INTO rounds (match_id, round_number, round_type, dealer_position)
+        VALUES (?, 999, 'pica-pica', 0)
+    """,
+        (picks["active"],),
+    )
+    bench_round_id = cursor.lastrowid
+    game.conn.commit()
+    cursor.execute(
+        "SELECT player_id FROM player_positions WHERE match_id = ? ORDER BY position",
+        (picks["active"],),
+    )
+    seat_players = [row[0] for row in cursor.fetchall()]
+
+    def add_pica_pica_score():
+        game.add_pica_pica_score(bench_round_id, seat_players[1], 0, None, 0, 1)
+
+    operations = {
+        "get_team_scores": lambda: game.get_team_scores(match_id),
+        "get_match_rounds+format_round_summary": round_history,
+        "determine_round_type": lambda: game.determine_round_type(match_id),
+        "find_existing_team": lambda: game.find_existing_team(picks["team_players"]),
+        "add_pica_pica_score": add_pica_pica_score,
+        "play_rerun": lambda: simulate_play_rerun(game, match_id, table),
+    }
+
+    results = {
+        name: _measure(fn, repeat) for name, fn in operations.items()
+    }
+    game.delete_round(bench_round_id)
+    game.conn.close()
+
+    return {
+        "users": users,
+        "matches": matches,
+        "build_seconds": build_seconds,
+        "operations": results,
+    }
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Comparar medianas contra el baseline; devuelve las regresiones encontradas"""
+    regressions = []
+    for scale, scale_results in results["scales"].items():
+        base_scale = baseline.get("scales", {}).get(scale)
+        if not base_scale:
+            continue
+        for name, stats in scale_results["operations"].items():
+            base_stats = base_scale["operations"].get(name)
+            if not base_stats:
+                continue
+            ratio = stats["median_ms"] / max(base_stats["median_ms"], 1e-6)
+            stats["baseline_median_ms"] = base_stats["median_ms"]
+            stats["ratio"] = ratio
+            flag = "REGRESIÓN" if ratio > threshold else ""
+            print(
+                f"{scale:>7} {name:<40} {stats['median_ms']:9.3f} ms "
+                f"(baseline {base_stats['median_ms']:9.3f} ms, x{ratio:.2f}) {flag}"
+            )
+            if ratio > threshold:
+                regressions.append((scale, name, ratio))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmarks de TrucoGame")
+    parser.add_argument("--scales", nargs="+", default=list(SCALES), choices=list(SCALES))
+    parser.add_argument("--repeat", type=int, default=30)
+    parser.add_argument("--output", default="bench_results.json")
+    parser.add_argument("--baseline", default=BASELINE_PATH)
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    args = parser.parse_args()
+
+    results = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "sqlite": sqlite3.sqlite_version,
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "scales": {},
+    }
+
+    with tempfile.TemporaryDirectory() as workdir:
+        for scale in args.scales:
+            print(f"Escala {scale}...")
+            results["scales"][scale] = run_scale(scale, workdir, args.repeat)
+            for name, stats in results["scales"][scale]["operations"].items():
+                print(f"  {name:<40} {stats['median_ms']:9.3f} ms")
+
+    regressions = []
+    if os.path.exists(args.baseline) and not args.save_baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        print(f"\nComparación contra {args.baseline}:")
+        regressions = compare(results, baseline, args.threshold)
+
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResultados guardados en {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"Baseline guardado en {args.baseline}")
+
+    if regressions:
+        print(f"{len(regressions)} regresiones por encima de x{args.threshold}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,291 @@
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import sqlite3
+import statistics
+import tempfile
+import time
+from collections import defaultdict
+
+from src.db_connection import init_database
+from src.truco import TrucoGame
+
+JOURNAL_MODES = ("delete", "wal")
+SYNCHRONOUS_MODES = ("full", "normal")
+BUSY_TIMEOUTS_MS = (0, 5_000)
+PLAYERS = 60
+# Probabilidad de que un anotador borre la ronda que acaba de cargar
+DELETE_ROUND_PROBABILITY = 0.05
+# Espera antes de reintentar tras un error de bloqueo, como haría una tablet
+LOCK_RETRY_SECONDS = 0.01
+
+
+def _is_lock_error(error: sqlite3.OperationalError) -> bool:
+    """Indicar si el error se debe a que la base estaba bloqueada"""
+    message = str(error).lower()
+    return "locked" in message or "busy" in message
+
+
+class _Recorder:
+    """Acumula latencias y errores de bloqueo por operación"""
+
+    def __init__(self, game: TrucoGame):
+        self.game = game
+        self.latencies = defaultdict(list)
+        self.lock_errors = defaultdict(int)
+
+    def call(self, operation: str, fn, *args):
+        start = time.perf_counter()
+        try:
+            result = fn(*args)
+        except sqlite3.OperationalError as error:
+            if not _is_lock_error(error):
+                raise
+            # Descartar lo que haya quedado a medias antes de seguir jugando
+            self.game.conn.rollback()
+            self.lock_errors[operation] += 1
+            time.sleep(LOCK_RETRY_SECONDS)
+            return None
+        self.latencies[operation].append((time.perf_counter() - start) * 1000)
+        return result
+
+
+def _play_round(game: TrucoGame, recorder: _Recorder, rng: random.Random, match: dict) -> bool:
+    """Cargar una ronda completa; devuelve False si la partida terminó"""
+    match_id = match["id"]
+    round_type = recorder.call("determine_round_type", game.determine_round_type, match_id)
+    if round_type is None:
+        return True
+
+    dealer_position = match["rounds"] % match["players_count"]
+    round_id = recorder.call("add_round", game.add_round, match_id, round_type, dealer_position)
+    if round_id is None:
+        return True
+    match["rounds"] += 1
+
+    if round_type == "pica-pica":
+        players_count = match["players_count"]
+        for sub_round in range(1, players_count // 2 + 1):
+            position = (dealer_position + sub_round) % players_count
+            duel = [
+                match["seats"][position],
+                match["seats"][(position + players_count // 2) % players_count],
+            ]
+            envido = rng.random() < 0.5
+            recorder.call(
+                "add_pica_pica_score",
+                game.add_pica_pica_score,
+                round_id,
+                rng.choice(duel),
+                rng.choice([1, 1, 2, 3]),
+                rng.choice(duel) if envido else None,
+                rng.choice([2, 2, 4, 5]) if envido else 0,
+                sub_round,
+            )
+    else:
+        envido = rng.random() < 0.5
+        recorder.call(
+            "add_redondo_score",
+            game.add_redondo_score,
+            round_id,
+            rng.choice(match["team_ids"]),
+            rng.choice([1, 1, 2, 3]),
+            rng.choice(match["team_ids"]) if envido else None,
+            rng.choice([2, 2, 4, 5]) if envido else 0,
+        )
+
+    if rng.random() < DELETE_ROUND_PROBABILITY:
+        recorder.call("delete_round", game.delete_round, round_id)
+        match["rounds"] -= 1
+
+    finished = recorder.call("is_match_finished", game.is_match_finished, match_id)
+    if finished:
+        recorder.call("finish_match", game.finish_match, match_id)
+        return False
+    return True
+
+
+def _new_match(game: TrucoGame, recorder: _Recorder, rng: random.Random, player_ids: list):
+    """Crear una partida de 2, 4 o 6 jugadores como lo hace la pestaña 'Nueva Partida'"""
+    players_count = rng.choice((2, 4, 6))
+    players = rng.sample(player_ids, players_count)
+    per_team = players_count // 2
+    team1, team2 = sorted(players[:per_team]), sorted(players[per_team:])
+
+    team_ids = []
+    for members in (team1, team2):
+        team_id = recorder.call(
+            "get_or_create_team",
+            game.get_or_create_team,
+            f"Equipo {'-'.join(map(str, members))}",
+            members,
+        )
+        if team_id is None:
+            return None
+        team_ids.append(team_id)
+
+    # Posiciones alternadas, igual que arrange_player_positions
+    seats = [player for pair in zip(team1, team2) for player in pair]
+    match_id = recorder.call(
+        "create_match",
+        game.create_match,
+        players_count,
+        rng.choice((20, 25, 30)) if players_count == 6 else 30,
+        seats,
+        seats[0],
+        team_ids,
+    )
+    if match_id is None:
+        return None
+    return {
+        "id": match_id,
+        "players_count": players_count,
+        "seats": seats,
+        "team_ids": team_ids,
+        "rounds": 0,
+    }
+
+
+def run_worker(worker_id: int, db_path: str, settings: dict, duration: float, seed: int) -> dict:
+    """Jugar partidas durante `duration` segundos y devolver las mediciones del proceso"""
+    rng = random.Random(seed * 1_000 + worker_id)
+    game = TrucoGame(db_path)
+    game.conn.execute(f"PRAGMA synchronous = {settings['synchronous']}")
+    player_ids = [row[0] for row in game.conn.execute("SELECT id FROM users")]
+    # El timeout configurado se aplica recién a las operaciones medidas
+    game.conn.execute(f"PRAGMA busy_timeout = {int(settings['busy_timeout_ms'])}")
+    recorder = _Recorder(game)
+
+    match = None
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        if match is None:
+            match = _new_match(game, recorder, rng, player_ids)
+            continue
+        if not _play_round(game, recorder, rng, match):
+            match = None
+
+    game.conn.close()
+    return {"latencies": dict(recorder.latencies), "lock_errors": dict(recorder.lock_errors)}
+
+
+def _prepare_database(db_path: str, journal_mode: str):
+    """Crear la base con jugadores y fijar el modo de journal (persistente en WAL)"""
+    init_database(db_path)
+    conn = sqlite3.connect(db_path)
+    conn.execute(f"PRAGMA journal_mode = {journal_mode}")
+    conn.executemany(
+        "INSERT OR IGNORE INTO users (nickname) VALUES (?)",
+        [(f"carga{i:03d}",) for i in range(PLAYERS)],
+    )
+    conn.commit()
+    conn.close()
+
+
+def _percentiles(values: list) -> dict:
+    """Calcular p50/p95/p99 en milisegundos"""
+    if len(values) < 2:
+        value = values[0] if values else 0.0
+        return {"p50_ms": value, "p95_ms": value, "p99_ms": value}
+    cuts = statistics.quantiles(values, n=100, method="inclusive")
+    return {"p50_ms": cuts[49], "p95_ms": cuts[94], "p99_ms": cuts[98]}
+
+
+def run_configuration(workdir: str, workers: int, duration: float, settings: dict, seed: int) -> dict:
+    """Ejecutar N procesos anotadores contra una misma base con una configuración"""
+    db_path = os.path.join(
+        workdir,
+        "carga_{workers}_{journal_mode}_{synchronous}_{busy_timeout_ms}.db".format(
+            workers=workers, **settings
+        ),
+    )
+    _prepare_database(db_path, settings["journal_mode"])
+
+    start = time.perf_counter()
+    with multiprocessing.Pool(workers) as pool:
+        results = pool.starmap(
+            run_worker,
+            [(worker_id, db_path, settings, duration, seed) for worker_id in range(workers)],
+        )
+    elapsed = time.perf_counter() - start
+
+    latencies = defaultdict(list)
+    lock_errors = defaultdict(int)
+    for result in results:
+        for operation, values in result["latencies"].items():
+            latencies[operation].extend(values)
+        for operation, count in result["lock_errors"].items():
+            lock_errors[operation] += count
+
+    total_ops = sum(len(values) for values in latencies.values())
+    operations = {}
+    for operation in sorted(set(latencies) | set(lock_errors)):
+        values = latencies.get(operation, [])
+        operations[operation] = {
+            "count": len(values),
+            "lock_errors": lock_errors.get(operation, 0),
+            **_percentiles(values),
+        }
+
+    return {
+        **settings,
+        "workers": workers,
+        "elapsed_seconds": elapsed,
+        "throughput_ops": total_ops / elapsed,
+        "lock_errors": sum(lock_errors.values()),
+        "operations": operations,
+    }
+
+
+def _print_result(result: dict):
+    print(
+        f"\njournal={result['journal_mode']} synchronous={result['synchronous']} "
+        f"busy_timeout={result['busy_timeout_ms']}ms workers={result['workers']}: "
+        f"{result['throughput_ops']:.0f} ops/s, {result['lock_errors']} errores de bloqueo"
+    )
+    for operation, stats in result["operations"].items():
+        print(
+            f"  {operation:<22} n={stats['count']:<6} "
+            f"p50={stats['p50_ms']:8.2f} p95={stats['p95_ms']:8.2f} "
+            f"p99={stats['p99_ms']:8.2f} ms  bloqueos={stats['lock_errors']}"
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Generador de carga con varios procesos anotando partidas a la vez"
+    )
+    parser.add_argument("--workers", type=int, nargs="+", default=[4])
+    parser.add_argument("--duration", type=float, default=10.0, help="segundos por configuración")
+    parser.add_argument("--journal-modes", nargs="+", default=list(JOURNAL_MODES), choices=JOURNAL_MODES)
+    parser.add_argument("--synchronous", nargs="+", default=["full"], choices=SYNCHRONOUS_MODES)
+    parser.add_argument("--busy-timeouts", type=int, nargs="+", default=list(BUSY_TIMEOUTS_MS))
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    results = []
+    with tempfile.TemporaryDirectory() as workdir:
+        for workers, journal_mode, synchronous, busy_timeout_ms in itertools.product(
+            args.workers, args.journal_modes, args.synchronous, args.busy_timeouts
+        ):
+            settings = {
+                "journal_mode": journal_mode,
+                "synchronous": synchronous,
+                "busy_timeout_ms": busy_timeout_ms,
+            }
+            result = run_configuration(workdir, workers, args.duration, settings, args.seed)
+            _print_result(result)
+            results.append(result)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResultados guardados en {args.output}")
+
+
+if __name__ == "__main__":
+    main()
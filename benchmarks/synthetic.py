@@ -0,0 +1,189 @@
+import random
+import sqlite3
+from datetime import datetime, timedelta
+
+from src.db_connection import init_database
+from src.truco import TrucoGame
+
+# Escalas de las bases sintéticas: (usuarios, partidas)
+SCALES = {
+    "small": (50, 200),
+    "medium": (500, 2_000),
+    "large": (2_000, 10_000),
+}
+PLAYER_COUNTS = (2, 4, 6)
+# Fracción de partidas que quedan en progreso
+ACTIVE_FRACTION = 0.05
+
+
+def _play_round(rng: random.Random, round_type: str, scores: list, players_count: int):
+    """Sortear los puntajes de una ronda; devuelve filas (ganador, puntos) por truco y envido"""
+    contests = players_count // 2 if round_type == "pica-pica" else 1
+    rows = []
+    for sub_round in range(contests):
+        truco_team = rng.randrange(2)
+        truco_points = min(rng.choice([1, 1, 2, 2, 3, 4]), 30 - scores[truco_team])
+        scores[truco_team] += truco_points
+
+        envido_team = None
+        envido_points = 0
+        if rng.random() < 0.5:
+            envido_team = rng.randrange(2)
+            envido_points = min(rng.choice([1, 2, 2, 4, 5, 7]), 30 - scores[envido_team])
+            scores[envido_team] += envido_points
+
+        rows.append((sub_round + 1, truco_team, truco_points, envido_team, envido_points))
+    return rows
+
+
+def build_synthetic_database(path: str, users: int, matches: int, seed: int = 0) -> str:
+    """Crear una base con usuarios, equipos, partidas, rondas y puntajes sintéticos"""
+    rng = random.Random(seed)
+    init_database(path)
+    conn = sqlite3.connect(path)
+    cursor = conn.cursor()
+
+    cursor.executemany(
+        "INSERT INTO users (nickname) VALUES (?)",
+        [(f"jugador{i:05d}",) for i in range(users)],
+    )
+    user_ids = [row[0] for row in cursor.execute("SELECT id FROM users")]
+
+    teams = {}
+    start = datetime.now() - timedelta(days=365)
+
+    for match_index in range(matches):
+        players_count = rng.choice(PLAYER_COUNTS)
+        per_team = players_count // 2
+        players = rng.sample(user_ids, players_count)
+        team_players = [sorted(players[:per_team]), sorted(players[per_team:])]
+        created_at = start + timedelta(minutes=50 * match_index)
+
+        team_ids = []
+        for members in team_players:
+            key = tuple(members)
+            if key not in teams:
+                cursor.execute("INSERT INTO teams (name) VALUES (?)", (f"Equipo {len(teams) + 1}",))
+                teams[key] = cursor.lastrowid
+                cursor.executemany(
+                    "INSERT INTO team_members (team_id, player_id) VALUES (?, ?)",
+                    [(teams[key], player_id) for player_id in members],
+                )
+            team_ids.append(teams[key])
+
+        pica_pica_end_points = rng.choice([20, 25]) if players_count == 6 else 30
+        cursor.execute(
+            """
+            INSERT INTO matches (name, created_at, players_count, pica_pica_end_points, starting_dealer_id)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (
+                f"sintetica-{match_index}",
+                created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                players_count,
+                pica_pica_end_points,
+                players[0],
+            ),
+        )
+        match_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO match_teams (match_id, team_id) VALUES (?, ?)",
+            [(match_id, team_id) for team_id in team_ids],
+        )
+
+        # Las posiciones alternan equipos, igual que arrange_player_positions
+        seats = [p for pair in zip(team_players[0], team_players[1]) for p in pair]
+        cursor.executemany(
+            "INSERT INTO player_positions (match_id, player_id, position) VALUES (?, ?, ?)",
+            [(match_id, player_id, position) for position, player_id in enumerate(seats)],
+        )
+
+        active = rng.random() < ACTIVE_FRACTION
+        target_rounds = rng.randint(1, 8) if active else None
+        scores = [0, 0]
+        round_type = "redondo"
+        round_number = 0
+
+        while max(scores) < 30 and (target_rounds is None or round_number < target_rounds):
+            round_number += 1
+            dealer_position = (round_number - 1) % players_count
+            round_time = created_at + timedelta(minutes=2 * round_number)
+            cursor.execute(
+                """
+                INSERT INTO rounds (match_id, round_number, round_type, dealer_position, created_at)
+                VALUES (?, ?, ?, ?, ?)
+            """,
+                (
+                    match_id,
+                    round_number,
+                    round_type,
+                    dealer_position,
+                    round_time.strftime("%Y-%m-%d %H:%M:%S"),
+                ),
+            )
+            round_id = cursor.lastrowid
+
+            rows = _play_round(rng, round_type, scores, players_count)
+            if round_type == "redondo":
+                _, truco_team, truco_points, envido_team, envido_points = rows[0]
+                cursor.execute(
+                    """
+                    INSERT INTO redondo_scores
+                    (round_id, truco_winner_team_id, truco_points, envido_winner_team_id, envido_points)
+                    VALUES (?, ?, ?, ?, ?)
+                """,
+                    (
+                        round_id,
+                        team_ids[truco_team],
+                        truco_points,
+                        team_ids[envido_team] if envido_team is not None else None,
+                        envido_points,
+                    ),
+                )
+            else:
+                # Cada sub-ronda enfrenta a dos jugadores sentados uno frente al otro
+                first_position = (dealer_position + 1) % players_count
+                for sub_round, truco_team, truco_points, envido_team, envido_points in rows:
+                    position = (first_position + sub_round - 1) % players_count
+                    duel = {
+                        position % 2: seats[position],
+                        (position + 3) % 2: seats[(position + 3) % players_count],
+                    }
+                    cursor.execute(
+                        """
+                        INSERT INTO pica_pica_scores
+                        (round_id, sub_round, truco_winner_id, truco_points, envido_winner_id, envido_points)
+                        VALUES (?, ?, ?, ?, ?, ?)
+                    """,
+                        (
+                            round_id,
+                            sub_round,
+                            duel[truco_team],
+                            truco_points,
+                            duel[envido_team] if envido_team is not None else None,
+                            envido_points,
+                        ),
+                    )
+
+            # Misma lógica que determine_round_type
+            top = max(scores)
+            if (
+                players_count == 6
+                and round_type == "redondo"
+                and 5 <= top < pica_pica_end_points
+            ):
+                round_type = "pica-pica"
+            else:
+                round_type = "redondo"
+
+        if max(scores) >= 30:
+            cursor.execute(
+                "UPDATE matches SET status = 'terminada' WHERE id = ?", (match_id,)
+            )
+
+    conn.commit()
+    conn.close()
+
+    # Resultados, historial y ranking derivados
+    TrucoGame(path).rebuild_match_results()
+    return path
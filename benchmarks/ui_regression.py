@@ -0,0 +1,156 @@
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+# La app lee estas variables al importarse: se fijan antes de importar src
+WORKDIR = tempfile.mkdtemp(prefix="truco-ui-")
+os.environ["TRUCO_DB_PATH"] = os.path.join(WORKDIR, "truco_game.db")
+os.environ["TRUCO_QUERY_STATS"] = "1"
+os.environ["TRUCO_SLOW_QUERY_LOG"] = os.path.join(WORKDIR, "slow_queries.log")
+
+from streamlit.testing.v1 import AppTest  # noqa: E402
+
+from src.db_connection import DB_PATH, init_database  # noqa: E402
+from src.instrumentation import get_query_totals  # noqa: E402
+from src.truco import TrucoGame  # noqa: E402
+from src.win_probability import build_win_probability_table  # noqa: E402
+
+APP_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "main.py")
+# Presupuesto por interacción: tiempo de la ejecución (ms) y cantidad de consultas SQL.
+# Enviar una ronda incluye la ejecución del envío y la de st.rerun()
+BUDGETS = {
+    "carga inicial": {"ms": 750, "queries": 75},
+    "enviar ronda redonda": {"ms": 1_000, "queries": 165},
+    "enviar ronda pica-pica": {"ms": 1_000, "queries": 195},
+}
+PLAYERS = ["Ana", "Beto", "Caro", "Dani", "Eli", "Fede"]
+
+
+def seed_database() -> dict:
+    """Crear una partida de 6 jugadores con una ronda redonda ya jugada"""
+    init_database(DB_PATH)
+    game = TrucoGame(DB_PATH)
+    for nickname in PLAYERS:
+        game.add_user(nickname)
+    ids = game.get_user_ids(PLAYERS)
+    team1 = [ids[name] for name in PLAYERS[0::2]]
+    team2 = [ids[name] for name in PLAYERS[1::2]]
+    team1_id = game.create_team("Rojos", team1)
+    team2_id = game.create_team("Azules", team2)
+    seats = [player for pair in zip(team1, team2) for player in pair]
+    match_id = game.create_match(6, 25, seats, seats[0], [team1_id, team2_id])
+
+    round_id = game.add_round(match_id, "redondo", 0)
+    game.add_redondo_score(round_id, team1_id, 2, None, 0)
+
+    # La tabla de probabilidades se genera en segundo plano; no es parte de la interacción
+    build_win_probability_table(game)
+    game.conn.close()
+    return {"match_id": match_id, "team1_id": team1_id, "team2_id": team2_id}
+
+
+def _count_rounds(match_id: int) -> int:
+    """Contar las rondas guardadas para verificar que el envío funcionó"""
+    game = TrucoGame(DB_PATH)
+    count = game.conn.execute(
+        "SELECT COUNT(*) FROM rounds WHERE match_id = ?", (match_id,)
+    ).fetchone()[0]
+    game.conn.close()
+    return count
+
+
+def _measure(name: str, at: AppTest, results: dict):
+    """Ejecutar la app una vez y registrar su tiempo y consultas"""
+    queries_start = get_query_totals()["count"]
+    start = time.perf_counter()
+    at.run()
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    if at.exception:
+        raise RuntimeError(f"{name}: {at.exception[0].value}")
+    results[name] = {
+        "ms": round(elapsed_ms, 1),
+        "queries": get_query_totals()["count"] - queries_start,
+    }
+
+
+def _submit(at: AppTest, label: str):
+    next(button for button in at.button if button.label == label).click()
+
+
+def run_flow(seed: dict) -> dict:
+    """Recorrer la pestaña 'Jugar Partida': cargar, enviar una redonda y una pica-pica"""
+    results = {}
+    match_id = seed["match_id"]
+
+    # Calentamiento: imports y cachés de Streamlit no cuentan
+    AppTest.from_file(APP_PATH, default_timeout=60).run()
+
+    at = AppTest.from_file(APP_PATH, default_timeout=60)
+    _measure("carga inicial", at, results)
+
+    rounds = _count_rounds(match_id)
+    at.radio(key="truco_team_toggle").set_value(seed["team1_id"])
+    at.radio(key="truco_points_input").set_value(3)
+    _submit(at, "Agregar Ronda Redonda")
+    _measure("enviar ronda redonda", at, results)
+    if _count_rounds(match_id) != rounds + 1:
+        raise RuntimeError("La ronda redonda no se guardó")
+
+    # Con 5 puntos la próxima ronda es pica-pica: tres enfrentamientos
+    rounds = _count_rounds(match_id)
+    for sub_round in range(3):
+        winner = at.radio(key=f"truco_winner_{sub_round}")
+        winner.set_value(winner.options[0] if sub_round % 2 else winner.options[1])
+    _submit(at, "Agregar Ronda Pica-Pica")
+    _measure("enviar ronda pica-pica", at, results)
+    if _count_rounds(match_id) != rounds + 1:
+        raise RuntimeError("La ronda pica-pica no se guardó")
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description="Recorrer la app sin navegador y controlar tiempos y consultas por interacción"
+    )
+    parser.add_argument(
+        "--time-factor",
+        type=float,
+        default=1.0,
+        help="multiplicar los presupuestos de tiempo (máquinas más lentas)",
+    )
+    parser.add_argument("--output", help="archivo JSON con los resultados")
+    args = parser.parse_args()
+
+    os.chdir(WORKDIR)
+    results = run_flow(seed_database())
+
+    failures = []
+    for name, measured in results.items():
+        budget = BUDGETS[name]
+        max_ms = budget["ms"] * args.time_factor
+        status = "ok"
+        if measured["ms"] > max_ms or measured["queries"] > budget["queries"]:
+            status = "EXCEDIDO"
+            failures.append(name)
+        print(
+            f"{name:<25} {measured['ms']:8.1f} ms (máx {max_ms:.0f})  "
+            f"{measured['queries']:4d} consultas (máx {budget['queries']})  {status}"
+        )
+
+    print(f"Base y log de consultas lentas en {WORKDIR}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"budgets": BUDGETS, "results": results}, f, indent=2)
+
+    if failures:
+        print(f"{len(failures)} interacciones superaron su presupuesto")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
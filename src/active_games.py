@@ -1,10 +1,14 @@
 import streamlit as st
+from src.models import Match
 from src.truco import TrucoGame
 
 
-def games_management(game: TrucoGame):
+def games_management(game: TrucoGame, reader: TrucoGame = None):
+    """Partidas en curso; las lecturas van a reader (la réplica) y las bajas a game"""
     st.header("🎮 Partidas Activas")
-    cursor = game.conn.cursor()
+    reader = reader or game
+    cursor = reader.conn.cursor()
+    cursor.row_factory = Match.row_factory()
     cursor.execute(
         """
         SELECT m.*, u.nickname as dealer_nickname
@@ -15,7 +19,7 @@ def games_management(game: TrucoGame):
     """
     )
 
-    matches = [dict(row) for row in cursor.fetchall()]
+    matches = cursor.fetchall()
 
     if matches:
         for match in matches:
@@ -38,8 +42,8 @@ def games_management(game: TrucoGame):
                     st.write(f"**Pie inicial:** {dealer}")
 
                 with col3:
-                    team_scores = game.get_team_scores(match["id"])
-                    teams = game.get_match_teams_with_players(match["id"])
+                    team_scores = reader.get_team_scores(match["id"])
+                    teams = reader.get_match_teams_with_players(match["id"])
 
                     if teams:
                         for team in teams:
@@ -50,14 +54,14 @@ def games_management(game: TrucoGame):
                         st.write("**Sin equipos asignados**")
 
                 # Mostrar jugadores por equipo
-                teams_with_players = game.get_match_teams_with_players(match["id"])
+                teams_with_players = reader.get_match_teams_with_players(match["id"])
                 if teams_with_players:
                     for team in teams_with_players:
                         player_names = ", ".join(team["player_names"])
                         st.write(f"**{team['name']}:** {player_names}")
                 else:
                     # Fallback: mostrar jugadores sin equipos
-                    players = game.get_match_players(match["id"])
+                    players = reader.get_match_players(match["id"])
                     player_names = [p["nickname"] for p in players]
                     players_text = ", ".join(player_names)
                     st.write(f"**Jugadores:** {players_text}")
@@ -0,0 +1,176 @@
+import argparse
+import os
+from datetime import datetime, timedelta, timezone
+
+from src.db_connection import ARCHIVE_DB_PATH, DB_PATH, init_database
+from src.truco import TrucoGame
+
+ARCHIVE_AFTER_DAYS = 30
+BATCH_SIZE = 100
+
+# Tablas que se mueven con cada partida, en orden de dependencias
+MATCH_TABLES = [
+    ("matches", "id IN (SELECT id FROM temp.archive_batch)"),
+    ("match_teams", "match_id IN (SELECT id FROM temp.archive_batch)"),
+    ("match_scores", "match_id IN (SELECT id FROM temp.archive_batch)"),
+    ("player_positions", "match_id IN (SELECT id FROM temp.archive_batch)"),
+    ("rounds", "match_id IN (SELECT id FROM temp.archive_batch)"),
+    ("round_checkpoints", "match_id IN (SELECT id FROM temp.archive_batch)"),
+    ("match_results", "match_id IN (SELECT id FROM temp.archive_batch)"),
+    (
+        "redondo_scores",
+        "round_id IN (SELECT id FROM main.rounds WHERE match_id IN "
+        "(SELECT id FROM temp.archive_batch))",
+    ),
+    (
+        "pica_pica_scores",
+        "round_id IN (SELECT id FROM main.rounds WHERE match_id IN "
+        "(SELECT id FROM temp.archive_batch))",
+    ),
+]
+
+# Tablas que sólo se borran: los envíos ya aplicados no se reintentan sobre el archivo
+DROPPED_TABLES = [
+    (
+        "applied_submissions",
+        "round_id IN (SELECT id FROM main.rounds WHERE match_id IN "
+        "(SELECT id FROM temp.archive_batch))",
+    ),
+]
+
+# Tablas de referencia que se copian (sin borrarlas) para que el archivo sea autónomo
+REFERENCE_TABLES = [
+    (
+        "teams",
+        "id IN (SELECT team_id FROM main.match_teams WHERE match_id IN "
+        "(SELECT id FROM temp.archive_batch))",
+    ),
+    (
+        "team_members",
+        "team_id IN (SELECT team_id FROM main.match_teams WHERE match_id IN "
+        "(SELECT id FROM temp.archive_batch))",
+    ),
+    (
+        "users",
+        "id IN (SELECT player_id FROM main.player_positions WHERE match_id IN "
+        "(SELECT id FROM temp.archive_batch))",
+    ),
+]
+
+
+def _select_batch(cursor, cutoff: str, batch_size: int) -> int:
+    """Cargar en una tabla temporal el próximo lote de partidas a archivar"""
+    cursor.execute("DELETE FROM temp.archive_batch")
+    # Una partida es vieja si su última ronda (o su creación) es anterior al corte
+    cursor.execute(
+        """
+        INSERT INTO temp.archive_batch (id)
+        SELECT m.id
+        FROM main.matches m
+        WHERE m.status = 'terminada'
+          -- Las partidas de torneos quedan: sus cruces y la tabla las siguen mostrando
+          AND NOT EXISTS (SELECT 1 FROM main.tournament_matches tm WHERE tm.match_id = m.id)
+          AND COALESCE(
+                (SELECT MAX(r.created_at) FROM main.rounds r WHERE r.match_id = m.id),
+                m.created_at
+              ) < ?
+        ORDER BY m.id
+        LIMIT ?
+    """,
+        (cutoff, batch_size),
+    )
+    return cursor.rowcount
+
+
+def archive_finished_matches(
+    game: TrucoGame,
+    archive_path: str = ARCHIVE_DB_PATH,
+    older_than_days: int = ARCHIVE_AFTER_DAYS,
+    batch_size: int = BATCH_SIZE,
+) -> int:
+    """Mover partidas terminadas viejas (con rondas, puntajes y posiciones) a la base de archivo.
+
+    El ranking y los historiales de la base principal siguen contando las partidas
+    archivadas; los del archivo cuentan sólo las suyas.
+    """
+    init_database(archive_path)
+    archive = TrucoGame(archive_path)
+    # created_at es CURRENT_TIMESTAMP de SQLite, que está en UTC
+    cutoff = (datetime.now(timezone.utc) - timedelta(days=older_than_days)).strftime(
+        "%Y-%m-%d %H:%M:%S"
+    )
+
+    conn = game.conn
+    # Registrar el archivo antes de mover nada: rebuild_match_results lo necesita
+    conn.execute(
+        "INSERT OR IGNORE INTO archive_databases (path) VALUES (?)",
+        (os.path.abspath(archive_path),),
+    )
+    conn.commit()
+    conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+    archived = 0
+
+    try:
+        cursor = conn.cursor()
+        cursor.execute(
+            "CREATE TEMP TABLE IF NOT EXISTS archive_batch (id INTEGER PRIMARY KEY)"
+        )
+
+        while True:
+            # Cada lote es una transacción corta para no bloquear a los anotadores
+            cursor.execute("BEGIN IMMEDIATE")
+            try:
+                moved = _select_batch(cursor, cutoff, batch_size)
+                if moved == 0:
+                    conn.rollback()
+                    break
+
+                for table, condition in REFERENCE_TABLES + MATCH_TABLES:
+                    cursor.execute(
+                        f"INSERT OR REPLACE INTO archive.{table} "
+                        f"SELECT * FROM main.{table} WHERE {condition}"
+                    )
+
+                # Borrar en orden inverso de dependencias
+                for table, condition in DROPPED_TABLES + list(reversed(MATCH_TABLES)):
+                    cursor.execute(f"DELETE FROM main.{table} WHERE {condition}")
+
+                cursor.execute("SELECT id FROM temp.archive_batch")
+                match_ids = [match_id for (match_id,) in cursor.fetchall()]
+                conn.commit()
+                archived += moved
+            except Exception:
+                conn.rollback()
+                raise
+
+            # Con el lote confirmado, el ranking del archivo suma sus resultados
+            archive.add_archived_results(match_ids)
+
+        cursor.execute("DROP TABLE IF EXISTS temp.archive_batch")
+    finally:
+        conn.execute("DETACH DATABASE archive")
+        archive.conn.close()
+
+    return archived
+
+
+def open_archive(archive_path: str = ARCHIVE_DB_PATH) -> TrucoGame:
+    """Abrir el archivo histórico en modo solo lectura con la misma API de consultas"""
+    return TrucoGame(archive_path, read_only=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Archivar partidas terminadas en una base separada"
+    )
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--archive", default=ARCHIVE_DB_PATH)
+    parser.add_argument("--days", type=int, default=ARCHIVE_AFTER_DAYS)
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    args = parser.parse_args()
+
+    init_database(args.db)
+    count = archive_finished_matches(
+        TrucoGame(args.db), args.archive, args.days, args.batch_size
+    )
+    print(f"Partidas archivadas: {count}")
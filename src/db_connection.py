@@ -1,12 +1,22 @@
-import sqlite3
+import os
+
+from src.instrumentation import connect
+
+# Rutas de las bases de datos (configurables por variables de entorno)
+DB_PATH = os.environ.get("TRUCO_DB_PATH", "truco_game.db")
+ARCHIVE_DB_PATH = os.environ.get("TRUCO_ARCHIVE_DB_PATH", "truco_archive.db")
 
 
 # Configuración de la base de datos
-def init_database():
+def init_database(db_path: str = DB_PATH):
     """Inicializar la base de datos SQLite con las tablas requeridas"""
-    conn = sqlite3.connect("truco_game.db")
+    conn = connect(db_path)
     cursor = conn.cursor()
 
+    # En bases nuevas permite liberar páginas de a poco (ver src/maintenance.py);
+    # en bases existentes no tiene efecto hasta un VACUUM
+    cursor.execute("PRAGMA auto_vacuum = INCREMENTAL")
+
     # Tabla de usuarios
     cursor.execute(
         """
@@ -71,6 +81,7 @@ def init_database():
             round_type TEXT,
             dealer_position INTEGER,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            summary TEXT,
             FOREIGN KEY (match_id) REFERENCES matches (id)
         )
     """
@@ -138,5 +149,251 @@ def init_database():
     """
     )
 
+    # Resultado de cada partida terminada (se completa al marcarla como terminada);
+    # la misma consulta trae las columnas de rounds como "rounds.<columna>"
+    cursor.execute(
+        """
+        SELECT name FROM sqlite_master WHERE type = 'table'
+        UNION ALL
+        SELECT 'rounds.' || name FROM pragma_table_info('rounds')
+    """
+    )
+    existing_tables = {row[0] for row in cursor.fetchall()}
+    needs_backfill = not {
+        "match_results",
+        "head_to_head",
+        "leaderboard_stats",
+        "match_scores",
+        "round_checkpoints",
+    }.issubset(existing_tables)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS match_results (
+            match_id INTEGER PRIMARY KEY,
+            players_count INTEGER NOT NULL,
+            winner_team_id INTEGER NOT NULL,
+            loser_team_id INTEGER NOT NULL,
+            winner_points INTEGER NOT NULL,
+            loser_points INTEGER NOT NULL,
+            finished_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (match_id) REFERENCES matches (id),
+            FOREIGN KEY (winner_team_id) REFERENCES teams (id),
+            FOREIGN KEY (loser_team_id) REFERENCES teams (id)
+        )
+    """
+    )
+
+    # Puntaje total de cada equipo en cada partida (se actualiza con cada puntaje)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS match_scores (
+            match_id INTEGER NOT NULL,
+            team_id INTEGER NOT NULL,
+            points INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (match_id, team_id),
+            FOREIGN KEY (match_id) REFERENCES matches (id),
+            FOREIGN KEY (team_id) REFERENCES teams (id)
+        ) WITHOUT ROWID
+    """
+    )
+
+    # Totales de cada equipo al terminar cada ronda (para ver la partida en cualquier ronda)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS round_checkpoints (
+            match_id INTEGER NOT NULL,
+            round_number INTEGER NOT NULL,
+            team_id INTEGER NOT NULL,
+            total INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (match_id, round_number, team_id),
+            FOREIGN KEY (match_id) REFERENCES matches (id),
+            FOREIGN KEY (team_id) REFERENCES teams (id)
+        ) WITHOUT ROWID
+    """
+    )
+
+    # Historial entre pares de equipos (partidas) y de jugadores (sub-rondas pica-pica)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS head_to_head (
+            kind TEXT NOT NULL,
+            low_id INTEGER NOT NULL,
+            high_id INTEGER NOT NULL,
+            low_wins INTEGER NOT NULL DEFAULT 0,
+            high_wins INTEGER NOT NULL DEFAULT 0,
+            draws INTEGER NOT NULL DEFAULT 0,
+            low_points INTEGER NOT NULL DEFAULT 0,
+            high_points INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, low_id, high_id)
+        ) WITHOUT ROWID
+    """
+    )
+
+    # Resumen materializado del ranking por entidad, modalidad y día
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS leaderboard_stats (
+            kind TEXT NOT NULL,
+            players_count INTEGER NOT NULL,
+            day TEXT NOT NULL,
+            entity_id INTEGER NOT NULL,
+            played INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            points_for INTEGER NOT NULL DEFAULT 0,
+            points_against INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (kind, players_count, day, entity_id)
+        ) WITHOUT ROWID
+    """
+    )
+
+    # Torneos: equipos inscriptos (con su tabla de posiciones acumulada) y cruces por ronda
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tournaments (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            name TEXT NOT NULL,
+            format TEXT NOT NULL,
+            players_count INTEGER NOT NULL,
+            pica_pica_end_points INTEGER NOT NULL,
+            rounds_count INTEGER NOT NULL,
+            current_round INTEGER NOT NULL DEFAULT 0,
+            status TEXT DEFAULT 'en_progreso',
+            winner_team_id INTEGER,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (winner_team_id) REFERENCES teams (id)
+        )
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tournament_teams (
+            tournament_id INTEGER NOT NULL,
+            team_id INTEGER NOT NULL,
+            seed INTEGER NOT NULL,
+            eliminated INTEGER NOT NULL DEFAULT 0,
+            played INTEGER NOT NULL DEFAULT 0,
+            wins INTEGER NOT NULL DEFAULT 0,
+            losses INTEGER NOT NULL DEFAULT 0,
+            byes INTEGER NOT NULL DEFAULT 0,
+            points_for INTEGER NOT NULL DEFAULT 0,
+            points_against INTEGER NOT NULL DEFAULT 0,
+            PRIMARY KEY (tournament_id, team_id),
+            FOREIGN KEY (tournament_id) REFERENCES tournaments (id),
+            FOREIGN KEY (team_id) REFERENCES teams (id)
+        ) WITHOUT ROWID
+    """
+    )
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tournament_matches (
+            tournament_id INTEGER NOT NULL,
+            round_number INTEGER NOT NULL,
+            slot INTEGER NOT NULL,
+            match_id INTEGER UNIQUE,
+            bye_team_id INTEGER,
+            PRIMARY KEY (tournament_id, round_number, slot),
+            FOREIGN KEY (tournament_id) REFERENCES tournaments (id),
+            FOREIGN KEY (match_id) REFERENCES matches (id),
+            FOREIGN KEY (bye_team_id) REFERENCES teams (id)
+        ) WITHOUT ROWID
+    """
+    )
+
+    # Rivales ya enfrentados en cada torneo (evitar revanchas y calcular el Buchholz)
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS tournament_opponents (
+            tournament_id INTEGER NOT NULL,
+            team_id INTEGER NOT NULL,
+            opponent_id INTEGER NOT NULL,
+            PRIMARY KEY (tournament_id, team_id, opponent_id)
+        ) WITHOUT ROWID
+    """
+    )
+    if "tournament_opponents" not in existing_tables:
+        cursor.execute(
+            """
+            INSERT OR IGNORE INTO tournament_opponents (tournament_id, team_id, opponent_id)
+            SELECT tm.tournament_id, a.team_id, b.team_id
+            FROM tournament_matches tm
+            JOIN match_teams a ON a.match_id = tm.match_id
+            JOIN match_teams b ON b.match_id = tm.match_id AND b.team_id != a.team_id
+        """
+        )
+
+    # Resumen de cada ronda para el historial (se guarda al anotarla o editarla);
+    # en bases anteriores la columna se agrega al final, igual que en las nuevas
+    needs_summaries = "rounds.summary" not in existing_tables
+    if needs_summaries:
+        cursor.execute("ALTER TABLE rounds ADD COLUMN summary TEXT")
+
+    # Rondas enviadas con un identificador del cliente: reenviarlas no las duplica
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS applied_submissions (
+            client_id TEXT PRIMARY KEY,
+            round_id INTEGER NOT NULL,
+            applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (round_id) REFERENCES rounds (id)
+        )
+    """
+    )
+
+    # Bases de archivo que recibieron partidas de esta (ver src/archive.py); al
+    # reconstruir el ranking se suman sus resultados
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS archive_databases (
+            path TEXT PRIMARY KEY
+        )
+    """
+    )
+
+    # Índice sin distinción de mayúsculas para la búsqueda por prefijo de apodos
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_users_nickname_nocase "
+        "ON users (nickname COLLATE NOCASE)"
+    )
+
+    # Índices para las consultas de partidas activas y rondas por partida
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_matches_status ON matches (status, created_at)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_rounds_match ON rounds (match_id, round_number)"
+    )
+
+    # Puntajes por ronda, equipos y jugadores por partida (historial, totales y
+    # evolución del puntaje)
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_redondo_scores_round ON redondo_scores (round_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_pica_pica_scores_round ON pica_pica_scores (round_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_match_teams_match ON match_teams (match_id, team_id)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_player_positions_match "
+        "ON player_positions (match_id, player_id, position)"
+    )
+    cursor.execute(
+        "CREATE INDEX IF NOT EXISTS idx_team_members_player ON team_members (player_id, team_id)"
+    )
+
     conn.commit()
     conn.close()
+
+    # Bases creadas antes de existir los totales, resultados o resúmenes: calcularlos del historial
+    if needs_backfill or needs_summaries:
+        from src.truco import TrucoGame
+
+        game = TrucoGame(db_path)
+        try:
+            if needs_backfill:
+                game.rebuild_match_results()
+            if needs_summaries:
+                game.rebuild_round_summaries()
+        finally:
+            game.conn.close()
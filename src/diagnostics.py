@@ -0,0 +1,145 @@
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+import pandas as pd
+import streamlit as st
+
+from src import instrumentation
+from src.win_probability import load_win_probability_table
+
+HISTORY_SIZE = 20
+# Cachés en memoria cuya tasa de aciertos se muestra en el panel
+CACHES = {
+    "Tabla de probabilidades": load_win_probability_table,
+}
+
+# Ejecuciones con el diagnóstico en curso: la última en terminar apaga tracemalloc
+_active = 0
+# Si tracemalloc ya estaba encendido (p. ej. por otra herramienta) no se lo apaga
+_started_tracing = False
+_active_lock = threading.Lock()
+
+
+def _cache_counters() -> dict:
+    """Leer aciertos y fallos acumulados de cada caché"""
+    counters = {}
+    for name, cached in CACHES.items():
+        info = cached.cache_info()
+        counters[name] = (info.hits, info.misses)
+    return counters
+
+
+class Diagnostics:
+    """Mide cada sección de una ejecución de la app y la muestra en la barra lateral.
+
+    La instrumentación y tracemalloc son del proceso: quedan encendidas mientras
+    alguna ejecución con el diagnóstico no haya llamado a close().
+    """
+
+    def __init__(self, enabled: bool):
+        global _active, _started_tracing
+        self.enabled = enabled
+        self.sections = []
+        if not enabled:
+            return
+
+        with _active_lock:
+            if _active == 0 and not tracemalloc.is_tracing():
+                tracemalloc.start()
+                _started_tracing = True
+            _active += 1
+        # Las conexiones abiertas desde ahora cuentan sus consultas
+        instrumentation.enable()
+        self.start = time.perf_counter()
+        self.caches_start = _cache_counters()
+
+    def close(self):
+        """Terminar la medición; la última ejecución activa apaga la instrumentación"""
+        global _active, _started_tracing
+        if not self.enabled:
+            return
+        self.enabled = False
+        instrumentation.disable()
+        with _active_lock:
+            _active -= 1
+            if _active == 0 and _started_tracing:
+                tracemalloc.stop()
+                _started_tracing = False
+
+    @contextmanager
+    def section(self, name: str):
+        """Medir tiempo, consultas SQL y memoria de un bloque de la app"""
+        if not self.enabled:
+            yield
+            return
+
+        queries_start = instrumentation.get_thread_query_totals()
+        memory_start, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            memory_end, memory_peak = tracemalloc.get_traced_memory()
+            queries_end = instrumentation.get_thread_query_totals()
+            self.sections.append(
+                {
+                    "Sección": name,
+                    "Tiempo (ms)": round(elapsed_ms, 1),
+                    "Consultas": queries_end["count"] - queries_start["count"],
+                    "SQL (ms)": round(queries_end["total_ms"] - queries_start["total_ms"], 1),
+                    "Memoria (KiB)": round((memory_end - memory_start) / 1024, 1),
+                    "Pico (KiB)": round((memory_peak - memory_start) / 1024, 1),
+                }
+            )
+
+    def render(self):
+        """Mostrar el panel de diagnóstico y guardar la ejecución en el historial"""
+        if not self.enabled:
+            return
+
+        total_ms = (time.perf_counter() - self.start) * 1000
+        history = st.session_state.setdefault("diagnostics_history", [])
+        history.append(
+            {
+                "Ejecución": len(history) + 1,
+                "Total (ms)": round(total_ms, 1),
+                **{section["Sección"]: section["Tiempo (ms)"] for section in self.sections},
+            }
+        )
+        del history[:-HISTORY_SIZE]
+
+        with st.sidebar:
+            st.subheader("🩺 Diagnóstico")
+            st.metric("Tiempo de esta ejecución", f"{total_ms:.0f} ms")
+            st.dataframe(pd.DataFrame(self.sections), hide_index=True)
+
+            st.write("**Cachés**")
+            caches_end = _cache_counters()
+            cache_rows = []
+            for name, (hits, misses) in caches_end.items():
+                start_hits, start_misses = self.caches_start[name]
+                run_lookups = (hits - start_hits) + (misses - start_misses)
+                cache_rows.append(
+                    {
+                        "Caché": name,
+                        "Aciertos": hits,
+                        "Fallos": misses,
+                        "Tasa": f"{hits / (hits + misses):.0%}" if hits + misses else "-",
+                        "En esta ejecución": f"{hits - start_hits}/{run_lookups}",
+                    }
+                )
+            st.dataframe(pd.DataFrame(cache_rows), hide_index=True)
+
+            st.write(f"**Últimas {len(history)} ejecuciones**")
+            history_df = pd.DataFrame(history).set_index("Ejecución")
+            st.line_chart(history_df)
+
+            with st.expander("Consultas más costosas"):
+                st.dataframe(
+                    pd.DataFrame(instrumentation.get_query_stats()[:20]),
+                    hide_index=True,
+                )
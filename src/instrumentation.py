@@ -0,0 +1,204 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+# Instrumentación de consultas (desactivada salvo que se pida por variable de entorno)
+ENABLED_BY_ENV = os.environ.get("TRUCO_QUERY_STATS", "").lower() in ("1", "true", "yes")
+ENABLED = ENABLED_BY_ENV
+SLOW_QUERY_MS = float(os.environ.get("TRUCO_SLOW_QUERY_MS", "50"))
+SLOW_QUERY_LOG = os.environ.get("TRUCO_SLOW_QUERY_LOG", "slow_queries.log")
+
+_lock = threading.Lock()
+# Usuarios activos de la instrumentación (p. ej. ejecuciones con el diagnóstico)
+_enabled_count = 0
+_stats: dict[str, dict] = {}
+_totals = {"count": 0, "total_ms": 0.0}
+# Totales del hilo actual: cada sesión de Streamlit ve sólo sus propias consultas
+_thread_totals = threading.local()
+
+
+def _normalize(sql: str) -> str:
+    """Colapsar espacios para agrupar la misma sentencia escrita en varias líneas"""
+    return re.sub(r"\s+", " ", sql).strip()
+
+
+def _record(sql: str, elapsed_ms: float, rows: int, executed: bool):
+    """Sumar una medición a las estadísticas de la sentencia"""
+    with _lock:
+        stats = _stats.get(sql)
+        if stats is None:
+            stats = _stats[sql] = {"count": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0}
+        if executed:
+            stats["count"] += 1
+            _totals["count"] += 1
+        stats["total_ms"] += elapsed_ms
+        stats["max_ms"] = max(stats["max_ms"], elapsed_ms)
+        stats["rows"] += rows
+        _totals["total_ms"] += elapsed_ms
+    _thread_totals.count = getattr(_thread_totals, "count", 0) + (1 if executed else 0)
+    _thread_totals.total_ms = getattr(_thread_totals, "total_ms", 0.0) + elapsed_ms
+
+
+def _log_slow_query(conn: sqlite3.Connection, sql: str, parameters, elapsed_ms: float):
+    """Escribir la sentencia lenta y su plan de ejecución en el log"""
+    try:
+        plan_cursor = sqlite3.Connection.cursor(conn)
+        plan_cursor.execute(f"EXPLAIN QUERY PLAN {sql}", parameters)
+        plan = "\n".join(f"    {row[-1]}" for row in plan_cursor.fetchall())
+    except sqlite3.Error as error:
+        plan = f"    (sin plan: {error})"
+
+    with _lock, open(SLOW_QUERY_LOG, "a") as log:
+        log.write(
+            f"{datetime.now().isoformat(timespec='seconds')} {elapsed_ms:.1f} ms\n"
+            f"  {_normalize(sql)}\n  params: {parameters!r}\n{plan}\n\n"
+        )
+
+
+class InstrumentedCursor(sqlite3.Cursor):
+    """Cursor que mide cada ejecución y cuenta las filas devueltas.
+
+    Una sentencia es lenta según su tiempo total (ejecución más lectura de filas),
+    que se conoce al agotar el cursor o al ejecutar la siguiente sentencia.
+    """
+
+    _sql = None
+    # Sentencia cuyo tiempo total todavía no se comparó con SLOW_QUERY_MS
+    _pending = None
+
+    def execute(self, sql, parameters=()):
+        self._check_slow()
+        start = time.perf_counter()
+        super().execute(sql, parameters)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        self._sql = _normalize(sql)
+        _record(self._sql, elapsed_ms, 0, executed=True)
+        self._pending = (sql, parameters)
+        self._elapsed_ms = elapsed_ms
+        if self.description is None:
+            # Sin filas para leer (INSERT, UPDATE, ...) el tiempo ya es el total
+            self._check_slow()
+        return self
+
+    def executemany(self, sql, seq_of_parameters):
+        self._check_slow()
+        start = time.perf_counter()
+        super().executemany(sql, seq_of_parameters)
+        self._sql = _normalize(sql)
+        _record(self._sql, (time.perf_counter() - start) * 1000, 0, executed=True)
+        return self
+
+    def _check_slow(self):
+        """Registrar la sentencia pendiente si su tiempo total superó el umbral"""
+        if self._pending is None:
+            return
+        sql, parameters = self._pending
+        self._pending = None
+        if self._elapsed_ms >= SLOW_QUERY_MS:
+            _log_slow_query(self.connection, sql, parameters, self._elapsed_ms)
+
+    def _fetched(self, start: float, rows: int, exhausted: bool = False):
+        # SQLite avanza la consulta al leer filas, así que ese tiempo también cuenta
+        if self._sql is not None:
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            _record(self._sql, elapsed_ms, rows, executed=False)
+            if self._pending is not None:
+                self._elapsed_ms += elapsed_ms
+        if exhausted:
+            self._check_slow()
+
+    def fetchone(self):
+        start = time.perf_counter()
+        row = super().fetchone()
+        self._fetched(start, 0 if row is None else 1, exhausted=row is None)
+        return row
+
+    def fetchmany(self, size=None):
+        size = self.arraysize if size is None else size
+        start = time.perf_counter()
+        rows = super().fetchmany(size)
+        self._fetched(start, len(rows), exhausted=len(rows) < size)
+        return rows
+
+    def fetchall(self):
+        start = time.perf_counter()
+        rows = super().fetchall()
+        self._fetched(start, len(rows), exhausted=True)
+        return rows
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            row = super().__next__()
+        except StopIteration:
+            self._fetched(start, 0, exhausted=True)
+            raise
+        self._fetched(start, 1)
+        return row
+
+
+class InstrumentedConnection(sqlite3.Connection):
+    """Conexión cuyos cursores (incluidos los de conn.execute) están instrumentados"""
+
+    def cursor(self, factory=InstrumentedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+
+def connect(database: str, **kwargs) -> sqlite3.Connection:
+    """Abrir una conexión, instrumentada sólo si TRUCO_QUERY_STATS está activo"""
+    if ENABLED:
+        return sqlite3.connect(database, factory=InstrumentedConnection, **kwargs)
+    return sqlite3.connect(database, **kwargs)
+
+
+def enable():
+    """Instrumentar las próximas conexiones hasta el disable() correspondiente"""
+    global ENABLED, _enabled_count
+    with _lock:
+        _enabled_count += 1
+        ENABLED = True
+
+
+def disable():
+    """Dejar de instrumentar cuando ya nadie la pidió (salvo TRUCO_QUERY_STATS)"""
+    global ENABLED, _enabled_count
+    with _lock:
+        _enabled_count -= 1
+        ENABLED = _enabled_count > 0 or ENABLED_BY_ENV
+
+
+def get_query_stats() -> list[dict]:
+    """Obtener las estadísticas por sentencia, ordenadas por tiempo acumulado"""
+    with _lock:
+        rows = [{"sql": sql, **stats} for sql, stats in _stats.items()]
+    return sorted(rows, key=lambda row: row["total_ms"], reverse=True)
+
+
+def get_query_totals() -> dict:
+    """Obtener la cantidad total de consultas y su tiempo acumulado"""
+    with _lock:
+        return dict(_totals)
+
+
+def get_thread_query_totals() -> dict:
+    """Obtener las consultas y el tiempo acumulados por el hilo actual"""
+    return {
+        "count": getattr(_thread_totals, "count", 0),
+        "total_ms": getattr(_thread_totals, "total_ms", 0.0),
+    }
+
+
+def reset_query_stats():
+    """Borrar las estadísticas acumuladas"""
+    with _lock:
+        _stats.clear()
+        _totals.update(count=0, total_ms=0.0)
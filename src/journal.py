@@ -0,0 +1,260 @@
+import argparse
+import json
+import logging
+import os
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from src.db_connection import DB_PATH
+from src.metrics import Counter
+
+# Diario local de rondas (TRUCO_JOURNAL=0 guarda directo en la base, como antes)
+ENABLED = os.environ.get("TRUCO_JOURNAL", "1") != "0"
+# Cuánto espera el anotador a que la ronda llegue a la base antes de seguir sin ella
+WAIT_SECONDS = float(os.environ.get("TRUCO_JOURNAL_WAIT_SECONDS", "2"))
+# Con la base bloqueada se reintenta en segundo plano, esperando el doble cada vez
+RETRY_SECONDS = 1.0
+MAX_RETRY_SECONDS = 30.0
+MAX_OUTCOMES = 1_000
+
+JOURNAL_ENTRIES = Counter(
+    "truco_journal_entries_total",
+    "Rondas del diario local por resultado al aplicarlas a la base.",
+    ("result",),
+)
+
+logger = logging.getLogger(__name__)
+
+
+def journal_path(db_path: str = DB_PATH) -> str:
+    """Archivo del diario de una base (al lado de la base, uno por sede)"""
+    return f"{db_path}.journal.jsonl"
+
+
+def new_client_id() -> str:
+    """Identificador de un envío; reenviarlo no duplica la ronda"""
+    return uuid.uuid4().hex
+
+
+class RoundJournal:
+    """Diario de rondas: se anota con fsync al instante y un hilo lo pasa a la base en orden"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self.path = journal_path(db_path)
+        self.offset_path = f"{self.path}.offset"
+        self.rejected_path = f"{self.path}.rejected"
+        self._lock = threading.Lock()
+        self._changed = threading.Condition(self._lock)
+        self._wake = threading.Event()
+        self._outcomes = {}  # client_id -> None (aplicada) o mensaje de error
+        self._thread = None
+        self._game = None
+        self._retry_seconds = RETRY_SECONDS
+        # La última pasada se cortó porque la base no estaba disponible
+        self._must_retry = False
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._loop, name="truco-journal", daemon=True
+        )
+        self._thread.start()
+
+    def append(self, entry: Dict):
+        """Anotar un envío en el diario y esperar a que esté en disco"""
+        line = json.dumps(entry, separators=(",", ":")) + "\n"
+        with self._lock:
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line)
+                f.flush()
+                os.fsync(f.fileno())
+        self._wake.set()
+
+    def submit(self, entry: Dict, wait_seconds: float = WAIT_SECONDS) -> bool:
+        """Anotar una ronda; True si ya está en la base, False si quedó pendiente.
+
+        Si la base la rechaza (por ejemplo, la partida ya terminó) se lanza ValueError
+        igual que al guardarla directamente.
+        """
+        entry.setdefault("client_id", new_client_id())
+        entry.setdefault("submitted_at", datetime.now().isoformat(timespec="seconds"))
+        self.append(entry)
+
+        client_id = entry["client_id"]
+        with self._changed:
+            self._changed.wait_for(lambda: client_id in self._outcomes, wait_seconds)
+            if client_id not in self._outcomes:
+                return False
+            error = self._outcomes.pop(client_id)
+        if error is not None:
+            raise ValueError(error)
+        return True
+
+    def _read_offset(self) -> int:
+        try:
+            with open(self.offset_path, encoding="utf-8") as f:
+                return int(f.read() or 0)
+        except (FileNotFoundError, ValueError):
+            return 0
+
+    def _write_offset(self, offset: int):
+        temporary = f"{self.offset_path}.tmp"
+        with open(temporary, "w", encoding="utf-8") as f:
+            f.write(str(offset))
+        os.replace(temporary, self.offset_path)
+
+    def _unapplied(self) -> List[tuple]:
+        """Envíos completos todavía no aplicados: [(offset al final de la línea, línea)]"""
+        offset = self._read_offset()
+        entries = []
+        try:
+            with open(self.path, "rb") as f:
+                f.seek(offset)
+                for raw in f:
+                    # Una línea sin salto quedó a medio escribir: se espera a que termine
+                    if not raw.endswith(b"\n"):
+                        break
+                    offset += len(raw)
+                    entries.append((offset, raw.decode("utf-8")))
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def pending(self, match_id: Optional[int] = None) -> List[Dict]:
+        """Rondas anotadas en el diario que todavía no llegaron a la base"""
+        with self._lock:
+            lines = self._unapplied()
+        entries = []
+        for _, line in lines:
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                continue
+            if match_id is None or entry.get("match_id") == match_id:
+                entries.append(entry)
+        return entries
+
+    def replay(self) -> int:
+        """Aplicar los envíos pendientes en orden; devuelve cuántos se aplicaron"""
+        # Import diferido: writer importa truco, que es pesado para quien sólo anota
+        from src.writer import open_game
+
+        if self._game is None:
+            self._game = open_game(self.db_path)
+
+        with self._lock:
+            lines = self._unapplied()
+        applied = 0
+        self._must_retry = False
+        for offset, line in lines:
+            entry, error = None, None
+            try:
+                entry = json.loads(line)
+                self._game.submit_round(
+                    entry["client_id"],
+                    entry["match_id"],
+                    entry["round_type"],
+                    entry["dealer_position"],
+                    entry["scores"],
+                )
+                result = "applied"
+                applied += 1
+            except (sqlite3.OperationalError, TimeoutError):
+                # Base bloqueada u ocupada, o el escritor no confirmó a tiempo: se conserva
+                # el orden y se reintenta después (si la ronda llegó a aplicarse, el
+                # client_id evita duplicarla)
+                JOURNAL_ENTRIES.labels("retry").inc()
+                self._must_retry = True
+                break
+            except (ValueError, KeyError, TypeError, sqlite3.Error) as rejection:
+                # Envío inválido: se aparta para no trabar el resto del diario
+                error = str(rejection)
+                result = "rejected"
+                with open(self.rejected_path, "a", encoding="utf-8") as f:
+                    f.write(json.dumps({"error": error, "entry": line.strip()}) + "\n")
+
+            JOURNAL_ENTRIES.labels(result).inc()
+            with self._changed:
+                self._write_offset(offset)
+                if isinstance(entry, dict) and "client_id" in entry:
+                    self._outcomes[entry["client_id"]] = error
+                # Resultados que nadie esperó (el anotador ya siguió sin ellos)
+                while len(self._outcomes) > MAX_OUTCOMES:
+                    self._outcomes.pop(next(iter(self._outcomes)))
+                self._changed.notify_all()
+
+        self._compact()
+        return applied
+
+    def _compact(self):
+        """Con todo aplicado, vaciar el diario para que no crezca sin límite"""
+        with self._lock:
+            if not os.path.exists(self.path):
+                return
+            if self._read_offset() >= os.path.getsize(self.path):
+                os.remove(self.path)
+                self._write_offset(0)
+
+    def _loop(self):
+        while True:
+            self._wake.wait(self._retry_seconds)
+            self._wake.clear()
+            try:
+                self.replay()
+            except Exception:  # el hilo no puede morir: el diario queda para luego
+                logger.exception("Error al aplicar el diario de rondas de %s", self.db_path)
+                self._must_retry = True
+            if self._must_retry:
+                self._retry_seconds = min(self._retry_seconds * 2, MAX_RETRY_SECONDS)
+            else:
+                self._retry_seconds = RETRY_SECONDS
+
+
+_journals = {}
+_journals_lock = threading.Lock()
+
+
+def get_journal(db_path: str = DB_PATH) -> RoundJournal:
+    """Obtener el diario de una base (uno por archivo y por proceso), con su hilo en marcha"""
+    with _journals_lock:
+        if db_path not in _journals:
+            _journals[db_path] = RoundJournal(db_path)
+            _journals[db_path].start()
+        return _journals[db_path]
+
+
+def record_round(
+    game,
+    db_path: str,
+    client_id: str,
+    match_id: int,
+    round_type: str,
+    dealer_position: int,
+    scores: List[Dict],
+) -> bool:
+    """Guardar una ronda desde la app; False si quedó en el diario esperando a la base"""
+    if not ENABLED:
+        game.submit_round(client_id, match_id, round_type, dealer_position, scores)
+        return True
+    return get_journal(db_path).submit(
+        {
+            "client_id": client_id,
+            "match_id": match_id,
+            "round_type": round_type,
+            "dealer_position": dealer_position,
+            "scores": scores,
+        }
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Aplicar el diario de rondas pendiente")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    journal = RoundJournal(args.db)
+    print(f"{len(journal.pending())} rondas pendientes")
+    print(f"{journal.replay()} rondas aplicadas")
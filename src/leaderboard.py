@@ -0,0 +1,91 @@
+import math
+
+import pandas as pd
+import streamlit as st
+from src.sharding import global_leaderboard, list_shards
+from src.truco import TrucoGame
+
+PAGE_SIZE = 20
+MODALITIES = {"1v1": 2, "2v2": 4, "3v3": 6}
+ORDER_OPTIONS = {"Victorias": "wins", "% de victorias": "win_rate", "Puntos": "points"}
+
+
+def leaderboard(game: TrucoGame):
+    st.header("🏆 Ranking")
+
+    col_kind, col_modality, col_order = st.columns(3)
+    with col_kind:
+        kind_label = st.radio(
+            "Ranking de", ["Jugadores", "Equipos"], horizontal=True, key="ranking_kind"
+        )
+    with col_modality:
+        modalities = st.multiselect(
+            "Modalidad",
+            list(MODALITIES.keys()),
+            default=list(MODALITIES.keys()),
+            key="ranking_modalities",
+        )
+    with col_order:
+        order_label = st.selectbox(
+            "Ordenar por", list(ORDER_OPTIONS.keys()), key="ranking_order"
+        )
+
+    date_range = st.date_input("Rango de fechas", value=(), key="ranking_dates")
+    date_from = date_range[0].isoformat() if len(date_range) > 0 else None
+    date_to = date_range[1].isoformat() if len(date_range) > 1 else None
+
+    kind = "player" if kind_label == "Jugadores" else "team"
+    players_counts = [MODALITIES[m] for m in modalities]
+    if not players_counts:
+        st.info("Seleccione al menos una modalidad.")
+        return
+
+    # Con varias sedes se puede ver el ranking combinado de todas
+    all_shards = len(list_shards()) > 1 and st.toggle(
+        "Todas las sedes", key="ranking_all_shards"
+    )
+    if all_shards:
+        all_rows = global_leaderboard(
+            kind, players_counts, date_from, date_to, ORDER_OPTIONS[order_label], limit=None
+        )
+        total = len(all_rows)
+    else:
+        total = game.count_leaderboard(kind, players_counts, date_from, date_to)
+    if total == 0:
+        st.info("No hay partidas terminadas para estos filtros.")
+        return
+
+    pages = math.ceil(total / PAGE_SIZE)
+    page = st.number_input(
+        f"Página (de {pages})", min_value=1, max_value=pages, value=1, key="ranking_page"
+    )
+
+    if all_shards:
+        rows = all_rows[(page - 1) * PAGE_SIZE : page * PAGE_SIZE]
+    else:
+        rows = game.get_leaderboard(
+            kind,
+            players_counts,
+            date_from,
+            date_to,
+            ORDER_OPTIONS[order_label],
+            limit=PAGE_SIZE,
+            offset=(page - 1) * PAGE_SIZE,
+        )
+
+    first_position = (page - 1) * PAGE_SIZE + 1
+    df = pd.DataFrame(rows)
+    df.insert(0, "Posición", range(first_position, first_position + len(df)))
+    df["win_rate"] = (df["win_rate"] * 100).round(1)
+    df = df.drop(columns=["id"], errors="ignore")
+    df.columns = [
+        "Posición",
+        "Equipo" if kind == "team" else "Jugador",
+        "Partidas",
+        "Victorias",
+        "Derrotas",
+        "% Victorias",
+        "Puntos a favor",
+        "Puntos en contra",
+    ]
+    st.dataframe(df, use_container_width=True, hide_index=True)
@@ -0,0 +1,170 @@
+import argparse
+import os
+import sqlite3
+import threading
+import time
+
+from src.db_connection import DB_PATH
+from src.metrics import Counter
+from src.win_probability import refresh_win_probability_table
+
+# Mantenimiento en segundo plano (TRUCO_MAINTENANCE=0 lo desactiva)
+ENABLED = os.environ.get("TRUCO_MAINTENANCE", "1") != "0"
+CHECK_SECONDS = 30
+# La base se considera ociosa si nadie escribió durante este tiempo
+IDLE_SECONDS = 60
+# Cada cuánto corre cada tarea (como mínimo)
+TASK_INTERVALS = {
+    "checkpoint": 5 * 60,
+    "incremental_vacuum": 15 * 60,
+    "analyze": 60 * 60,
+    # Regenera la tabla de probabilidades si se terminaron partidas desde la última
+    "win_probability": 15 * 60,
+}
+# Un anotador nunca espera por el mantenimiento: si la base está ocupada se reintenta luego
+BUSY_TIMEOUT_MS = 50
+ANALYSIS_LIMIT = 400
+VACUUM_PAGES_PER_STEP = 100
+
+MAINTENANCE_RUNS = Counter(
+    "truco_maintenance_runs_total",
+    "Tareas de mantenimiento ejecutadas por resultado.",
+    ("task", "result"),
+)
+
+
+class MaintenanceScheduler:
+    """Corre ANALYZE/optimize, checkpoints y vacuum incremental cuando la base está ociosa"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._stop = threading.Event()
+        self._thread = None
+        self._conn = None
+        self._data_version = None
+        self._last_write = time.monotonic()
+        self._last_run = dict.fromkeys(TASK_INTERVALS, time.monotonic())
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._loop, name="truco-maintenance", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def _connect(self) -> sqlite3.Connection:
+        # Modo autocommit: cada PRAGMA es su propia transacción corta
+        conn = sqlite3.connect(self.db_path, isolation_level=None, check_same_thread=False)
+        conn.execute(f"PRAGMA busy_timeout = {BUSY_TIMEOUT_MS}")
+        return conn
+
+    def _loop(self):
+        self._conn = self._connect()
+        try:
+            while not self._stop.wait(CHECK_SECONDS):
+                self.run_pending()
+        finally:
+            self._conn.close()
+
+    def _written_since_last_check(self) -> bool:
+        """data_version cambia cuando otra conexión confirma una escritura"""
+        version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+        changed = self._data_version is not None and version != self._data_version
+        self._data_version = version
+        if changed:
+            self._last_write = time.monotonic()
+        return changed
+
+    def run_pending(self, force: bool = False):
+        """Correr las tareas vencidas si la base está ociosa"""
+        if self._conn is None:
+            self._conn = self._connect()
+        if self._written_since_last_check() and not force:
+            return
+        if not force and time.monotonic() - self._last_write < IDLE_SECONDS:
+            return
+
+        for task, interval in TASK_INTERVALS.items():
+            if not force and time.monotonic() - self._last_run[task] < interval:
+                continue
+            # Si alguien empezó a anotar, dejar el resto para otro momento
+            if self._written_since_last_check() and not force:
+                return
+            try:
+                getattr(self, f"_{task}")()
+                result = "ok"
+            except sqlite3.OperationalError:
+                result = "busy"
+            self._last_run[task] = time.monotonic()
+            MAINTENANCE_RUNS.labels(task, result).inc()
+
+    def _checkpoint(self):
+        """Pasar el WAL a la base sin esperar a lectores ni escritores"""
+        mode = self._conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if mode == "wal":
+            self._conn.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+
+    def _incremental_vacuum(self):
+        """Liberar páginas vacías de a pocas, cediendo entre cada paso"""
+        if self._conn.execute("PRAGMA auto_vacuum").fetchone()[0] != 2:
+            return
+        while self._conn.execute("PRAGMA freelist_count").fetchone()[0] > 0:
+            if self._stop.is_set() or self._written_since_last_check():
+                return
+            self._conn.execute(f"PRAGMA incremental_vacuum({VACUUM_PAGES_PER_STEP})").fetchall()
+
+    def _analyze(self):
+        """Actualizar estadísticas del planificador con un límite de filas analizadas"""
+        self._conn.execute(f"PRAGMA analysis_limit = {ANALYSIS_LIMIT}")
+        # PRAGMA optimize sólo analiza lo que usó esta conexión, que no hace consultas
+        # de la app: ANALYZE con analysis_limit acota el costo por índice
+        self._conn.execute("ANALYZE")
+        self._conn.execute("PRAGMA optimize").fetchall()
+
+    def _win_probability(self):
+        """Ajustar de nuevo la tabla de probabilidades al historial actual"""
+        refresh_win_probability_table(self.db_path)
+
+
+_schedulers = {}
+_schedulers_lock = threading.Lock()
+
+
+def start_maintenance(db_path: str = DB_PATH):
+    """Iniciar (una sola vez por base y por proceso) el mantenimiento en segundo plano"""
+    if not ENABLED:
+        return None
+    with _schedulers_lock:
+        if db_path not in _schedulers:
+            _schedulers[db_path] = MaintenanceScheduler(db_path)
+            _schedulers[db_path].start()
+        return _schedulers[db_path]
+
+
+def enable_incremental_vacuum(db_path: str = DB_PATH):
+    """Pasar una base existente a auto_vacuum incremental (requiere un VACUUM completo)"""
+    conn = sqlite3.connect(db_path, isolation_level=None)
+    conn.execute("PRAGMA auto_vacuum = INCREMENTAL")
+    conn.execute("VACUUM")
+    conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mantenimiento de la base de datos")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument(
+        "--enable-incremental-vacuum",
+        action="store_true",
+        help="hacer un VACUUM completo para activar auto_vacuum incremental (con la app detenida)",
+    )
+    args = parser.parse_args()
+
+    if args.enable_incremental_vacuum:
+        enable_incremental_vacuum(args.db)
+    scheduler = MaintenanceScheduler(args.db)
+    scheduler.run_pending(force=True)
+    print("Mantenimiento completo")
@@ -0,0 +1,256 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from src.db_connection import DB_PATH
+
+# Puerto local donde se exponen las métricas (0 para desactivarlas)
+METRICS_PORT = int(os.environ.get("TRUCO_METRICS_PORT", "9464"))
+METRICS_HOST = os.environ.get("TRUCO_METRICS_HOST", "127.0.0.1")
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+_registry = []
+_server = None
+_server_lock = threading.Lock()
+
+logger = logging.getLogger(__name__)
+
+
+def _escape(value: str) -> str:
+    """Escapar un valor de etiqueta según el formato de texto de Prometheus"""
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(names: tuple, values: tuple, extra: str = "") -> str:
+    """Armar el bloque {nombre="valor",...} de una serie"""
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Métrica con etiquetas opcionales; cada combinación de valores es una serie"""
+
+    kind = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._series = {}
+        _registry.append(self)
+
+    def labels(self, *values):
+        values = tuple(str(value) for value in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name} espera las etiquetas {self.labelnames}")
+        with self._lock:
+            if values not in self._series:
+                self._series[values] = self._new_series()
+            return self._series[values]
+
+    def _default(self):
+        return self.labels()
+
+    def collect(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        with self._lock:
+            series = list(self._series.items())
+        for values, child in series:
+            lines.extend(child.samples(self.name, self.labelnames, values))
+        return lines
+
+
+class _CounterSeries:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1):
+        with self._lock:
+            self.value += amount
+
+    def samples(self, name, labelnames, values):
+        return [f"{name}{_format_labels(labelnames, values)} {self.value}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_series(self):
+        return _CounterSeries()
+
+    def inc(self, amount: float = 1):
+        self._default().inc(amount)
+
+
+class _HistogramSeries:
+    def __init__(self, buckets: tuple):
+        self._lock = threading.Lock()
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def samples(self, name, labelnames, values):
+        with self._lock:
+            counts, total, count = list(self.counts), self.sum, self.count
+        lines = []
+        for bound, bucket_count in zip(self.buckets + ("+Inf",), counts + [count]):
+            labels = _format_labels(labelnames, values, f'le="{bound}"')
+            lines.append(f"{name}_bucket{labels} {bucket_count}")
+        lines.append(f"{name}_sum{_format_labels(labelnames, values)} {total}")
+        lines.append(f"{name}_count{_format_labels(labelnames, values)} {count}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(sorted(buckets))
+        super().__init__(name, documentation, labelnames)
+
+    def _new_series(self):
+        return _HistogramSeries(self.buckets)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+
+ROUNDS_SUBMITTED = Counter(
+    "truco_rounds_submitted_total", "Rondas agregadas a partidas.", ("round_type",)
+)
+POINTS_RECORDED = Counter(
+    "truco_points_recorded_total",
+    "Puntos anotados por tipo de ronda y de jugada.",
+    ("round_type", "kind"),
+)
+ROUND_SUBMISSION_SECONDS = Histogram(
+    "truco_round_submission_seconds",
+    "Tiempo de guardar una ronda completa con sus puntajes.",
+    ("round_type",),
+)
+TEAM_SCORES_SECONDS = Histogram(
+    "truco_get_team_scores_seconds", "Tiempo de calcular los puntajes de una partida."
+)
+
+
+def _gauges(db_path: str) -> list[str]:
+    """Valores medidos en el momento del scrape: partidas activas y tamaños de archivos"""
+    lines = []
+    try:
+        conn = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True, timeout=1)
+        try:
+            active = conn.execute(
+                "SELECT COUNT(*) FROM matches WHERE status = 'en_progreso'"
+            ).fetchone()[0]
+        finally:
+            conn.close()
+        lines += [
+            "# HELP truco_active_matches Partidas en progreso.",
+            "# TYPE truco_active_matches gauge",
+            f"truco_active_matches {active}",
+        ]
+    except sqlite3.Error:
+        pass
+
+    for metric, path, documentation in (
+        ("truco_db_size_bytes", db_path, "Tamaño del archivo de la base."),
+        ("truco_wal_size_bytes", f"{db_path}-wal", "Tamaño del archivo WAL."),
+    ):
+        size = os.path.getsize(path) if os.path.exists(path) else 0
+        lines += [
+            f"# HELP {metric} {documentation}",
+            f"# TYPE {metric} gauge",
+            f"{metric} {size}",
+        ]
+    return lines
+
+
+def render_metrics(db_path: str = DB_PATH) -> str:
+    """Generar todas las métricas en formato de texto de Prometheus"""
+    lines = []
+    for metric in _registry:
+        lines.extend(metric.collect())
+    lines.extend(_gauges(db_path))
+    return "\n".join(lines) + "\n"
+
+
+def _handler(db_path: str):
+    class MetricsHandler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?")[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = render_metrics(db_path).encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass  # no ensuciar la salida de Streamlit con cada scrape
+
+    return MetricsHandler
+
+
+def start_metrics_server(
+    port: int = METRICS_PORT, host: str = METRICS_HOST, db_path: str = DB_PATH
+):
+    """Levantar (una sola vez por proceso) el endpoint /metrics en un hilo de fondo"""
+    global _server
+    if port == 0:
+        return None
+    with _server_lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port), _handler(db_path))
+            except OSError as error:
+                logger.warning("No se pudo abrir el puerto de métricas %s: %s", port, error)
+                return None
+            _server.daemon_threads = True
+            threading.Thread(
+                target=_server.serve_forever, name="truco-metrics", daemon=True
+            ).start()
+    return _server
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Servir las métricas de la base")
+    parser.add_argument("--db", default=DB_PATH)
+    parser.add_argument("--host", default=METRICS_HOST)
+    parser.add_argument("--port", type=int, default=METRICS_PORT)
+    args = parser.parse_args()
+
+    server = start_metrics_server(args.port, args.host, args.db)
+    if server is not None:
+        print(f"Métricas en http://{args.host}:{args.port}/metrics")
+        threading.Event().wait()
@@ -0,0 +1,122 @@
+from collections.abc import Mapping
+
+
+class Record(Mapping):
+    """Fila compacta (con __slots__) que se lee como atributo o como dict: row["campo"].
+
+    Los campos sin valor (columnas que la consulta no trajo) no ocupan lugar y se
+    comportan como claves ausentes: row.get("campo") devuelve None.
+    """
+
+    __slots__ = ()
+    fields = ()
+
+    def __init__(self, *values, **named):
+        for field, value in zip(self.fields, values):
+            setattr(self, field, value)
+        for field, value in named.items():
+            setattr(self, field, value)
+
+    @classmethod
+    def row_factory(cls):
+        """Fábrica de filas para cursor.row_factory que construye este tipo directamente"""
+        cached = [None, None]  # descripción de la última consulta y su constructor
+
+        def factory(cursor, row):
+            description = cursor.description
+            if description is not cached[0]:
+                names = tuple(column[0] for column in description)
+                cached[0] = description
+                # Columnas en el mismo orden que los campos: se asignan por posición
+                if names == cls.fields[: len(names)]:
+                    cached[1] = lambda values: cls(*values)
+                else:
+                    cached[1] = lambda values: cls(**dict(zip(names, values)))
+            return cached[1](row)
+
+        return factory
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def __setitem__(self, key, value):
+        # Compatibilidad con el código que agregaba claves a los dict (p. ej. "scores")
+        setattr(self, key, value)
+
+    def __iter__(self):
+        return (field for field in self.fields if hasattr(self, field))
+
+    def __len__(self):
+        return sum(1 for _ in self)
+
+    def __repr__(self):
+        values = ", ".join(f"{field}={self[field]!r}" for field in self)
+        return f"{type(self).__name__}({values})"
+
+
+class User(Record):
+    __slots__ = fields = ("id", "nickname")
+
+
+class Match(Record):
+    __slots__ = fields = (
+        "id",
+        "name",
+        "created_at",
+        "players_count",
+        "pica_pica_enabled",
+        "pica_pica_end_points",
+        "starting_dealer_id",
+        "status",
+        "dealer_nickname",
+    )
+
+
+class Seat(Record):
+    __slots__ = fields = ("player_id", "position", "nickname")
+
+
+class Team(Record):
+    __slots__ = fields = ("id", "name", "player_ids", "player_names")
+
+
+class Round(Record):
+    __slots__ = fields = (
+        "id",
+        "match_id",
+        "round_number",
+        "round_type",
+        "dealer_position",
+        "created_at",
+        "summary",
+        "dealer_name",
+        "scores",
+    )
+
+
+class RedondoScore(Record):
+    __slots__ = fields = (
+        "id",
+        "round_id",
+        "truco_winner_team_id",
+        "truco_points",
+        "envido_winner_team_id",
+        "envido_points",
+        "created_at",
+    )
+
+
+class PicaPicaScore(Record):
+    __slots__ = fields = (
+        "id",
+        "round_id",
+        "sub_round",
+        "truco_winner_id",
+        "truco_points",
+        "envido_winner_id",
+        "envido_points",
+        "created_at",
+    )
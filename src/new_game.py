@@ -4,10 +4,12 @@ import random
 from src.truco import TrucoGame
 
 
+SEARCH_LIMIT = 50
+
+
 def validate_minimum_players(game: TrucoGame) -> bool:
     """Validar que hay suficientes jugadores para crear una partida"""
-    users = game.get_users()
-    if len(users) < 2:
+    if game.count_users() < 2:
         st.warning("Necesita al menos 2 jugadores para crear una partida.")
         return False
     return True
@@ -44,10 +46,26 @@ def get_game_configuration() -> tuple[int, int]:
     return players_count, pica_pica_end_points
 
 
-def get_1v1_configuration(users: list) -> tuple:
+def search_player_options(
+    game: TrucoGame, key: str, selected: list, user_options: dict
+) -> list:
+    """Buscar jugadores por prefijo; agrega los resultados a user_options y devuelve sus apodos"""
+    query = st.text_input(
+        "Buscar jugador", key=f"{key}_search", placeholder="Inicio del apodo"
+    )
+
+    # Los jugadores ya elegidos siguen siendo opción aunque no coincidan con la búsqueda
+    options = game.get_user_ids([name for name in selected if name])
+    for user in game.search_users(query, limit=SEARCH_LIMIT):
+        options.setdefault(user["nickname"], user["id"])
+
+    user_options.update(options)
+    return list(options.keys())
+
+
+def get_1v1_configuration(game: TrucoGame) -> tuple:
     """Configuración simplificada para juegos 1v1"""
-    user_options = {f"{user['nickname']}": user["id"] for user in users}
-    user_names = list(user_options.keys())
+    user_options = {}
 
     st.write("**Seleccionar Jugadores:**")
 
@@ -55,16 +73,22 @@ def get_1v1_configuration(users: list) -> tuple:
 
     with col1:
         st.write("**Jugador 1:**")
+        player1_names = search_player_options(
+            game, "player1", [st.session_state.get("player1_select")], user_options
+        )
         player1 = st.selectbox(
             "Jugador 1",
-            options=user_names,
+            options=player1_names,
             key="player1_select",
             label_visibility="collapsed"
         )
 
     with col2:
         st.write("**Jugador 2:**")
-        available_players = [p for p in user_names if p != player1]
+        player2_names = search_player_options(
+            game, "player2", [st.session_state.get("player2_select")], user_options
+        )
+        available_players = [p for p in player2_names if p != player1]
         player2 = st.selectbox(
             "Jugador 2",
             options=available_players,
@@ -81,29 +105,29 @@ def get_1v1_configuration(users: list) -> tuple:
     )
 
 
-def get_team_configuration(
-    game: TrucoGame, users: list, players_per_team: int
-) -> tuple:
+def get_team_configuration(game: TrucoGame, players_per_team: int) -> tuple:
     """Obtener configuración de equipos"""
-    user_options = {f"{user['nickname']}": user["id"] for user in users}
-    user_names = list(user_options.keys())
+    user_options = {}
 
     # Obtener equipos existentes con nombres de jugadores
-    existing_teams_raw = game.get_existing_teams_with_players()
+    # Solo incluir equipos que tengan el número correcto de jugadores
+    existing_teams_raw = [
+        team
+        for team in game.get_existing_teams_with_players()
+        if len(team["player_ids"]) == players_per_team
+    ]
+    nicknames = game.get_nicknames(
+        list({pid for team in existing_teams_raw for pid in team["player_ids"]})
+    )
     existing_teams = []
 
     for team in existing_teams_raw:
-        # Solo incluir equipos que tengan el número correcto de jugadores
-        if len(team["player_ids"]) != players_per_team:
-            continue
-
         # Obtener nombres de jugadores para este equipo
-        player_names = []
-        for player_id in team["player_ids"]:
-            for user in users:
-                if user["id"] == player_id:
-                    player_names.append(user["nickname"])
-                    break
+        player_names = [
+            nicknames[player_id]
+            for player_id in team["player_ids"]
+            if player_id in nicknames
+        ]
 
         team_with_names = {
             "id": team["id"],
@@ -136,9 +160,15 @@ def get_team_configuration(
             team1_name = st.text_input(
                 "Nombre del Jugador 1:", value="Jugador 1", key="team1_name"
             )
+            team1_names = search_player_options(
+                game,
+                "team1",
+                st.session_state.get("team1_players", []),
+                user_options,
+            )
             team1_players = st.multiselect(
                 "Seleccionar jugador",
-                options=user_names,
+                options=team1_names,
                 max_selections=1,
                 key="team1_players",
             )
@@ -146,9 +176,15 @@ def get_team_configuration(
             team1_name = st.text_input(
                 "Nombre del Equipo 1:", value="Equipo 1", key="team1_name"
             )
+            team1_names = search_player_options(
+                game,
+                "team1",
+                st.session_state.get("team1_players", []),
+                user_options,
+            )
             team1_players = st.multiselect(
                 f"Seleccionar {players_per_team} jugadores para Equipo 1",
-                options=user_names,
+                options=team1_names,
                 max_selections=players_per_team,
                 key="team1_players",
             )
@@ -174,6 +210,9 @@ def get_team_configuration(
             if selected_team1_data:
                 team1_name = selected_team1_data["name"]
                 team1_players = selected_team1_data["player_names"]
+                user_options.update(
+                    zip(team1_players, selected_team1_data["player_ids"])
+                )
                 st.info(
                     f"Equipo seleccionado: {team1_name} con {len(team1_players)} jugadores"
                 )
@@ -186,9 +225,15 @@ def get_team_configuration(
                 team1_name = st.text_input(
                     "Nombre del Jugador 1:", value="Jugador 1", key="team1_name"
                 )
+                team1_names = search_player_options(
+                    game,
+                    "team1",
+                    st.session_state.get("team1_players", []),
+                    user_options,
+                )
                 team1_players = st.multiselect(
                     "Seleccionar jugador",
-                    options=user_names,
+                    options=team1_names,
                     max_selections=1,
                     key="team1_players",
                 )
@@ -197,9 +242,15 @@ def get_team_configuration(
                 team1_name = st.text_input(
                     "Nombre del Equipo 1:", value="Equipo 1", key="team1_name"
                 )
+                team1_names = search_player_options(
+                    game,
+                    "team1",
+                    st.session_state.get("team1_players", []),
+                    user_options,
+                )
                 team1_players = st.multiselect(
                     f"Seleccionar {players_per_team} jugadores para Equipo 1",
-                    options=user_names,
+                    options=team1_names,
                     max_selections=players_per_team,
                     key="team1_players",
                 )
@@ -228,7 +279,13 @@ def get_team_configuration(
                 "Nombre del Jugador 2:", value="Jugador 2", key="team2_name"
             )
             # Filtrar jugadores disponibles
-            available_players = [p for p in user_names if p not in team1_players]
+            team2_names = search_player_options(
+                game,
+                "team2",
+                st.session_state.get("team2_players", []),
+                user_options,
+            )
+            available_players = [p for p in team2_names if p not in team1_players]
             team2_players = st.multiselect(
                 "Seleccionar jugador",
                 options=available_players,
@@ -240,7 +297,13 @@ def get_team_configuration(
                 "Nombre del Equipo 2:", value="Equipo 2", key="team2_name"
             )
             # Filtrar jugadores disponibles
-            available_players = [p for p in user_names if p not in team1_players]
+            team2_names = search_player_options(
+                game,
+                "team2",
+                st.session_state.get("team2_players", []),
+                user_options,
+            )
+            available_players = [p for p in team2_names if p not in team1_players]
             team2_players = st.multiselect(
                 f"Seleccionar {players_per_team} jugadores para Equipo 2",
                 options=available_players,
@@ -281,6 +344,9 @@ def get_team_configuration(
             if selected_team2_data:
                 team2_name = selected_team2_data["name"]
                 team2_players = selected_team2_data["player_names"]
+                user_options.update(
+                    zip(team2_players, selected_team2_data["player_ids"])
+                )
                 st.info(
                     f"Equipo seleccionado: {team2_name} con {len(team2_players)} jugadores"
                 )
@@ -294,7 +360,13 @@ def get_team_configuration(
                     "Nombre del Jugador 2:", value="Jugador 2", key="team2_name"
                 )
                 # Filtrar jugadores disponibles
-                available_players = [p for p in user_names if p not in team1_players]
+                team2_names = search_player_options(
+                    game,
+                    "team2",
+                    st.session_state.get("team2_players", []),
+                    user_options,
+                )
+                available_players = [p for p in team2_names if p not in team1_players]
                 team2_players = st.multiselect(
                     "Seleccionar jugador",
                     options=available_players,
@@ -307,7 +379,13 @@ def get_team_configuration(
                     "Nombre del Equipo 2:", value="Equipo 2", key="team2_name"
                 )
                 # Filtrar jugadores disponibles
-                available_players = [p for p in user_names if p not in team1_players]
+                team2_names = search_player_options(
+                    game,
+                    "team2",
+                    st.session_state.get("team2_players", []),
+                    user_options,
+                )
+                available_players = [p for p in team2_names if p not in team1_players]
                 team2_players = st.multiselect(
                     f"Seleccionar {players_per_team} jugadores para Equipo 2",
                     options=available_players,
@@ -385,6 +463,22 @@ def create_or_get_teams(
     return team1_id, team2_id
 
 
+def show_head_to_head(
+    game: TrucoGame, team1_id: int, team1_name: str, team2_id: int, team2_name: str
+):
+    """Mostrar el historial de enfrentamientos entre los dos equipos"""
+    record = game.get_head_to_head("team", team1_id, team2_id)
+    if record["played"] == 0:
+        st.caption("📊 Primer enfrentamiento entre estos equipos")
+        return
+
+    st.info(
+        f"📊 Historial: **{team1_name}** {record['wins']} - "
+        f"{record['losses']} **{team2_name}** "
+        f"({record['points_for']} a {record['points_against']} en puntos)"
+    )
+
+
 def generate_player_order_css(team1_players: list, team2_players: list) -> str:
     """Generar CSS para mostrar el orden de jugadores en círculo"""
     total_players = len(team1_players) + len(team2_players)
@@ -496,9 +590,11 @@ def show_match_creation_success(game: TrucoGame, match_id: int, players_count: i
     st.info("¡Ve a 'Jugar Partida' para empezar a jugar!")
 
 
-def new_game(game: TrucoGame):
+def new_game(game: TrucoGame, reader: TrucoGame = None):
     """Función principal para crear una nueva partida con proceso de 3 pasos"""
     st.header("🆕 Crear Nueva Partida")
+    # El historial entre equipos tolera algo de demora: se lee de la réplica
+    reader = reader or game
 
     # Validar jugadores mínimos
     if not validate_minimum_players(game):
@@ -514,14 +610,12 @@ def new_game(game: TrucoGame):
     else:
         st.subheader("📋 Paso 1: Configurar Equipos")
 
-    users = game.get_users()
-
     if players_per_team == 1:
         # Configuración simplificada para 1v1
-        team_config = get_1v1_configuration(users)
+        team_config = get_1v1_configuration(game)
     else:
         # Configuración normal para equipos
-        team_config = get_team_configuration(game, users, players_per_team)
+        team_config = get_team_configuration(game, players_per_team)
 
     team1_name, team1_players, team2_name, team2_players, user_options = team_config
 
@@ -550,6 +644,9 @@ def new_game(game: TrucoGame):
         # Mostrar resumen simplificado para 1v1
         st.write("**Enfrentamiento:**")
         st.write(f"🥊 {team1_players[0]} vs {team2_players[0]}")
+        show_head_to_head(
+            reader, team1_id, team1_players[0], team2_id, team2_players[0]
+        )
     else:
         st.success("✅ Equipos configurados correctamente")
         # Mostrar resumen de equipos
@@ -565,6 +662,8 @@ def new_game(game: TrucoGame):
             for player in team2_players:
                 st.write(f"• {player}")
 
+        show_head_to_head(reader, team1_id, team1_name, team2_id, team2_name)
+
     # Botón de confirmación
     if st.button("✅ Confirmar y Crear Partida"):
         all_selected_players = team1_players + team2_players
@@ -0,0 +1,170 @@
+import math
+from bisect import insort
+from itertools import chain
+from typing import Dict, List, Optional, Set, Tuple
+
+# Un cruce es (equipo, rival); rival None significa que el equipo queda libre (bye)
+Pairing = Tuple[int, Optional[int]]
+# Límite de la búsqueda de cruces suizos sin revanchas antes de aceptar alguna
+SWISS_SEARCH_STEPS = 20_000
+SWISS_BYE_CANDIDATES = 8
+
+
+def bracket_order(size: int) -> List[int]:
+    """Orden de siembra de un cuadro de eliminación: 1 y 2 sólo se cruzan en la final"""
+    order = [1]
+    while len(order) < size:
+        mirror = len(order) * 2 + 1
+        order = [seed for high in order for seed in (high, mirror - high)]
+    return order
+
+
+def elimination_rounds(teams_count: int) -> int:
+    """Cantidad de rondas de un cuadro de eliminación simple"""
+    return max(1, math.ceil(math.log2(teams_count)))
+
+
+def single_elimination_first_round(team_ids: List[int]) -> List[Pairing]:
+    """Primera ronda del cuadro; team_ids en orden de siembra, los mejores quedan libres"""
+    size = 2 ** elimination_rounds(len(team_ids))
+    order = bracket_order(size)
+    seeded = {seed: team_id for seed, team_id in enumerate(team_ids, start=1)}
+
+    pairings = []
+    for slot in range(size // 2):
+        first = seeded.get(order[2 * slot])
+        second = seeded.get(order[2 * slot + 1])
+        pairings.append((first, second) if first is not None else (second, None))
+    return pairings
+
+
+def next_elimination_round(winners: List[Optional[int]]) -> List[Pairing]:
+    """Cruces de la ronda siguiente: los ganadores de cada par de llaves se enfrentan"""
+    pairings = []
+    for slot in range(0, len(winners), 2):
+        first, second = winners[slot], winners[slot + 1] if slot + 1 < len(winners) else None
+        pairings.append((first, second) if first is not None else (second, None))
+    return pairings
+
+
+def round_robin_rounds(teams_count: int) -> int:
+    """Cantidad de rondas de un todos contra todos"""
+    return teams_count - 1 if teams_count % 2 == 0 else teams_count
+
+
+def round_robin_round(team_ids: List[int], round_number: int) -> List[Pairing]:
+    """Cruces de una ronda del todos contra todos (método del círculo)"""
+    lineup = list(team_ids) + ([None] if len(team_ids) % 2 else [])
+    size = len(lineup)
+    rest = lineup[1:]
+    shift = (round_number - 1) % (size - 1)
+    if shift:
+        rest = rest[-shift:] + rest[:-shift]
+    lineup = [lineup[0]] + rest
+
+    pairings = []
+    for i in range(size // 2):
+        first, second = lineup[i], lineup[size - 1 - i]
+        pairings.append((first, second) if first is not None else (second, None))
+    return pairings
+
+
+def swiss_rounds(teams_count: int) -> int:
+    """Cantidad de rondas suizas por defecto: las necesarias para un único invicto"""
+    return elimination_rounds(teams_count)
+
+
+def _swiss_candidates(others: List[int], scores: Dict[int, int], team: int):
+    """Rivales posibles en orden de preferencia: la mitad inferior del mismo puntaje
+    primero (sistema holandés), luego la mitad superior y luego los puntajes menores"""
+    group = 0
+    while group < len(others) and scores[others[group]] == scores[team]:
+        group += 1
+    # El grupo completo incluye al equipo: enfrenta al primero de la mitad inferior
+    half = max(0, (group + 1) // 2 - 1)
+    return chain(others[half:group], reversed(others[:half]), others[group:])
+
+
+def _pair_without_rematches(
+    ranking: List[int],
+    scores: Dict[int, int],
+    opponents: Dict[int, Set[int]],
+    max_steps: int,
+) -> Optional[List[Tuple[int, int]]]:
+    """Búsqueda con vuelta atrás de cruces sin revanchas (None si no hay o se agota el límite)"""
+    position = {team_id: i for i, team_id in enumerate(ranking)}
+    unpaired = list(range(len(ranking)))  # posiciones en la tabla, siempre ordenadas
+    frames = []  # (equipo, rivales pendientes, rival elegido)
+    steps = 0
+
+    def candidates(team_position):
+        team_id = ranking[team_position]
+        others = [ranking[i] for i in unpaired[1:]]
+        played = opponents.get(team_id, ())
+        return (
+            position[rival]
+            for rival in _swiss_candidates(others, scores, team_id)
+            if rival not in played
+        )
+
+    pending = candidates(unpaired[0]) if unpaired else None
+    while unpaired:
+        team = unpaired[0]
+        rival = next(pending, None)
+        if rival is None:
+            # Nadie disponible para este equipo: deshacer el cruce anterior y probar otro
+            if not frames:
+                return None
+            team, pending, previous = frames.pop()
+            insort(unpaired, team)
+            insort(unpaired, previous)
+            continue
+
+        steps += 1
+        if steps > max_steps:
+            return None
+        unpaired.remove(team)
+        unpaired.remove(rival)
+        frames.append((team, pending, rival))
+        if unpaired:
+            pending = candidates(unpaired[0])
+
+    return [(ranking[team], ranking[rival]) for team, _, rival in frames]
+
+
+def swiss_pairings(
+    ranking: List[int],
+    scores: Dict[int, int],
+    opponents: Dict[int, Set[int]],
+    had_bye: Set[int],
+    max_steps: int = SWISS_SEARCH_STEPS,
+) -> List[Pairing]:
+    """Cruces suizos entre equipos de igual puntaje evitando revanchas.
+
+    ranking viene ordenado por la tabla (puntaje y desempates); opponents tiene los
+    rivales ya enfrentados por cada equipo.
+    """
+    # Con cantidad impar queda libre el peor ubicado que todavía no tuvo bye; si así no
+    # hay cruces sin revancha se prueba con el siguiente
+    byes = [None]
+    if len(ranking) % 2:
+        byes = [team_id for team_id in reversed(ranking) if team_id not in had_bye]
+        byes = byes[:SWISS_BYE_CANDIDATES] or [ranking[-1]]
+
+    for bye in byes:
+        rest = [team_id for team_id in ranking if team_id != bye]
+        matches = _pair_without_rematches(rest, scores, opponents, max_steps)
+        if matches is not None:
+            return matches + ([(bye, None)] if bye is not None else [])
+
+    # Sin solución (rondas de más para la cantidad de equipos): se repite algún cruce
+    bye = byes[0]
+    matches = []
+    unpaired = [team_id for team_id in ranking if team_id != bye]
+    while unpaired:
+        team_id = unpaired.pop(0)
+        played = opponents.get(team_id, ())
+        rival = next((other for other in unpaired if other not in played), unpaired[0])
+        unpaired.remove(rival)
+        matches.append((team_id, rival))
+    return matches + ([(bye, None)] if bye is not None else [])
@@ -1,5 +1,7 @@
+import pandas as pd
 import streamlit as st
 from src.utils import draw_palitos
+from src.simulation import simulate_from_match
 
 
 def get_last_round(game, match_id):
@@ -56,7 +58,9 @@ def select_active_match(game) -> int:
     return match_id
 
 
-def show_match_points(team_scores: dict, teams: list[dict]) -> None:
+def show_match_points(
+    team_scores: dict, teams: list[dict], win_probability: dict | None = None
+) -> None:
     st.subheader("📊 Puntajes Actuales")
     if teams:
         cols = st.columns(len(teams))
@@ -67,11 +71,59 @@ def show_match_points(team_scores: dict, teams: list[dict]) -> None:
                 st.write(f"Jugadores: {player_names}")
                 score = team_scores.get(team["id"], 0)
                 st.write(f"Puntaje: {score}/30")
+                if win_probability:
+                    chance = win_probability.get(team["id"], 0)
+                    st.caption(f"Probabilidad de ganar: {chance:.0%}")
                 st.markdown(draw_palitos(score), unsafe_allow_html=True)
     else:
         st.warning("No se encontraron equipos para esta partida")
 
 
+# Series de puntaje guardadas por partida; se recalculan sólo si cambia su versión
+TIMELINE_CACHE_ENTRIES = 64
+
+
+@st.cache_data(max_entries=TIMELINE_CACHE_ENTRIES, show_spinner=False)
+def get_score_timeline_frame(
+    db_path: str, match_id: int, version: tuple, _game
+) -> pd.DataFrame:
+    """Total acumulado de cada equipo por ronda (filas: rondas, columnas: equipos)"""
+    timeline = pd.DataFrame(_game.get_score_timeline(match_id))
+    if timeline.empty:
+        return timeline
+    frame = timeline.pivot(index="round_number", columns="team_id", values="total")
+    # La partida arranca en 0 para todos los equipos
+    frame.loc[0] = 0
+    return frame.sort_index()
+
+
+def show_score_timeline(game, match_id: int, teams: list[dict]) -> None:
+    frame = get_score_timeline_frame(
+        game.db_path, match_id, game.get_match_version(match_id), game
+    )
+    if frame.empty:
+        return
+    with st.expander("📈 Evolución del puntaje"):
+        names = {team["id"]: team["name"] for team in teams}
+        chart = frame.rename(columns=names)
+        chart.index.name = "Ronda"
+        st.line_chart(chart)
+
+
+def show_match_simulation(game, match_id: int, teams: list[dict]) -> None:
+    with st.expander("🎲 Simular resto de la partida"):
+        if st.button("Simular", key=f"simulate_{match_id}"):
+            result = simulate_from_match(game, match_id)
+            cols = st.columns(len(teams))
+            for i, team in enumerate(teams):
+                with cols[i]:
+                    probability = result["win_probability"].get(team["id"], 0)
+                    st.metric(team["name"], f"{probability:.0%}")
+            st.caption(
+                f"Rondas restantes esperadas: {result['expected_rounds']:.1f}"
+            )
+
+
 def get_round_info(game, match_id, players, match_info) -> tuple[str, str, int]:
     last_round = get_last_round(game, match_id)
     current_dealer_name, current_dealer_position = get_current_dealer(
@@ -105,12 +157,7 @@ def check_match_finished(game, match_id, team_scores):
             st.write("**Ganador: Equipo desconocido**")
 
         if st.button("Marcar partida como terminada"):
-            cursor = game.conn.cursor()
-            cursor.execute(
-                "UPDATE matches SET status = 'terminada' WHERE id = ?",
-                (match_id,),
-            )
-            game.conn.commit()
+            game.finish_match(match_id)
             st.rerun()
         return True
     return False
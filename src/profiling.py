@@ -0,0 +1,175 @@
+import cProfile
+import json
+import os
+import pstats
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# Carpeta donde se guardan los perfiles (.pstats y JSON de speedscope)
+PROFILE_DIR = os.environ.get("TRUCO_PROFILE_DIR", "profiles")
+TOP_FUNCTIONS = 15
+# Ramas del árbol de speedscope más livianas que esto (en ms) se descartan
+MIN_BRANCH_MS = 0.05
+MAX_DEPTH = 60
+
+
+def _frame_name(function: tuple) -> str:
+    """Nombre legible de una función de pstats: (archivo, línea, nombre)"""
+    filename, line, name = function
+    if filename == "~":
+        return name  # funciones built-in
+    return f"{name} ({os.path.basename(filename)}:{line})"
+
+
+def _speedscope_profile(stats: pstats.Stats, name: str) -> dict:
+    """Convertir el grafo llamador/llamado de pstats en un perfil muestreado de speedscope
+
+    cProfile no guarda pilas completas, así que el tiempo de cada llamada se reparte
+    entre sus llamados en proporción al tiempo que cada arista aporta.
+    """
+    raw = stats.stats
+    callees = {function: {} for function in raw}
+    for function, (_, _, _, _, callers) in raw.items():
+        for caller, (_, _, _, cumulative) in callers.items():
+            if caller in callees:
+                callees[caller][function] = cumulative
+
+    frames = []
+    frame_index = {}
+    samples = []
+    weights = []
+
+    def index(function):
+        if function not in frame_index:
+            filename, line, _ = function
+            frame_index[function] = len(frames)
+            frames.append({"name": _frame_name(function), "file": filename, "line": line})
+        return frame_index[function]
+
+    def walk(function, weight_ms, stack):
+        cumulative = raw[function][3]
+        stack = stack + [index(function)]
+        scale = weight_ms / (cumulative * 1000) if cumulative else 0.0
+
+        children = {}
+        if len(stack) < MAX_DEPTH:
+            for callee, edge_cumulative in callees[function].items():
+                child_ms = edge_cumulative * 1000 * scale
+                # Evitar ciclos: una función recursiva no se vuelve a expandir
+                if child_ms < MIN_BRANCH_MS or frame_index.get(callee) in stack:
+                    continue
+                children[callee] = child_ms
+
+        # Con recursión los acumulados se solapan: nunca repartir más que el peso propio
+        children_ms = sum(children.values())
+        factor = min(1.0, weight_ms / children_ms) if children_ms else 0.0
+        for callee, child_ms in children.items():
+            walk(callee, child_ms * factor, stack)
+
+        self_ms = weight_ms - children_ms * factor
+        if self_ms > 0:
+            samples.append(stack)
+            weights.append(self_ms)
+
+    roots = [function for function, values in raw.items() if not values[4]]
+    for root in roots:
+        walk(root, raw[root][3] * 1000, [])
+
+    total_ms = sum(weights)
+    return {
+        "$schema": "https://www.speedscope.app/file-format-schema.json",
+        "shared": {"frames": frames},
+        "profiles": [
+            {
+                "type": "sampled",
+                "name": name,
+                "unit": "milliseconds",
+                "startValue": 0,
+                "endValue": total_ms,
+                "samples": samples,
+                "weights": weights,
+            }
+        ],
+        "name": name,
+        "exporter": "truco",
+    }
+
+
+def _top_functions(stats: pstats.Stats) -> list[dict]:
+    """Funciones con más tiempo propio del perfil"""
+    rows = [
+        {
+            "Función": _frame_name(function),
+            "Llamadas": calls,
+            "Propio (ms)": round(own * 1000, 2),
+            "Acumulado (ms)": round(cumulative * 1000, 2),
+        }
+        for function, (_, calls, own, cumulative, _) in stats.stats.items()
+    ]
+    rows.sort(key=lambda row: row["Propio (ms)"], reverse=True)
+    return rows[:TOP_FUNCTIONS]
+
+
+def _save_profile(profiler: cProfile.Profile) -> dict:
+    """Guardar el perfil como .pstats y speedscope y devolver su resumen"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    name = datetime.now().strftime("rerun-%Y%m%d-%H%M%S-%f")
+    pstats_path = os.path.join(PROFILE_DIR, f"{name}.pstats")
+    speedscope_path = os.path.join(PROFILE_DIR, f"{name}.speedscope.json")
+
+    profiler.dump_stats(pstats_path)
+    stats = pstats.Stats(profiler)
+    with open(speedscope_path, "w") as f:
+        json.dump(_speedscope_profile(stats, name), f)
+
+    return {
+        "pstats": pstats_path,
+        "speedscope": speedscope_path,
+        "total_ms": stats.total_tt * 1000,
+        "top": _top_functions(stats),
+    }
+
+
+def _profile_requested() -> bool:
+    """Indicar si esta ejecución se pidió perfilar (por ?profile=1 o desde la barra lateral)"""
+    if st.session_state.pop("profile_next_run", False):
+        return True
+    if "profile" in st.query_params:
+        # Sólo se perfila una ejecución: el parámetro se consume
+        del st.query_params["profile"]
+        return True
+    return False
+
+
+def show_profile_controls():
+    """Mostrar el botón para perfilar y el resumen del último perfil"""
+    with st.sidebar.expander("⏱️ Perfilado"):
+        if st.button("Perfilar la próxima ejecución", key="profile_button"):
+            st.session_state["profile_next_run"] = True
+            st.caption("La próxima interacción quedará perfilada.")
+
+        last_profile = st.session_state.get("last_profile")
+        if last_profile:
+            st.write(f"**Último perfil:** {last_profile['total_ms']:.0f} ms")
+            st.caption(f"{last_profile['pstats']}\n\n{last_profile['speedscope']}")
+            st.dataframe(pd.DataFrame(last_profile["top"]), hide_index=True)
+
+
+def run_with_profiling(app):
+    """Ejecutar la app, perfilándola con cProfile cuando se lo pidió"""
+    if not _profile_requested():
+        app()
+        show_profile_controls()
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        app()
+    finally:
+        # También se guarda si la ejecución termina con st.rerun() (ej. al enviar una ronda)
+        profiler.disable()
+        st.session_state["last_profile"] = _save_profile(profiler)
+    show_profile_controls()
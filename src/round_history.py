@@ -2,15 +2,19 @@ import streamlit as st
 from src.truco import TrucoGame
 
 
-def round_history(game: TrucoGame, match_id: int, players: list, team_scores: dict):
+def round_history(
+    game: TrucoGame, match_id: int, players: list, team_scores: dict, reader: TrucoGame = None
+):
+    """Historial de la partida; se lee de reader (la réplica) y se edita o borra en game"""
+    reader = reader or game
     # Historial de Rondas
     st.subheader("📜 Historial de Rondas")
 
-    rounds_history = game.get_match_rounds(match_id)
+    rounds_history = reader.get_match_rounds(match_id)
 
     if rounds_history:
         # Get teams for this match
-        teams = game.get_match_teams_with_players(match_id)
+        teams = reader.get_match_teams_with_players(match_id)
 
         # Show team scores summary
         if teams:
@@ -21,6 +25,9 @@ def round_history(game: TrucoGame, match_id: int, players: list, team_scores: di
                     score = team_scores.get(team["id"], 0)
                     st.metric(team["name"], f"{score} puntos")
 
+        if st.toggle("🕰️ Ver la partida en una ronda anterior", key=f"as_of_{match_id}"):
+            show_match_state(reader, match_id, rounds_history, teams)
+
         st.write("---")
 
         for round_data in rounds_history:
@@ -33,7 +40,7 @@ def round_history(game: TrucoGame, match_id: int, players: list, team_scores: di
                 col_summary, col_edit = st.columns([4, 1])
 
                 with col_summary:
-                    summary = game.format_round_summary(round_data)
+                    summary = reader.get_round_summary(round_data)
                     st.text(summary)
 
                 with col_edit:
@@ -49,152 +56,249 @@ def round_history(game: TrucoGame, match_id: int, players: list, team_scores: di
                 # Formulario de edición
                 if st.session_state.get(f"editing_{round_data['id']}", False):
                     st.write("**Editando Ronda:**")
+                    # El formulario parte de la ronda en la base principal, no de la réplica
+                    round_data = game.get_round(round_data["id"]) or round_data
 
                     if round_data["round_type"] == "redondo":
-                        with st.form(f"edit_redondo_{round_data['id']}"):
-                            # Obtener valores actuales
-                            current_truco_team = None
-                            current_truco_points = 0
-                            current_envido_team = None
-                            current_envido_points = 0
-
-                            for score in round_data["scores"]:
-                                if score["truco_winner_team_id"]:
-                                    current_truco_team = score["truco_winner_team_id"]
-                                    current_truco_points = score["truco_points"]
-                                if score["envido_winner_team_id"]:
-                                    current_envido_team = score["envido_winner_team_id"]
-                                    current_envido_points = score["envido_points"]
-
-                            col1, col2 = st.columns(2)
-
-                            with col1:
-                                st.write("**Truco**")
-                                truco_options = [None] + [team["id"] for team in teams]
-
-                                truco_default = None
-                                if current_truco_team:
-                                    truco_default = current_truco_team
-
-                                new_truco_winner = st.selectbox(
-                                    "Ganador del Truco",
-                                    options=truco_options,
-                                    index=truco_options.index(truco_default),
-                                    format_func=lambda x: (
-                                        "Ninguno"
-                                        if x is None
-                                        else next(
-                                            team["name"]
-                                            for team in teams
-                                            if team["id"] == x
-                                        )
-                                    ),
-                                    key=f"edit_truco_winner_{round_data['id']}",
-                                )
-                                new_truco_points = st.selectbox(
-                                    "Puntos de Truco",
-                                    [1, 2, 3, 4],
-                                    index=(
-                                        [1, 2, 3, 4].index(current_truco_points)
-                                        if current_truco_points > 0
-                                        else 0
-                                    ),
-                                    key=f"edit_truco_points_{round_data['id']}",
-                                )
-
-                            with col2:
-                                st.write("**Envido**")
-                                envido_options = [None] + [team["id"] for team in teams]
-
-                                envido_default = None
-                                if current_envido_team:
-                                    envido_default = current_envido_team
-
-                                new_envido_winner = st.selectbox(
-                                    "Ganador del Envido",
-                                    options=envido_options,
-                                    index=envido_options.index(envido_default),
-                                    format_func=lambda x: (
-                                        "Ninguno"
-                                        if x is None
-                                        else next(
-                                            team["name"]
-                                            for team in teams
-                                            if team["id"] == x
-                                        )
-                                    ),
-                                    key=f"edit_envido_winner_{round_data['id']}",
-                                )
-                                new_envido_points = st.selectbox(
-                                    "Puntos de Envido",
-                                    [1, 2, 4, 5, 6],
-                                    index=(
-                                        [1, 2, 4, 5, 6].index(current_envido_points)
-                                        if current_envido_points > 0
-                                        else 0
-                                    ),
-                                    key=f"edit_envido_points_{round_data['id']}",
-                                )
-
-                            col_save, col_cancel = st.columns(2)
-
-                            with col_save:
-                                if st.form_submit_button("💾 Guardar Cambios"):
-                                    if (
-                                        new_truco_winner is None
-                                        and new_envido_winner is None
-                                    ):
-                                        st.error(
-                                            "Al menos un equipo debe ganar Truco o Envido"
-                                        )
-                                    else:
-                                        # Eliminar puntajes existentes
-                                        cursor = game.conn.cursor()
-                                        cursor.execute(
-                                            "DELETE FROM redondo_scores WHERE round_id = ?",
-                                            (round_data["id"],),
-                                        )
-
-                                        # Agregar nuevos puntajes
-                                        new_truco_team = (
-                                            new_truco_winner
-                                            if new_truco_winner != "Ninguno"
-                                            else None
-                                        )
-                                        new_envido_team = (
-                                            new_envido_winner
-                                            if new_envido_winner != "Ninguno"
-                                            else None
-                                        )
-
-                                        game.add_redondo_score(
-                                            round_data["id"],
-                                            new_truco_team,
-                                            new_truco_points,
-                                            new_envido_team,
-                                            new_envido_points,
-                                        )
-
-                                        st.session_state[
-                                            f"editing_{round_data['id']}"
-                                        ] = False
-                                        st.success("Ronda actualizada!")
-                                        st.rerun()
-
-                            with col_cancel:
-                                if st.form_submit_button("❌ Cancelar"):
-                                    st.session_state[f"editing_{round_data['id']}"] = (
-                                        False
-                                    )
-                                    st.rerun()
-
-                    else:  # pica-pica editing
-                        st.info(
-                            "La edición de rondas pica-pica estará disponible en una "
-                            "futura actualización."
-                        )
-                        if st.button("❌ Cerrar", key=f"close_edit_{round_data['id']}"):
-                            st.session_state[f"editing_{round_data['id']}"] = False
-                            st.rerun()
+                        edit_redondo_form(game, round_data, teams)
+                    else:
+                        edit_pica_pica_form(game, round_data, players)
     else:
         st.info("No se han jugado rondas aún.")
+
+
+def show_match_state(game: TrucoGame, match_id: int, rounds_history: list, teams: list):
+    """Puntajes, pie y falta envido tal como estaban al terminar la ronda elegida"""
+    round_numbers = sorted(round_data["round_number"] for round_data in rounds_history)
+    as_of = st.select_slider(
+        "Ronda",
+        options=round_numbers,
+        value=round_numbers[-1],
+        key=f"as_of_round_{match_id}",
+    )
+    state = game.get_match_state(match_id, as_of)
+
+    cols = st.columns(len(teams))
+    for i, team in enumerate(teams):
+        with cols[i]:
+            score = state["team_scores"].get(team["id"], 0)
+            st.metric(team["name"], f"{score} puntos")
+
+    st.write(
+        f"**Ronda {state['round_number']}:** {state['round_type'].title()} "
+        f"(Pie: {state['dealer_name']})"
+    )
+    if state["finished"]:
+        st.write("**Partida terminada en esta ronda**")
+    else:
+        st.write(
+            f"**Próxima ronda:** {state['next_round_type'].title()} "
+            f"(Pie: {state['next_dealer_name']}) - "
+            f"Falta Envido x {state['falta_envido_points']}"
+        )
+
+
+def _points_options(options: list, current: int) -> list:
+    """Opciones de puntos que incluyen el valor guardado (p. ej. una falta envido)"""
+    return sorted(set(options) | {current}) if current else options
+
+
+def _save_round(game: TrucoGame, round_data, scores: list):
+    """Guardar la edición de una ronda y cerrar el formulario"""
+    try:
+        game.edit_round(round_data["id"], scores)
+    except ValueError as e:
+        st.error(str(e))
+        return
+    st.session_state[f"editing_{round_data['id']}"] = False
+    st.rerun()
+
+
+def _cancel_edit(round_data):
+    st.session_state[f"editing_{round_data['id']}"] = False
+    st.rerun()
+
+
+def edit_redondo_form(game: TrucoGame, round_data, teams: list):
+    """Formulario para corregir los puntajes de una ronda redonda"""
+    with st.form(f"edit_redondo_{round_data['id']}"):
+        # Obtener valores actuales
+        current_truco_team = None
+        current_truco_points = 0
+        current_envido_team = None
+        current_envido_points = 0
+
+        for score in round_data["scores"]:
+            if score["truco_winner_team_id"]:
+                current_truco_team = score["truco_winner_team_id"]
+                current_truco_points = score["truco_points"]
+            if score["envido_winner_team_id"]:
+                current_envido_team = score["envido_winner_team_id"]
+                current_envido_points = score["envido_points"]
+
+        team_options = [None] + [team["id"] for team in teams]
+
+        def team_name(team_id):
+            if team_id is None:
+                return "Ninguno"
+            return next(team["name"] for team in teams if team["id"] == team_id)
+
+        col1, col2 = st.columns(2)
+
+        with col1:
+            st.write("**Truco**")
+            new_truco_winner = st.selectbox(
+                "Ganador del Truco",
+                options=team_options,
+                index=team_options.index(current_truco_team),
+                format_func=team_name,
+                key=f"edit_truco_winner_{round_data['id']}",
+            )
+            truco_options = _points_options([1, 2, 3, 4], current_truco_points)
+            new_truco_points = st.selectbox(
+                "Puntos de Truco",
+                truco_options,
+                index=(
+                    truco_options.index(current_truco_points)
+                    if current_truco_points > 0
+                    else 0
+                ),
+                key=f"edit_truco_points_{round_data['id']}",
+            )
+
+        with col2:
+            st.write("**Envido**")
+            new_envido_winner = st.selectbox(
+                "Ganador del Envido",
+                options=team_options,
+                index=team_options.index(current_envido_team),
+                format_func=team_name,
+                key=f"edit_envido_winner_{round_data['id']}",
+            )
+            envido_options = _points_options([1, 2, 4, 5, 7], current_envido_points)
+            new_envido_points = st.selectbox(
+                "Puntos de Envido",
+                envido_options,
+                index=(
+                    envido_options.index(current_envido_points)
+                    if current_envido_points > 0
+                    else 0
+                ),
+                key=f"edit_envido_points_{round_data['id']}",
+            )
+
+        col_save, col_cancel = st.columns(2)
+
+        with col_save:
+            if st.form_submit_button("💾 Guardar Cambios"):
+                if new_truco_winner is None and new_envido_winner is None:
+                    st.error("Al menos un equipo debe ganar Truco o Envido")
+                else:
+                    _save_round(
+                        game,
+                        round_data,
+                        [
+                            {
+                                "truco_winner_team_id": new_truco_winner,
+                                "truco_points": new_truco_points if new_truco_winner else 0,
+                                "envido_winner_team_id": new_envido_winner,
+                                "envido_points": (
+                                    new_envido_points if new_envido_winner else 0
+                                ),
+                            }
+                        ],
+                    )
+
+        with col_cancel:
+            if st.form_submit_button("❌ Cancelar"):
+                _cancel_edit(round_data)
+
+
+def edit_pica_pica_form(game: TrucoGame, round_data, players: list):
+    """Formulario para corregir los enfrentamientos de una ronda pica-pica"""
+    players_count = len(players)
+    first_player_pos = (round_data["dealer_position"] + 1) % players_count
+    nicknames = {player["player_id"]: player["nickname"] for player in players}
+
+    # Valores actuales de cada sub-ronda
+    current = {}
+    for score in round_data["scores"]:
+        current.setdefault(score["sub_round"], score)
+
+    def player_name(player_id):
+        return "Ninguno" if player_id is None else nicknames[player_id]
+
+    with st.form(f"edit_pica_pica_{round_data['id']}"):
+        new_scores = []
+        for sub_round in range(1, players_count // 2 + 1):
+            # Mismos enfrentamientos que al cargar la ronda
+            player1_pos = (first_player_pos + sub_round - 1) % players_count
+            player2_pos = (player1_pos + players_count // 2) % players_count
+            player1 = next(p for p in players if p["position"] == player1_pos)
+            player2 = next(p for p in players if p["position"] == player2_pos)
+            st.write(
+                f"**Sub-ronda {sub_round}: {player1['nickname']} vs {player2['nickname']}**"
+            )
+
+            score = current.get(sub_round, {})
+            player_options = [None, player1["player_id"], player2["player_id"]]
+            key = f"{round_data['id']}_{sub_round}"
+            col_truco, col_envido = st.columns(2)
+
+            with col_truco:
+                winner = score.get("truco_winner_id")
+                truco_winner = st.selectbox(
+                    "Ganador del Truco",
+                    options=player_options,
+                    index=player_options.index(winner) if winner in player_options else 0,
+                    format_func=player_name,
+                    key=f"edit_truco_winner_{key}",
+                )
+                current_points = score.get("truco_points") or 0
+                truco_options = _points_options([1, 2, 3, 4], current_points)
+                truco_points = st.selectbox(
+                    "Puntos de Truco",
+                    truco_options,
+                    index=truco_options.index(current_points) if current_points else 0,
+                    key=f"edit_truco_points_{key}",
+                )
+
+            with col_envido:
+                winner = score.get("envido_winner_id")
+                envido_winner = st.selectbox(
+                    "Ganador del Envido",
+                    options=player_options,
+                    index=player_options.index(winner) if winner in player_options else 0,
+                    format_func=player_name,
+                    key=f"edit_envido_winner_{key}",
+                )
+                current_points = score.get("envido_points") or 0
+                envido_options = _points_options([1, 2, 4, 5, 7], current_points)
+                envido_points = st.selectbox(
+                    "Puntos de Envido",
+                    envido_options,
+                    index=envido_options.index(current_points) if current_points else 0,
+                    key=f"edit_envido_points_{key}",
+                )
+
+            # Como al cargar la ronda, sólo se guardan las sub-rondas con puntos
+            if truco_winner or envido_winner:
+                new_scores.append(
+                    {
+                        "truco_winner_id": truco_winner,
+                        "truco_points": truco_points if truco_winner else 0,
+                        "envido_winner_id": envido_winner,
+                        "envido_points": envido_points if envido_winner else 0,
+                        "sub_round": sub_round,
+                    }
+                )
+
+        col_save, col_cancel = st.columns(2)
+
+        with col_save:
+            if st.form_submit_button("💾 Guardar Cambios"):
+                _save_round(game, round_data, new_scores)
+
+        with col_cancel:
+            if st.form_submit_button("❌ Cancelar"):
+                _cancel_edit(round_data)
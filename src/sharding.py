@@ -0,0 +1,156 @@
+import argparse
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional
+
+from src.db_connection import DB_PATH, init_database
+
+# Cada sede o torneo tiene su propia base en esta carpeta
+SHARD_DIR = os.environ.get("TRUCO_SHARD_DIR", "shards")
+# La base principal (truco_game.db) se sigue usando cuando no se elige sede
+DEFAULT_SHARD = "principal"
+FAN_OUT_WORKERS = 8
+
+_ORDERS = {
+    "wins": lambda row: (-row["wins"], -row["win_rate"], -row["points_for"], row["name"]),
+    "win_rate": lambda row: (-row["win_rate"], -row["wins"], -row["points_for"], row["name"]),
+    "points": lambda row: (-row["points_for"], -row["wins"], -row["win_rate"], row["name"]),
+}
+
+
+def _slug(key: str) -> str:
+    """Nombre de archivo seguro para una clave de sede o torneo"""
+    slug = re.sub(r"[^a-z0-9]+", "-", key.strip().lower()).strip("-")
+    if not slug:
+        raise ValueError(f"Clave de sede inválida: {key!r}")
+    return slug
+
+
+def shard_path(key: Optional[str]) -> str:
+    """Ruta de la base que corresponde a una sede o torneo"""
+    if key is None or _slug(key) == DEFAULT_SHARD:
+        return DB_PATH
+    return os.path.join(SHARD_DIR, f"{_slug(key)}.db")
+
+
+def create_shard(key: str) -> str:
+    """Crear (si no existe) la base de una sede con todas sus tablas"""
+    path = shard_path(key)
+    if path != DB_PATH:
+        os.makedirs(SHARD_DIR, exist_ok=True)
+    init_database(path)
+    return path
+
+
+def list_shards() -> List[str]:
+    """Sedes disponibles: la principal más las que tienen base propia"""
+    shards = [DEFAULT_SHARD]
+    if os.path.isdir(SHARD_DIR):
+        shards.extend(
+            sorted(name[:-3] for name in os.listdir(SHARD_DIR) if name.endswith(".db"))
+        )
+    return shards
+
+
+def fan_out(fn: Callable, shards: Optional[List[str]] = None) -> Dict[str, object]:
+    """Ejecutar una lectura en cada sede en paralelo; devuelve {sede: resultado}"""
+    # Import diferido: truco.py importa este módulo para resolver las sedes
+    from src.truco import TrucoGame
+
+    shards = shards or list_shards()
+
+    def read(key):
+        game = TrucoGame(shard=key, read_only=True)
+        try:
+            return fn(game)
+        finally:
+            game.conn.close()
+
+    with ThreadPoolExecutor(max_workers=min(FAN_OUT_WORKERS, len(shards))) as pool:
+        return dict(zip(shards, pool.map(read, shards)))
+
+
+def global_leaderboard(
+    kind: str = "player",
+    players_counts: Optional[List[int]] = None,
+    date_from: Optional[str] = None,
+    date_to: Optional[str] = None,
+    order_by: str = "wins",
+    limit: Optional[int] = 20,
+    offset: int = 0,
+    shards: Optional[List[str]] = None,
+) -> List[Dict]:
+    """Ranking de todas las sedes; jugadores y equipos se unen por nombre (limit=None: todo)"""
+    if order_by not in _ORDERS:
+        raise ValueError(f"Orden de ranking desconocido: {order_by}")
+
+    per_shard = fan_out(
+        lambda game: game.get_leaderboard(
+            kind, players_counts, date_from, date_to, order_by, limit=-1
+        ),
+        shards,
+    )
+
+    merged = {}
+    for rows in per_shard.values():
+        for row in rows:
+            entry = merged.setdefault(
+                row["name"],
+                {
+                    "name": row["name"],
+                    "played": 0,
+                    "wins": 0,
+                    "losses": 0,
+                    "points_for": 0,
+                    "points_against": 0,
+                },
+            )
+            for column in ("played", "wins", "losses", "points_for", "points_against"):
+                entry[column] += row[column]
+
+    # Mismas columnas (y orden) que TrucoGame.get_leaderboard, sin el id por sede
+    ranking = [
+        {
+            "name": entry["name"],
+            "played": entry["played"],
+            "wins": entry["wins"],
+            "losses": entry["losses"],
+            "win_rate": entry["wins"] / entry["played"],
+            "points_for": entry["points_for"],
+            "points_against": entry["points_against"],
+        }
+        for entry in merged.values()
+    ]
+    ranking.sort(key=_ORDERS[order_by])
+    if limit is None:
+        return ranking[offset:]
+    return ranking[offset : offset + limit]
+
+
+def search_players(prefix: str = "", limit: int = 20, shards: Optional[List[str]] = None) -> List[Dict]:
+    """Buscar jugadores en todas las sedes; devuelve apodo y sedes donde aparece"""
+    per_shard = fan_out(lambda game: game.search_users(prefix, limit), shards)
+
+    players = {}
+    for key, users in per_shard.items():
+        for user in users:
+            players.setdefault(user["nickname"], []).append(key)
+
+    nicknames = sorted(players, key=str.lower)[:limit]
+    return [{"nickname": nickname, "shards": players[nickname]} for nickname in nicknames]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Administrar las bases por sede o torneo")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    create = subparsers.add_parser("create", help="crear la base de una sede")
+    create.add_argument("key")
+    subparsers.add_parser("list", help="listar las sedes")
+    args = parser.parse_args()
+
+    if args.command == "create":
+        print(create_shard(args.key))
+    else:
+        for key in list_shards():
+            print(f"{key}\t{shard_path(key)}")
@@ -0,0 +1,288 @@
+import numpy as np
+from typing import Dict, Optional
+
+from src.truco import TrucoGame
+
+WINNING_POINTS = 30
+PICA_PICA_START_POINTS = 5
+FALTA_ENVIDO_PICA_PICA = 6
+TRUCO_POINTS = [1, 2, 3, 4]
+ENVIDO_POINTS = [1, 2, 4, 5, 7]
+
+# Distribución a priori usada para suavizar el historial (y cuando no hay datos)
+DEFAULT_DISTRIBUTION = {
+    "truco": {1: 0.45, 2: 0.3, 3: 0.15, 4: 0.1},
+    "envido_rate": 0.5,
+    "envido": {1: 0.15, 2: 0.5, 4: 0.15, 5: 0.1, 7: 0.1},
+    "falta_rate": 0.05,
+}
+PRIOR_WEIGHT = 10
+LOOKUP_SIZE = 1 << 16
+
+
+def _smooth(counts: Dict[int, int], prior: Dict[int, float]) -> Dict[int, float]:
+    """Combinar conteos observados con la distribución a priori"""
+    total = sum(counts.values()) + PRIOR_WEIGHT
+    return {
+        value: (counts.get(value, 0) + PRIOR_WEIGHT * p) / total
+        for value, p in prior.items()
+    }
+
+
+def _fit_round_type(rows) -> Dict:
+    """Ajustar la distribución de puntos de un tipo de ronda a partir de sus filas"""
+    truco_counts = {}
+    envido_counts = {}
+    envido_sung = 0
+    falta_count = 0
+
+    for truco_winner, truco_points, envido_winner, envido_points in rows:
+        if truco_winner and truco_points in TRUCO_POINTS:
+            truco_counts[truco_points] = truco_counts.get(truco_points, 0) + 1
+        if envido_winner and envido_points:
+            envido_sung += 1
+            if envido_points in ENVIDO_POINTS:
+                envido_counts[envido_points] = envido_counts.get(envido_points, 0) + 1
+            else:
+                # Valores fuera de la lista solo pueden venir de una falta envido
+                falta_count += 1
+
+    prior = DEFAULT_DISTRIBUTION
+    return {
+        "truco": _smooth(truco_counts, prior["truco"]),
+        "envido_rate": (envido_sung + PRIOR_WEIGHT * prior["envido_rate"])
+        / (len(rows) + PRIOR_WEIGHT),
+        "envido": _smooth(envido_counts, prior["envido"]),
+        "falta_rate": (falta_count + PRIOR_WEIGHT * prior["falta_rate"])
+        / (envido_sung + PRIOR_WEIGHT),
+    }
+
+
+def fit_point_distributions(game: TrucoGame) -> Dict[str, Dict]:
+    """Ajustar distribuciones de puntos por ronda desde el historial de puntajes"""
+    cursor = game.conn.cursor()
+    cursor.execute(
+        """
+        SELECT truco_winner_team_id, truco_points, envido_winner_team_id, envido_points
+        FROM redondo_scores
+    """
+    )
+    redondo_rows = [tuple(row) for row in cursor.fetchall()]
+
+    cursor.execute(
+        """
+        SELECT truco_winner_id, truco_points, envido_winner_id, envido_points
+        FROM pica_pica_scores
+    """
+    )
+    pica_pica_rows = [tuple(row) for row in cursor.fetchall()]
+
+    return {
+        "redondo": _fit_round_type(redondo_rows),
+        "pica-pica": _fit_round_type(pica_pica_rows),
+    }
+
+
+def falta_envido_redondo(max_scores: np.ndarray) -> np.ndarray:
+    """Versión vectorizada de calculate_falta_envido_points para rondas redondas"""
+    return np.where(max_scores < 15, WINNING_POINTS, WINNING_POINTS - max_scores).astype(
+        np.int16
+    )
+
+
+def round_outcomes(distribution: Dict) -> Dict[str, np.ndarray]:
+    """Enumerar resultados posibles de un enfrentamiento (truco y envido) con su probabilidad
+
+    Las columnas falta1/falta2 marcan qué equipo ganó una falta envido, cuyo valor
+    depende del estado de la partida y se resuelve al aplicar el resultado.
+    """
+    outcomes = []
+    envido_options = [(0, False, 1 - distribution["envido_rate"])]
+    for points, p in distribution["envido"].items():
+        envido_options.append(
+            (points, False, distribution["envido_rate"] * (1 - distribution["falta_rate"]) * p)
+        )
+    envido_options.append((0, True, distribution["envido_rate"] * distribution["falta_rate"]))
+
+    for truco_team in (0, 1):
+        for truco_points, truco_p in distribution["truco"].items():
+            for envido_team in (0, 1):
+                for envido_points, is_falta, envido_p in envido_options:
+                    points = [0, 0]
+                    falta = [0, 0]
+                    points[truco_team] += truco_points
+                    points[envido_team] += envido_points
+                    falta[envido_team] += int(is_falta)
+                    outcomes.append(
+                        (0.25 * truco_p * envido_p, points[0], points[1], falta[0], falta[1])
+                    )
+
+    return _aggregate(np.array(outcomes, dtype=np.float64))
+
+
+def _aggregate(outcomes: np.ndarray) -> Dict[str, np.ndarray]:
+    """Sumar probabilidades de filas con los mismos puntos"""
+    keys, inverse = np.unique(outcomes[:, 1:], axis=0, return_inverse=True)
+    probability = np.zeros(len(keys))
+    np.add.at(probability, inverse.ravel(), outcomes[:, 0])
+    return {
+        "probability": probability,
+        "team1": keys[:, 0].astype(np.int16),
+        "team2": keys[:, 1].astype(np.int16),
+        "falta1": keys[:, 2].astype(np.int16),
+        "falta2": keys[:, 3].astype(np.int16),
+    }
+
+
+def _combine(first: Dict[str, np.ndarray], second: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Distribución de la suma de dos enfrentamientos independientes"""
+    rows = np.column_stack(
+        [np.outer(first["probability"], second["probability"]).ravel()]
+        + [
+            np.add.outer(first[key], second[key]).ravel()
+            for key in ("team1", "team2", "falta1", "falta2")
+        ]
+    )
+    return _aggregate(rows)
+
+
+def pica_pica_outcomes(distribution: Dict, sub_rounds: int = 3) -> Dict[str, np.ndarray]:
+    """Distribución de puntos por equipo de una ronda pica-pica completa"""
+    single = round_outcomes(distribution)
+    # En pica-pica la falta envido vale siempre lo mismo
+    single["team1"] = single["team1"] + single.pop("falta1") * FALTA_ENVIDO_PICA_PICA
+    single["team2"] = single["team2"] + single.pop("falta2") * FALTA_ENVIDO_PICA_PICA
+    single["falta1"] = np.zeros_like(single["team1"])
+    single["falta2"] = np.zeros_like(single["team2"])
+
+    combined = single
+    for _ in range(sub_rounds - 1):
+        combined = _combine(combined, single)
+    return combined
+
+
+def _lookup_table(outcomes: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """Tabla de 65536 entradas para muestrear resultados con un solo entero aleatorio"""
+    cdf = np.cumsum(outcomes["probability"])
+    cdf /= cdf[-1]
+    positions = (np.arange(LOOKUP_SIZE) + 0.5) / LOOKUP_SIZE
+    index = np.minimum(np.searchsorted(cdf, positions), len(cdf) - 1)
+    return {key: values[index] for key, values in outcomes.items() if key != "probability"}
+
+
+def _apply_round(
+    rng: np.random.Generator,
+    team1: np.ndarray,
+    team2: np.ndarray,
+    table: Dict[str, np.ndarray],
+    falta_points,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Sortear y sumar los puntos de una ronda a cada simulación"""
+    draw = rng.integers(0, LOOKUP_SIZE, len(team1), dtype=np.uint16)
+    team1 = team1 + table["team1"][draw] + table["falta1"][draw] * falta_points
+    team2 = team2 + table["team2"][draw] + table["falta2"][draw] * falta_points
+    return team1, team2
+
+
+def simulate_match(
+    team_scores: Dict[int, int],
+    next_round_type: str,
+    players_count: int,
+    pica_pica_end_points: int,
+    pica_pica_enabled: bool = True,
+    distributions: Optional[Dict[str, Dict]] = None,
+    n_simulations: int = 200_000,
+    seed: Optional[int] = None,
+) -> Dict:
+    """Simular el resto de la partida y estimar probabilidad de victoria y rondas restantes"""
+    if len(team_scores) != 2:
+        raise ValueError("La simulación requiere exactamente 2 equipos")
+    if distributions is None:
+        distributions = {
+            "redondo": DEFAULT_DISTRIBUTION,
+            "pica-pica": DEFAULT_DISTRIBUTION,
+        }
+
+    rng = np.random.default_rng(seed)
+    team_ids = list(team_scores.keys())
+    pica_pica_allowed = players_count == 6 and pica_pica_enabled
+    redondo_table = _lookup_table(round_outcomes(distributions["redondo"]))
+    pica_pica_table = _lookup_table(
+        pica_pica_outcomes(distributions["pica-pica"], players_count // 2)
+    )
+
+    # Solo se mantienen las simulaciones que siguen en juego
+    team1 = np.full(n_simulations, team_scores[team_ids[0]], dtype=np.int16)
+    team2 = np.full(n_simulations, team_scores[team_ids[1]], dtype=np.int16)
+    next_is_pica_pica = np.full(n_simulations, next_round_type == "pica-pica")
+    rounds_played = 0
+    team1_wins = 0
+    total_rounds = 0
+
+    if max(team_scores.values()) >= WINNING_POINTS:
+        if team_scores[team_ids[0]] >= WINNING_POINTS:
+            team1_wins = n_simulations
+        team1 = team2 = team1[:0]
+
+    # Cada ronda suma al menos un punto de truco, así que el bucle es acotado
+    while len(team1):
+        rounds_played += 1
+        is_pica_pica = next_is_pica_pica
+        falta = falta_envido_redondo(np.maximum(team1, team2))
+
+        if is_pica_pica.any():
+            redondo = ~is_pica_pica
+            team1[redondo], team2[redondo] = _apply_round(
+                rng, team1[redondo], team2[redondo], redondo_table, falta[redondo]
+            )
+            team1[is_pica_pica], team2[is_pica_pica] = _apply_round(
+                rng, team1[is_pica_pica], team2[is_pica_pica], pica_pica_table, 0
+            )
+        else:
+            team1, team2 = _apply_round(rng, team1, team2, redondo_table, falta)
+
+        # Los puntajes nunca superan 30 (igual que add_*_score)
+        np.minimum(team1, WINNING_POINTS, out=team1)
+        np.minimum(team2, WINNING_POINTS, out=team2)
+        max_scores = np.maximum(team1, team2)
+        finished = max_scores >= WINNING_POINTS
+
+        # Como en check_match_finished, ante empate en 30 gana el primer equipo
+        team1_wins += int(np.count_nonzero(team1 >= WINNING_POINTS))
+        total_rounds += rounds_played * int(np.count_nonzero(finished))
+
+        # Misma lógica que determine_round_type para la próxima ronda
+        still_playing = ~finished
+        next_is_pica_pica = (
+            pica_pica_allowed
+            & ~is_pica_pica
+            & (max_scores >= PICA_PICA_START_POINTS)
+            & (max_scores < pica_pica_end_points)
+        )[still_playing]
+        team1 = team1[still_playing]
+        team2 = team2[still_playing]
+
+    team1_probability = team1_wins / n_simulations
+
+    return {
+        "win_probability": {
+            team_ids[0]: team1_probability,
+            team_ids[1]: 1 - team1_probability,
+        },
+        "expected_rounds": total_rounds / n_simulations,
+    }
+
+
+def simulate_from_match(game: TrucoGame, match_id: int, **kwargs) -> Dict:
+    """Simular una partida en curso usando su estado actual y el historial de puntajes"""
+    match_info = game.get_match_info(match_id)
+    kwargs.setdefault("distributions", fit_point_distributions(game))
+
+    return simulate_match(
+        game.get_team_scores(match_id),
+        game.determine_round_type(match_id),
+        match_info["players_count"],
+        match_info["pica_pica_end_points"],
+        bool(match_info["pica_pica_enabled"]),
+        **kwargs,
+    )
@@ -0,0 +1,144 @@
+import argparse
+import logging
+import os
+import sqlite3
+import threading
+import time
+from typing import Optional
+
+import streamlit as st
+from src.db_connection import DB_PATH
+from src.metrics import Histogram
+from src.truco import TrucoGame
+
+# Cada cuánto se copia la base a la réplica de espectadores (0 la desactiva)
+SNAPSHOT_SECONDS = float(os.environ.get("TRUCO_SNAPSHOT_SECONDS", "30"))
+# La copia avanza de a este número de páginas, con una pausa entre pasos para que
+# los anotadores puedan escribir mientras tanto
+PAGES_PER_STEP = 256
+STEP_PAUSE_SECONDS = 0.002
+# Si la réplica no se pudo actualizar en este tiempo se lee de la base principal
+MAX_AGE_SECONDS = 3 * SNAPSHOT_SECONDS
+
+SNAPSHOT_REFRESH_SECONDS = Histogram(
+    "truco_snapshot_refresh_seconds", "Tiempo de copiar la base a la réplica de lectura."
+)
+
+logger = logging.getLogger(__name__)
+
+
+def replica_path(db_path: str = DB_PATH) -> str:
+    """Archivo de la réplica de una base, al lado de la base como sus -wal y -shm"""
+    # Sin terminar en .db: list_shards no la confunde con otra sede
+    return f"{db_path}-replica"
+
+
+def refresh_snapshot(db_path: str = DB_PATH) -> str:
+    """Copiar la base con la API de backup por pasos y reemplazar la réplica de una vez"""
+    target = replica_path(db_path)
+    temporary = f"{target}.tmp"
+    source = sqlite3.connect(f"file:{db_path}?mode=ro", uri=True)
+    destination = sqlite3.connect(temporary)
+    try:
+        with SNAPSHOT_REFRESH_SECONDS.time():
+            source.backup(
+                destination,
+                pages=PAGES_PER_STEP,
+                progress=lambda status, remaining, total: time.sleep(STEP_PAUSE_SECONDS),
+            )
+        # La réplica se abre sólo para leer: sin WAL no necesita archivos auxiliares
+        destination.execute("PRAGMA journal_mode = DELETE")
+    finally:
+        destination.close()
+        source.close()
+    # Los lectores ven la copia anterior o la nueva completa, nunca una a medias
+    os.replace(temporary, target)
+    return target
+
+
+class SnapshotRefresher:
+    """Hilo que mantiene la réplica de lectura al día cada SNAPSHOT_SECONDS"""
+
+    def __init__(self, db_path: str = DB_PATH, interval: float = SNAPSHOT_SECONDS):
+        self.db_path = db_path
+        self.interval = interval
+        # Momento en que empezó la última copia: todo lo escrito antes está en la réplica
+        self.refreshed_at = None
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(
+            target=self._loop, name="truco-snapshot", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+    def refresh_now(self):
+        with self._lock:
+            started_at = time.time()
+            refresh_snapshot(self.db_path)
+            self.refreshed_at = started_at
+
+    def _loop(self):
+        while True:
+            try:
+                self.refresh_now()
+            except (sqlite3.Error, OSError):
+                logger.exception("No se pudo actualizar la réplica de %s", self.db_path)
+            if self._stop.wait(self.interval):
+                break
+
+
+_refreshers = {}
+_refreshers_lock = threading.Lock()
+
+
+def start_snapshots(db_path: str = DB_PATH) -> Optional[SnapshotRefresher]:
+    """Iniciar (una sola vez por base y por proceso) la copia periódica a la réplica"""
+    if SNAPSHOT_SECONDS <= 0:
+        return None
+    with _refreshers_lock:
+        if db_path not in _refreshers:
+            _refreshers[db_path] = SnapshotRefresher(db_path)
+            _refreshers[db_path].start()
+        return _refreshers[db_path]
+
+
+def open_reader(db_path: str = DB_PATH, written_at: Optional[float] = None):
+    """TrucoGame de solo lectura sobre la réplica; None si no hay una copia utilizable.
+
+    written_at es la última escritura del lector: si la réplica es anterior, no la
+    incluye y hay que leer de la base principal.
+    """
+    refresher = start_snapshots(db_path)
+    if refresher is None or refresher.refreshed_at is None:
+        return None
+    if written_at is not None and written_at >= refresher.refreshed_at:
+        return None
+    if time.time() - refresher.refreshed_at > MAX_AGE_SECONDS:
+        return None
+    return TrucoGame(replica_path(db_path), read_only=True)
+
+
+def mark_session_write():
+    """Después de escribir, la sesión lee de la base principal hasta la próxima copia"""
+    st.session_state["last_write_at"] = time.time()
+
+
+def open_session_reader(game, db_path: str = DB_PATH):
+    """Conexión para las vistas de sólo lectura de esta sesión: la réplica si está al día"""
+    return open_reader(db_path, st.session_state.get("last_write_at")) or game
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Copiar la base a la réplica de lectura")
+    parser.add_argument("--db", default=DB_PATH)
+    args = parser.parse_args()
+
+    print(refresh_snapshot(args.db))
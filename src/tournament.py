@@ -0,0 +1,148 @@
+import pandas as pd
+import streamlit as st
+from src.truco import TrucoGame
+
+FORMAT_OPTIONS = {
+    "Eliminación simple": "single_elimination",
+    "Todos contra todos": "round_robin",
+    "Suizo": "swiss",
+}
+FORMAT_LABELS = {value: label for label, value in FORMAT_OPTIONS.items()}
+
+
+def get_team_options(game: TrucoGame, players_per_team: int) -> dict:
+    """Equipos existentes con la cantidad de jugadores de la modalidad: {etiqueta: id}"""
+    teams = [
+        team
+        for team in game.get_existing_teams_with_players()
+        if len(team["player_ids"]) == players_per_team
+    ]
+    nicknames = game.get_nicknames(
+        [player_id for team in teams for player_id in team["player_ids"]]
+    )
+    return {
+        f"{team['name']} ({', '.join(nicknames[p] for p in team['player_ids'])})": team["id"]
+        for team in teams
+    }
+
+
+def create_tournament_form(game: TrucoGame):
+    """Formulario para crear un torneo y generar su primera ronda"""
+    name = st.text_input("Nombre del torneo", key="tournament_name")
+    format_label = st.selectbox(
+        "Formato", list(FORMAT_OPTIONS.keys()), key="tournament_format"
+    )
+    players_count = st.radio(
+        "Número de jugadores por partida", [2, 4, 6], horizontal=True, key="tournament_players"
+    )
+    pica_pica_end_points = 30
+    if players_count == 6:
+        pica_pica_end_points = st.radio(
+            "Pica-pica termina en", [20, 25], horizontal=True, key="tournament_pica_pica"
+        )
+
+    team_options = get_team_options(game, players_count // 2)
+    selected = st.multiselect(
+        "Equipos (en orden de siembra)",
+        list(team_options.keys()),
+        key="tournament_teams",
+    )
+
+    rounds_count = None
+    if FORMAT_OPTIONS[format_label] == "swiss":
+        rounds_count = st.number_input(
+            "Rondas", min_value=1, value=max(1, (len(selected) - 1).bit_length()),
+            key="tournament_rounds",
+        )
+
+    if st.button("Crear torneo", key="tournament_create"):
+        if not name.strip():
+            st.error("Ingrese un nombre para el torneo.")
+        elif len(selected) < 2:
+            st.error("Seleccione al menos 2 equipos.")
+        else:
+            game.create_tournament(
+                name.strip(),
+                FORMAT_OPTIONS[format_label],
+                players_count,
+                pica_pica_end_points,
+                [team_options[label] for label in selected],
+                rounds_count,
+            )
+            # Mostrar el torneo recién creado (el más nuevo es el primero de la lista)
+            st.session_state.pop("tournament_select", None)
+            st.rerun()
+
+
+def show_standings(game: TrucoGame, tournament: dict):
+    """Tabla de posiciones del torneo (en el suizo, con el desempate Buchholz)"""
+    standings = game.get_tournament_standings(tournament["id"])
+    columns = {
+        "name": "Equipo",
+        "played": "Partidas",
+        "wins": "Victorias",
+        "losses": "Derrotas",
+        "byes": "Libres",
+        "buchholz": "Buchholz",
+        "points_for": "Puntos a favor",
+        "points_against": "Puntos en contra",
+        "point_diff": "Diferencia",
+    }
+    if tournament["format"] != "swiss":
+        del columns["buchholz"]
+
+    df = pd.DataFrame(standings)[list(columns.keys())].rename(columns=columns)
+    df.insert(0, "Posición", range(1, len(df) + 1))
+    st.dataframe(df, use_container_width=True, hide_index=True)
+
+
+def show_rounds(game: TrucoGame, tournament: dict):
+    """Cruces de cada ronda con su resultado"""
+    rounds = {}
+    for match in game.get_tournament_matches(tournament["id"]):
+        rounds.setdefault(match["round_number"], []).append(match)
+
+    for round_number in sorted(rounds, reverse=True):
+        with st.expander(
+            f"Ronda {round_number}", expanded=round_number == tournament["current_round"]
+        ):
+            for match in rounds[round_number]:
+                if match["bye_team"]:
+                    st.write(f"**{match['bye_team']}** queda libre")
+                elif match["status"] == "terminada" and match["winner"]:
+                    st.write(
+                        f"{match['match_name']}: **{match['winner']}** "
+                        f"{match['winner_points']} - {match['loser_points']} {match['loser']}"
+                    )
+                else:
+                    st.write(f"{match['match_name']}: en juego")
+
+
+def tournament_management(game: TrucoGame):
+    st.header("🏅 Torneos")
+
+    with st.expander("➕ Nuevo torneo"):
+        create_tournament_form(game)
+
+    tournaments = game.get_tournaments()
+    if not tournaments:
+        st.info("No hay torneos creados.")
+        return
+
+    labels = {
+        f"{t['name']} ({FORMAT_LABELS[t['format']]}, {t['teams_count']} equipos)": t
+        for t in tournaments
+    }
+    tournament = labels[st.selectbox("Torneo", list(labels.keys()), key="tournament_select")]
+
+    if tournament["status"] == "terminado":
+        st.success(f"🏆 Campeón: {tournament['winner_name']}")
+    else:
+        st.info(
+            f"Ronda {tournament['current_round']} de {tournament['rounds_count']}: "
+            "las partidas se juegan en la pestaña 'Jugar Partida' y la ronda siguiente "
+            "se genera al terminar la última."
+        )
+
+    show_standings(game, tournament)
+    show_rounds(game, tournament)
@@ -1,28 +1,198 @@
+import os
+import random
 import sqlite3
 from datetime import datetime
 from typing import List, Dict, Optional
 
+from src.db_connection import DB_PATH
+from src.instrumentation import connect
+from src.metrics import POINTS_RECORDED, ROUNDS_SUBMITTED, TEAM_SCORES_SECONDS
+from src.models import Match, PicaPicaScore, RedondoScore, Round, Seat, Team, User
+from src.pairing import (
+    elimination_rounds,
+    next_elimination_round,
+    round_robin_round,
+    round_robin_rounds,
+    single_elimination_first_round,
+    swiss_pairings,
+    swiss_rounds,
+)
+from src.sharding import shard_path
+from src.utils import calculate_falta_envido_points
+
+TOURNAMENT_FORMATS = ("single_elimination", "round_robin", "swiss")
+
+# Tabla y columnas de los puntajes de cada tipo de ronda (las claves de add_*_score)
+SCORE_COLUMNS = {
+    "redondo": (
+        "redondo_scores",
+        ("truco_winner_team_id", "truco_points", "envido_winner_team_id", "envido_points"),
+    ),
+    "pica-pica": (
+        "pica_pica_scores",
+        ("sub_round", "truco_winner_id", "truco_points", "envido_winner_id", "envido_points"),
+    ),
+}
+
+
+def _like_prefix(prefix: str) -> str:
+    """Patrón LIKE que busca el prefijo literalmente (escapando comodines)"""
+    escaped = prefix.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return f"{escaped}%"
+
+
+def _capped_points(totals: Dict[int, int], team_id: Optional[int], points: int) -> int:
+    """Puntos que el equipo puede sumar sin pasar de 30; los suma a totals"""
+    if team_id is None:
+        return points
+    current_team_score = totals.get(team_id, 0)
+    if current_team_score + points > 30:
+        points = max(0, 30 - current_team_score)
+    totals[team_id] = current_team_score + points
+    return points
+
+
+def _next_round_type(match_info, team_scores: Dict[int, int], last_round_type: Optional[str]) -> str:
+    """Tipo de la ronda que sigue según los puntajes y el tipo de la última ronda"""
+    # Pica-pica solo existe en juegos de 6 jugadores; la primera ronda siempre es redonda
+    if match_info["players_count"] != 6 or last_round_type is None:
+        return "redondo"
+
+    # Después de pica-pica, la próxima ronda siempre es redonda
+    if last_round_type == "pica-pica":
+        return "redondo"
+
+    # Verificar si pica-pica es elegible (solo para juegos de 6 jugadores)
+    pica_pica_started = max(team_scores.values()) >= 5
+    pica_pica_ended = max(team_scores.values()) >= match_info["pica_pica_end_points"]
+
+    if pica_pica_started and not pica_pica_ended and match_info["pica_pica_enabled"]:
+        return "pica-pica"
+    else:
+        return "redondo"
+
+
+def _score_points(round_type: str, scores: List[Dict], winner_teams: Dict[int, int]) -> Dict[int, int]:
+    """Puntos que suman los puntajes de una ronda a cada equipo"""
+    prefix = "winner_team_id" if round_type == "redondo" else "winner_id"
+    points = {}
+    for score in scores:
+        for kind in ("truco", "envido"):
+            team_id = winner_teams.get(score[f"{kind}_{prefix}"])
+            if team_id is not None and score[f"{kind}_points"]:
+                points[team_id] = points.get(team_id, 0) + score[f"{kind}_points"]
+    return points
+
 
 class TrucoGame:
-    def __init__(self):
-        self.conn = sqlite3.connect("truco_game.db")
+    def __init__(
+        self, db_path: str = DB_PATH, read_only: bool = False, shard: Optional[str] = None
+    ):
+        # Con una sede (o torneo) se usa su propia base en lugar de db_path
+        if shard is not None:
+            db_path = shard_path(shard)
+        self.db_path = db_path
+        if read_only:
+            self.conn = connect(f"file:{db_path}?mode=ro", uri=True)
+        else:
+            self.conn = connect(db_path)
         self.conn.row_factory = sqlite3.Row
+        # El escritor de src/writer.py confirma varias operaciones en una sola transacción
+        self.defer_commit = False
+        # Se llama después de cada escritura confirmada (la sesión marca que escribió)
+        self.on_write = None
+        # Dentro de submit_round los resúmenes se guardan una vez, al final de la ronda
+        self._deferred_summaries = None
+        # Incrementos de métricas que esperan a que su transacción se confirme
+        self.pending_metrics = []
+
+    def _commit(self):
+        """Confirmar la transacción, salvo que la confirme el escritor en lote"""
+        if not self.defer_commit:
+            self.conn.commit()
+            self.flush_metrics()
+            if self.on_write is not None:
+                self.on_write()
+
+    def _rollback(self):
+        """Deshacer la transacción y descartar sus métricas"""
+        self.conn.rollback()
+        del self.pending_metrics[:]
+
+    def _count(self, counter, amount: int = 1):
+        """Anotar un incremento que se aplica recién cuando se confirma la escritura"""
+        self.pending_metrics.append((counter, amount))
+
+    def flush_metrics(self):
+        """Aplicar las métricas de lo ya confirmado (lo llama el escritor tras su commit)"""
+        for counter, amount in self.pending_metrics:
+            counter.inc(amount)
+        del self.pending_metrics[:]
 
     def add_user(self, nickname: str) -> bool:
         """Agregar un nuevo usuario"""
         try:
             cursor = self.conn.cursor()
             cursor.execute("INSERT INTO users (nickname) VALUES (?)", (nickname,))
-            self.conn.commit()
+            self._commit()
             return True
         except sqlite3.IntegrityError:
             return False
 
-    def get_users(self) -> List[Dict]:
+    def get_users(self) -> List[User]:
         """Obtener todos los usuarios"""
         cursor = self.conn.cursor()
-        cursor.execute("SELECT * FROM users ORDER BY nickname")
-        return [dict(row) for row in cursor.fetchall()]
+        cursor.row_factory = User.row_factory()
+        cursor.execute("SELECT id, nickname FROM users ORDER BY nickname")
+        return cursor.fetchall()
+
+    def search_users(self, prefix: str = "", limit: int = 20, offset: int = 0) -> List[User]:
+        """Buscar usuarios cuyo apodo empieza con el prefijo (sin distinguir mayúsculas)"""
+        cursor = self.conn.cursor()
+        cursor.row_factory = User.row_factory()
+        cursor.execute(
+            """
+            SELECT id, nickname FROM users
+            WHERE nickname LIKE ? ESCAPE '\\'
+            ORDER BY nickname COLLATE NOCASE
+            LIMIT ? OFFSET ?
+        """,
+            (_like_prefix(prefix), limit, offset),
+        )
+        return cursor.fetchall()
+
+    def count_users(self, prefix: str = "") -> int:
+        """Contar usuarios cuyo apodo empieza con el prefijo"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*) FROM users WHERE nickname LIKE ? ESCAPE '\\'",
+            (_like_prefix(prefix),),
+        )
+        return cursor.fetchone()[0]
+
+    def get_nicknames(self, player_ids: List[int]) -> Dict[int, str]:
+        """Obtener los apodos de un conjunto de usuarios por ID"""
+        if not player_ids:
+            return {}
+        cursor = self.conn.cursor()
+        placeholders = ",".join(["?" for _ in player_ids])
+        cursor.execute(
+            f"SELECT id, nickname FROM users WHERE id IN ({placeholders})",
+            list(player_ids),
+        )
+        return {row[0]: row[1] for row in cursor.fetchall()}
+
+    def get_user_ids(self, nicknames: List[str]) -> Dict[str, int]:
+        """Obtener los IDs de un conjunto de usuarios por apodo"""
+        if not nicknames:
+            return {}
+        cursor = self.conn.cursor()
+        placeholders = ",".join(["?" for _ in nicknames])
+        cursor.execute(
+            f"SELECT nickname, id FROM users WHERE nickname IN ({placeholders})",
+            list(nicknames),
+        )
+        return {row[0]: row[1] for row in cursor.fetchall()}
 
     def generate_match_name(self, player_ids: List[int]) -> str:
         """Generar nombre automático para la partida"""
@@ -87,7 +257,7 @@ class TrucoGame:
                 (match_id, player_id, i),
             )
 
-        self.conn.commit()
+        self._commit()
         return match_id
 
     def get_match_teams(self, match_id: int) -> List[Dict]:
@@ -98,9 +268,10 @@ class TrucoGame:
         )
         return [dict(row) for row in cursor.fetchall()]
 
-    def get_match_players(self, match_id: int) -> List[Dict]:
+    def get_match_players(self, match_id: int) -> List[Seat]:
         """Obtener jugadores de una partida con sus posiciones y equipos"""
         cursor = self.conn.cursor()
+        cursor.row_factory = Seat.row_factory()
 
         cursor.execute(
             """
@@ -112,16 +283,17 @@ class TrucoGame:
         """,
             (match_id,),
         )
-        return [dict(row) for row in cursor.fetchall()]
+        return cursor.fetchall()
 
-    def get_match_info(self, match_id: int) -> Dict:
+    def get_match_info(self, match_id: int) -> Match:
         """Obtener información de la partida"""
         cursor = self.conn.cursor()
+        cursor.row_factory = Match.row_factory()
         cursor.execute("SELECT * FROM matches WHERE id = ?", (match_id,))
         result = cursor.fetchone()
         if result is None:
             raise ValueError(f"No se encontró la partida con ID {match_id}")
-        return dict(result)
+        return result
 
     def get_teams(self, match_id: int) -> List[Dict]:
         """Obtener equipos de una partida"""
@@ -151,9 +323,25 @@ class TrucoGame:
         """,
             (match_id, round_number, round_type, dealer_position),
         )
+        round_id = cursor.lastrowid
+
+        # Punto de control de la ronda: arranca con los totales actuales y sus puntajes
+        # se le suman a medida que se anotan
+        cursor.execute(
+            """
+            INSERT INTO round_checkpoints (match_id, round_number, team_id, total)
+            SELECT mt.match_id, ?, mt.team_id, COALESCE(ms.points, 0)
+            FROM match_teams mt
+            LEFT JOIN match_scores ms
+                ON ms.match_id = mt.match_id AND ms.team_id = mt.team_id
+            WHERE mt.match_id = ?
+        """,
+            (round_number, match_id),
+        )
 
-        self.conn.commit()
-        return cursor.lastrowid
+        self._count(ROUNDS_SUBMITTED.labels(round_type))
+        self._commit()
+        return round_id
 
     def add_pica_pica_score(
         self,
@@ -172,53 +360,16 @@ class TrucoGame:
 
         # Get current team scores before adding new points
         current_scores = self.get_team_scores(match_id)
+        player_teams = self._winner_teams(cursor, match_id, "pica-pica")
 
         # Check if adding these points would exceed 30 for any team
-        if truco_winner_id:
-            # Find which team this player belongs to
-            cursor.execute("""
-                SELECT t.id
-                FROM teams t
-                JOIN team_members tm ON t.id = tm.team_id
-                JOIN match_teams mt ON t.id = mt.team_id
-                WHERE tm.player_id = ? AND mt.match_id = ?
-            """, (truco_winner_id, match_id))
-            team_result = cursor.fetchone()
-            if team_result:
-                team_id = team_result[0]
-                current_team_score = current_scores.get(team_id, 0)
-                if current_team_score + truco_points > 30:
-                    truco_points = max(0, 30 - current_team_score)
-
-        if envido_winner_id:
-            # Find which team this player belongs to
-            cursor.execute("""
-                SELECT t.id
-                FROM teams t
-                JOIN team_members tm ON t.id = tm.team_id
-                JOIN match_teams mt ON t.id = mt.team_id
-                WHERE tm.player_id = ? AND mt.match_id = ?
-            """, (envido_winner_id, match_id))
-            team_result = cursor.fetchone()
-            if team_result:
-                team_id = team_result[0]
-                current_team_score = current_scores.get(team_id, 0)
-                # If truco winner is from same team, account for already added truco points
-                adjusted_current_score = current_team_score
-                if truco_winner_id:
-                    cursor.execute("""
-                        SELECT t.id
-                        FROM teams t
-                        JOIN team_members tm ON t.id = tm.team_id
-                        JOIN match_teams mt ON t.id = mt.team_id
-                        WHERE tm.player_id = ? AND mt.match_id = ?
-                    """, (truco_winner_id, match_id))
-                    truco_team_result = cursor.fetchone()
-                    if truco_team_result and truco_team_result[0] == team_id:
-                        adjusted_current_score += truco_points
-
-                if adjusted_current_score + envido_points > 30:
-                    envido_points = max(0, 30 - adjusted_current_score)
+        # (el envido cuenta el truco ya sumado si el ganador es del mismo equipo)
+        truco_points = _capped_points(
+            current_scores, player_teams.get(truco_winner_id), truco_points
+        )
+        envido_points = _capped_points(
+            current_scores, player_teams.get(envido_winner_id), envido_points
+        )
 
         cursor.execute(
             """
@@ -235,7 +386,37 @@ class TrucoGame:
                 envido_points,
             ),
         )
-        self.conn.commit()
+        self._record_duel(
+            cursor,
+            match_id,
+            truco_winner_id,
+            truco_points,
+            envido_winner_id,
+            envido_points,
+        )
+        self._add_match_points(
+            cursor,
+            match_id,
+            _score_points(
+                "pica-pica",
+                [
+                    {
+                        "truco_winner_id": truco_winner_id,
+                        "truco_points": truco_points,
+                        "envido_winner_id": envido_winner_id,
+                        "envido_points": envido_points,
+                    }
+                ],
+                player_teams,
+            ),
+            round_id=round_id,
+        )
+        self._store_round_summary(cursor, round_id)
+        if truco_winner_id:
+            self._count(POINTS_RECORDED.labels("pica-pica", "truco"), truco_points)
+        if envido_winner_id:
+            self._count(POINTS_RECORDED.labels("pica-pica", "envido"), envido_points)
+        self._commit()
 
     def add_redondo_score(
         self,
@@ -255,19 +436,9 @@ class TrucoGame:
         current_scores = self.get_team_scores(match_id)
 
         # Check if adding these points would exceed 30 for any team
-        if truco_winner_team_id:
-            current_team_score = current_scores.get(truco_winner_team_id, 0)
-            if current_team_score + truco_points > 30:
-                truco_points = max(0, 30 - current_team_score)
-
-        if envido_winner_team_id:
-            current_team_score = current_scores.get(envido_winner_team_id, 0)
-            # If truco winner is the same team, account for already added truco points
-            if truco_winner_team_id == envido_winner_team_id:
-                current_team_score += truco_points
-
-            if current_team_score + envido_points > 30:
-                envido_points = max(0, 30 - current_team_score)
+        # (el envido cuenta el truco ya sumado si lo ganó el mismo equipo)
+        truco_points = _capped_points(current_scores, truco_winner_team_id, truco_points)
+        envido_points = _capped_points(current_scores, envido_winner_team_id, envido_points)
 
         cursor.execute(
             """
@@ -282,11 +453,415 @@ class TrucoGame:
                 envido_points,
             ),
         )
+        self._add_match_points(
+            cursor,
+            match_id,
+            _score_points(
+                "redondo",
+                [
+                    {
+                        "truco_winner_team_id": truco_winner_team_id,
+                        "truco_points": truco_points,
+                        "envido_winner_team_id": envido_winner_team_id,
+                        "envido_points": envido_points,
+                    }
+                ],
+                self._winner_teams(cursor, match_id, "redondo"),
+            ),
+            round_id=round_id,
+        )
 
-        self.conn.commit()
+        self._store_round_summary(cursor, round_id)
+        if truco_winner_team_id:
+            self._count(POINTS_RECORDED.labels("redondo", "truco"), truco_points)
+        if envido_winner_team_id:
+            self._count(POINTS_RECORDED.labels("redondo", "envido"), envido_points)
+        self._commit()
+
+    def submit_round(
+        self,
+        client_id: str,
+        match_id: int,
+        round_type: str,
+        dealer_position: int,
+        scores: List[Dict],
+    ) -> int:
+        """Guardar una ronda completa en una sola transacción; idempotente por client_id"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT round_id FROM applied_submissions WHERE client_id = ?", (client_id,)
+        )
+        applied = cursor.fetchone()
+        if applied:
+            return applied[0]
+
+        add_score = self.add_redondo_score if round_type == "redondo" else self.add_pica_pica_score
+        deferred = self.defer_commit
+        self.defer_commit = True
+        self._deferred_summaries = set()
+        try:
+            round_id = self.add_round(match_id, round_type, dealer_position)
+            for score in scores:
+                add_score(round_id, **score)
+            self._deferred_summaries = None
+            self._store_round_summary(cursor, round_id)
+            cursor.execute(
+                "INSERT INTO applied_submissions (client_id, round_id) VALUES (?, ?)",
+                (client_id, round_id),
+            )
+        except Exception:
+            # Fuera del escritor la ronda a medio guardar se descarta completa
+            if not deferred:
+                self._rollback()
+            raise
+        finally:
+            self.defer_commit = deferred
+            self._deferred_summaries = None
+
+        self._commit()
+        return round_id
 
     def get_team_scores(self, match_id: int) -> Dict[int, int]:
-        """Calcular puntajes actuales de los equipos"""
+        """Obtener puntajes actuales de los equipos (los totales guardados)"""
+        with TEAM_SCORES_SECONDS.time():
+            cursor = self.conn.cursor()
+            cursor.execute(
+                """
+                SELECT mt.team_id, COALESCE(ms.points, 0)
+                FROM match_teams mt
+                LEFT JOIN match_scores ms
+                    ON ms.match_id = mt.match_id AND ms.team_id = mt.team_id
+                WHERE mt.match_id = ?
+                ORDER BY mt.team_id
+            """,
+                (match_id,),
+            )
+            return {team_id: points for team_id, points in cursor.fetchall()}
+
+    def get_score_timeline(self, match_id: int) -> List[Dict]:
+        """Puntos de cada equipo en cada ronda y su total acumulado, en una sola consulta"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            WITH round_points (round_id, team_id, points) AS (
+                SELECT rs.round_id, rs.truco_winner_team_id, rs.truco_points
+                FROM rounds r
+                JOIN redondo_scores rs ON rs.round_id = r.id
+                WHERE r.match_id = :match_id
+                UNION ALL
+                SELECT rs.round_id, rs.envido_winner_team_id, rs.envido_points
+                FROM rounds r
+                JOIN redondo_scores rs ON rs.round_id = r.id
+                WHERE r.match_id = :match_id
+                UNION ALL
+                SELECT ps.round_id, tm.team_id, ps.truco_points
+                FROM rounds r
+                JOIN pica_pica_scores ps ON ps.round_id = r.id
+                JOIN player_positions pp
+                    ON ps.truco_winner_id = pp.player_id AND pp.match_id = r.match_id
+                JOIN team_members tm ON pp.player_id = tm.player_id
+                WHERE r.match_id = :match_id
+                UNION ALL
+                SELECT ps.round_id, tm.team_id, ps.envido_points
+                FROM rounds r
+                JOIN pica_pica_scores ps ON ps.round_id = r.id
+                JOIN player_positions pp
+                    ON ps.envido_winner_id = pp.player_id AND pp.match_id = r.match_id
+                JOIN team_members tm ON pp.player_id = tm.player_id
+                WHERE r.match_id = :match_id
+            )
+            SELECT r.round_number, mt.team_id,
+                   COALESCE(SUM(rp.points), 0) AS points,
+                   SUM(COALESCE(SUM(rp.points), 0)) OVER (
+                       PARTITION BY mt.team_id ORDER BY r.round_number
+                   ) AS total
+            FROM rounds r
+            JOIN match_teams mt ON mt.match_id = r.match_id
+            LEFT JOIN round_points rp ON rp.round_id = r.id AND rp.team_id = mt.team_id
+            WHERE r.match_id = :match_id
+            GROUP BY r.id, mt.team_id
+            ORDER BY r.round_number, mt.team_id
+        """,
+            {"match_id": match_id},
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_match_version(self, match_id: int) -> tuple:
+        """Identificador que cambia cuando se agrega, edita o borra una ronda de la partida"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "SELECT COUNT(*), MAX(id) FROM rounds WHERE match_id = ?", (match_id,)
+        )
+        rounds_count, last_round_id = cursor.fetchone()
+        # Editar una ronda sólo cambia la serie si cambian sus puntos, y con ellos los totales
+        return (rounds_count, last_round_id, tuple(self.get_team_scores(match_id).items()))
+
+    def _winner_teams(self, cursor, match_id: int, round_type: str) -> Dict[int, int]:
+        """Equipo de la partida de cada posible ganador: el propio equipo en redondo,
+        el equipo de cada jugador sentado en pica-pica"""
+        if round_type == "redondo":
+            cursor.execute("SELECT team_id FROM match_teams WHERE match_id = ?", (match_id,))
+            return {team_id: team_id for (team_id,) in cursor.fetchall()}
+        cursor.execute(
+            """
+            SELECT pp.player_id, mt.team_id
+            FROM player_positions pp
+            JOIN team_members tm ON pp.player_id = tm.player_id
+            JOIN match_teams mt ON tm.team_id = mt.team_id AND mt.match_id = pp.match_id
+            WHERE pp.match_id = ?
+        """,
+            (match_id,),
+        )
+        return dict(cursor.fetchall())
+
+    def _round_scores(self, cursor, round_id: int, round_type: str) -> List[Dict]:
+        """Puntajes guardados de una ronda (con su id), en el orden en que se anotaron"""
+        table, columns = SCORE_COLUMNS[round_type]
+        order = "id" if round_type == "redondo" else "sub_round, id"
+        cursor.execute(
+            f"SELECT id, {', '.join(columns)} FROM {table} WHERE round_id = ? ORDER BY {order}",
+            (round_id,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def _add_match_points(
+        self,
+        cursor,
+        match_id: int,
+        points: Dict[int, int],
+        sign: int = 1,
+        round_id: Optional[int] = None,
+    ):
+        """Sumar (o restar con sign=-1) puntos a los totales guardados de la partida y,
+        si vienen de una ronda, a los puntos de control de esa ronda y las siguientes"""
+        changes = [
+            (sign * team_points, match_id, team_id) for team_id, team_points in points.items()
+        ]
+        cursor.executemany(
+            """
+            INSERT INTO match_scores (points, match_id, team_id)
+            VALUES (?, ?, ?)
+            ON CONFLICT (match_id, team_id) DO UPDATE SET points = points + excluded.points
+        """,
+            changes,
+        )
+        if round_id is not None:
+            cursor.executemany(
+                """
+                UPDATE round_checkpoints SET total = total + ?
+                WHERE match_id = ? AND team_id = ?
+                  AND round_number >= (SELECT round_number FROM rounds WHERE id = ?)
+            """,
+                [change + (round_id,) for change in changes],
+            )
+
+    def _subtract_round_points(self, cursor, round_id: int):
+        """Descontar de los totales de la partida lo que suma la ronda"""
+        cursor.execute("SELECT match_id, round_type FROM rounds WHERE id = ?", (round_id,))
+        round_row = cursor.fetchone()
+        if round_row is None:
+            return
+        match_id, round_type = round_row
+        points = _score_points(
+            round_type,
+            self._round_scores(cursor, round_id, round_type),
+            self._winner_teams(cursor, match_id, round_type),
+        )
+        self._add_match_points(cursor, match_id, points, sign=-1, round_id=round_id)
+
+    def rebuild_match_scores(self):
+        """Recalcular los totales y puntos de control de todas las partidas desde sus puntajes"""
+        cursor = self.conn.cursor()
+        cursor.execute("DELETE FROM match_scores")
+        cursor.execute("DELETE FROM round_checkpoints")
+        cursor.execute("SELECT id FROM matches")
+        for (match_id,) in cursor.fetchall():
+            self._add_match_points(cursor, match_id, self._compute_team_scores(match_id))
+            cursor.executemany(
+                """
+                INSERT INTO round_checkpoints (match_id, round_number, team_id, total)
+                VALUES (?, ?, ?, ?)
+            """,
+                [
+                    (match_id, row["round_number"], row["team_id"], row["total"])
+                    for row in self.get_score_timeline(match_id)
+                ],
+            )
+        self._commit()
+
+    def get_match_state(self, match_id: int, round_number: int) -> Dict:
+        """Estado de la partida al terminar la ronda indicada (puntajes, pie, tipo de
+        ronda y falta envido), leído de los puntos de control guardados"""
+        cursor = self.conn.cursor()
+        # La última ronda hasta round_number (las rondas borradas dejan huecos)
+        cursor.execute(
+            """
+            SELECT r.round_number, r.round_type, r.dealer_position, u.nickname
+            FROM rounds r
+            JOIN player_positions pp ON r.dealer_position = pp.position AND pp.match_id = r.match_id
+            JOIN users u ON pp.player_id = u.id
+            WHERE r.match_id = ? AND r.round_number <= ?
+            ORDER BY r.round_number DESC
+            LIMIT 1
+        """,
+            (match_id, round_number),
+        )
+        round_row = cursor.fetchone()
+        if round_row is None:
+            raise ValueError(f"La partida {match_id} no tiene rondas hasta la {round_number}")
+        round_number, round_type, dealer_position, dealer_name = round_row
+
+        cursor.execute(
+            """
+            SELECT team_id, total FROM round_checkpoints
+            WHERE match_id = ? AND round_number = ?
+            ORDER BY team_id
+        """,
+            (match_id, round_number),
+        )
+        team_scores = dict(cursor.fetchall())
+
+        match_info = self.get_match_info(match_id)
+        players = self.get_match_players(match_id)
+        next_round_type = _next_round_type(match_info, team_scores, round_type)
+        # Mismo criterio que el pie de la próxima ronda en la pestaña de juego
+        starting_position = next(
+            p["position"] for p in players if p["player_id"] == match_info["starting_dealer_id"]
+        )
+        next_dealer_position = (starting_position + round_number) % match_info["players_count"]
+        return {
+            "round_number": round_number,
+            "team_scores": team_scores,
+            "round_type": round_type,
+            "dealer_position": dealer_position,
+            "dealer_name": dealer_name,
+            "finished": max(team_scores.values(), default=0) >= 30,
+            "next_round_type": next_round_type,
+            "next_dealer_position": next_dealer_position,
+            "next_dealer_name": next(
+                p["nickname"] for p in players if p["position"] == next_dealer_position
+            ),
+            "falta_envido_points": calculate_falta_envido_points(team_scores, next_round_type),
+        }
+
+    def edit_round(self, round_id: int, scores: List[Dict]):
+        """Reemplazar los puntajes de una ronda (redonda o pica-pica) en una sola transacción.
+
+        scores usa las mismas claves que add_redondo_score / add_pica_pica_score. El
+        tope de 30 se valida contra los totales de antes de la ronda (lanza ValueError
+        si se pasa), y a los totales guardados sólo se les aplica la diferencia con los
+        puntajes anteriores.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT r.match_id, r.round_number, r.round_type, m.status
+            FROM rounds r
+            JOIN matches m ON r.match_id = m.id
+            WHERE r.id = ?
+        """,
+            (round_id,),
+        )
+        round_row = cursor.fetchone()
+        if round_row is None:
+            raise ValueError(f"No se encontró la ronda con ID {round_id}")
+        match_id, round_number, round_type, status = round_row
+        table, columns = SCORE_COLUMNS[round_type]
+        prefix = "winner_team_id" if round_type == "redondo" else "winner_id"
+
+        try:
+            winner_teams = self._winner_teams(cursor, match_id, round_type)
+            old_scores = self._round_scores(cursor, round_id, round_type)
+            old_points = _score_points(round_type, old_scores, winner_teams)
+
+            # Totales de antes de la ronda (su punto de control sin sus puntajes): contra
+            # ellos se valida el tope de 30, no contra los de rondas posteriores
+            cursor.execute(
+                """
+                SELECT team_id, total FROM round_checkpoints
+                WHERE match_id = ? AND round_number = ?
+            """,
+                (match_id, round_number),
+            )
+            totals = {
+                team_id: total - old_points.get(team_id, 0)
+                for team_id, total in cursor.fetchall()
+            }
+
+            new_scores = []
+            for score in scores:
+                score = {column: score.get(column) for column in columns}
+                for kind in ("truco", "envido"):
+                    team_id = winner_teams.get(score[f"{kind}_{prefix}"])
+                    before = totals.get(team_id, 0)
+                    points = score[f"{kind}_points"] or 0
+                    score[f"{kind}_points"] = _capped_points(totals, team_id, points)
+                    if score[f"{kind}_points"] < points:
+                        raise ValueError(
+                            f"Con {before} puntos antes de la ronda, el equipo sólo puede "
+                            f"sumar {score[f'{kind}_points']} de {kind} (no {points})"
+                        )
+                new_scores.append(score)
+
+            # Las filas existentes se actualizan en su lugar; sobrantes o faltantes
+            # se borran o agregan
+            assignments = ", ".join(f"{column} = ?" for column in columns)
+            for old, new in zip(old_scores, new_scores):
+                cursor.execute(
+                    f"UPDATE {table} SET {assignments} WHERE id = ?",
+                    (*new.values(), old["id"]),
+                )
+            cursor.executemany(
+                f"INSERT INTO {table} (round_id, {', '.join(columns)}) "
+                f"VALUES (?, {', '.join('?' for _ in columns)})",
+                [(round_id, *new.values()) for new in new_scores[len(old_scores):]],
+            )
+            cursor.executemany(
+                f"DELETE FROM {table} WHERE id = ?",
+                [(old["id"],) for old in old_scores[len(new_scores):]],
+            )
+
+            # Historial pica-pica entre jugadores: se descuenta lo anterior y se suma lo nuevo
+            if round_type == "pica-pica":
+                for sign, round_scores in ((-1, old_scores), (1, new_scores)):
+                    for score in round_scores:
+                        self._record_duel(
+                            cursor,
+                            match_id,
+                            score["truco_winner_id"],
+                            score["truco_points"],
+                            score["envido_winner_id"],
+                            score["envido_points"],
+                            sign=sign,
+                        )
+
+            # Sólo la diferencia llega a los totales guardados
+            new_points = _score_points(round_type, new_scores, winner_teams)
+            delta = {
+                team_id: new_points.get(team_id, 0) - old_points.get(team_id, 0)
+                for team_id in set(old_points) | set(new_points)
+            }
+            self._add_match_points(
+                cursor,
+                match_id,
+                {team_id: points for team_id, points in delta.items() if points},
+                round_id=round_id,
+            )
+
+            # En partidas terminadas el resultado guardado (y el ranking) cambia
+            if status == "terminada":
+                self._remove_match_result(cursor, match_id)
+                self._record_match_result(cursor, match_id)
+            self._store_round_summary(cursor, round_id)
+        except Exception:
+            if not self.defer_commit:
+                self._rollback()
+            raise
+
+        self._commit()
+
+    def _compute_team_scores(self, match_id: int) -> Dict[int, int]:
+        """Sumar los puntajes de rondas redondas y pica-pica de cada equipo"""
         cursor = self.conn.cursor()
 
         # Obtener equipos de la partida
@@ -379,26 +954,41 @@ class TrucoGame:
 
         return team_scores
 
-    def get_match_rounds(self, match_id: int) -> List[Dict]:
+    def get_match_rounds(self, match_id: int) -> List[Round]:
         """Obtener todas las rondas de una partida con información detallada"""
+        return self._fetch_rounds("r.match_id = ?", (match_id,))
+
+    def get_round(self, round_id: int) -> Optional[Round]:
+        """Obtener una ronda con el nombre del pie y sus puntajes"""
+        rounds = self._fetch_rounds("r.id = ?", (round_id,))
+        return rounds[0] if rounds else None
+
+    def _fetch_rounds(self, condition: str, params: tuple) -> List[Round]:
+        """Rondas (con el nombre del pie y sus puntajes) que cumplen la condición"""
         cursor = self.conn.cursor()
+        cursor.row_factory = Round.row_factory()
         cursor.execute(
-            """
+            f"""
             SELECT r.*, u.nickname as dealer_name
             FROM rounds r
             JOIN player_positions pp ON r.dealer_position = pp.position AND pp.match_id = r.match_id
             JOIN users u ON pp.player_id = u.id
-            WHERE r.match_id = ?
+            WHERE {condition}
             ORDER BY r.round_number DESC
         """,
-            (match_id,),
+            params,
         )
 
-        rounds = [dict(row) for row in cursor.fetchall()]
+        rounds = cursor.fetchall()
 
         # Obtener puntajes para cada ronda
+        redondo_cursor = self.conn.cursor()
+        redondo_cursor.row_factory = RedondoScore.row_factory()
+        pica_pica_cursor = self.conn.cursor()
+        pica_pica_cursor.row_factory = PicaPicaScore.row_factory()
         for round_data in rounds:
             if round_data["round_type"] == "redondo":
+                cursor = redondo_cursor
                 cursor.execute(
                     """
                     SELECT rs.*
@@ -409,6 +999,7 @@ class TrucoGame:
                     (round_data["id"],),
                 )
             else:  # pica-pica
+                cursor = pica_pica_cursor
                 cursor.execute(
                     """
                     SELECT ps.*
@@ -418,7 +1009,7 @@ class TrucoGame:
                 """,
                     (round_data["id"],),
                 )
-            round_data["scores"] = [dict(row) for row in cursor.fetchall()]
+            round_data.scores = cursor.fetchall()
 
         return rounds
 
@@ -452,24 +1043,7 @@ class TrucoGame:
         )
         last_round_type = cursor.fetchone()[0]
 
-        # Después de pica-pica, la próxima ronda siempre es redonda
-        if last_round_type == "pica-pica":
-            return "redondo"
-
-        # Verificar si pica-pica es elegible (solo para juegos de 6 jugadores)
-        pica_pica_started = max(team_scores.values()) >= 5
-        pica_pica_ended = (
-            max(team_scores.values()) >= match_info["pica_pica_end_points"]
-        )
-
-        if (
-            pica_pica_started
-            and not pica_pica_ended
-            and match_info["pica_pica_enabled"]
-        ):
-            return "pica-pica"
-        else:
-            return "redondo"
+        return _next_round_type(match_info, team_scores, last_round_type)
 
     def is_match_finished(self, match_id: int) -> bool:
         """Verificar si la partida ha terminado (algún equipo llegó a 30 puntos)"""
@@ -604,15 +1178,92 @@ class TrucoGame:
 
         return summary.strip()
 
+    def _store_round_summary(self, cursor, round_id: int):
+        """Guardar el resumen de la ronda para que el historial no lo recalcule"""
+        if self._deferred_summaries is not None:
+            self._deferred_summaries.add(round_id)
+            return
+        rounds = self._fetch_rounds("r.id = ?", (round_id,))
+        summary = self.format_round_summary(rounds[0]) if rounds else None
+        cursor.execute("UPDATE rounds SET summary = ? WHERE id = ?", (summary, round_id))
+
+    def get_round_summary(self, round_data: Round) -> str:
+        """Resumen guardado de la ronda (o calculado, en rondas guardadas sin él)"""
+        return round_data.get("summary") or self.format_round_summary(round_data)
+
+    def rebuild_round_summaries(self):
+        """Recalcular los resúmenes guardados de todas las rondas"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT id FROM matches")
+        for (match_id,) in cursor.fetchall():
+            cursor.executemany(
+                "UPDATE rounds SET summary = ? WHERE id = ?",
+                [
+                    (self.format_round_summary(round_data), round_data["id"])
+                    for round_data in self.get_match_rounds(match_id)
+                ],
+            )
+        self._commit()
+
+    def delete_redondo_scores(self, round_id: int):
+        """Eliminar los puntajes de una ronda redonda (para volver a cargarlos)"""
+        cursor = self.conn.cursor()
+        self._subtract_round_points(cursor, round_id)
+        cursor.execute("DELETE FROM redondo_scores WHERE round_id = ?", (round_id,))
+        self._store_round_summary(cursor, round_id)
+        self._commit()
+
     def delete_round(self, round_id: int):
         """Eliminar una ronda y sus puntajes"""
         cursor = self.conn.cursor()
+
+        # Descontar los enfrentamientos pica-pica de esta ronda del historial
+        cursor.execute(
+            """
+            SELECT r.match_id, ps.truco_winner_id, ps.truco_points,
+                   ps.envido_winner_id, ps.envido_points
+            FROM pica_pica_scores ps
+            JOIN rounds r ON ps.round_id = r.id
+            WHERE ps.round_id = ?
+        """,
+            (round_id,),
+        )
+        for row in cursor.fetchall():
+            self._record_duel(cursor, *row, sign=-1)
+
+        cursor.execute(
+            """
+            SELECT m.id, m.status
+            FROM rounds r
+            JOIN matches m ON r.match_id = m.id
+            WHERE r.id = ?
+        """,
+            (round_id,),
+        )
+        match = cursor.fetchone()
+
+        self._subtract_round_points(cursor, round_id)
+        cursor.execute(
+            """
+            DELETE FROM round_checkpoints
+            WHERE (match_id, round_number) = (
+                SELECT match_id, round_number FROM rounds WHERE id = ?
+            )
+        """,
+            (round_id,),
+        )
         cursor.execute("DELETE FROM redondo_scores WHERE round_id = ?", (round_id,))
         cursor.execute("DELETE FROM pica_pica_scores WHERE round_id = ?", (round_id,))
         cursor.execute("DELETE FROM rounds WHERE id = ?", (round_id,))
-        self.conn.commit()
 
-    def get_existing_teams_with_players(self) -> List[Dict]:
+        # En partidas terminadas el resultado guardado (y el ranking) cambia
+        if match and match["status"] == "terminada":
+            self._remove_match_result(cursor, match["id"])
+            self._record_match_result(cursor, match["id"])
+
+        self._commit()
+
+    def get_existing_teams_with_players(self) -> List[Team]:
         """Obtener todos los equipos existentes con sus jugadores ordenados"""
         cursor = self.conn.cursor()
         cursor.execute(
@@ -624,17 +1275,12 @@ class TrucoGame:
             ORDER BY t.id
         """
         )
-        teams = []
-        for row in cursor.fetchall():
-            team = {
-                "id": row[0],
-                "name": row[1],
-                "player_ids": [int(pid) for pid in row[2].split(",")] if row[2] else [],
-            }
-            teams.append(team)
-        return teams
+        return [
+            Team(row[0], row[1], [int(pid) for pid in row[2].split(",")] if row[2] else [])
+            for row in cursor.fetchall()
+        ]
 
-    def find_existing_team(self, player_ids: List[int]) -> Optional[Dict]:
+    def find_existing_team(self, player_ids: List[int]) -> Optional[Team]:
         """Buscar si existe un equipo con exactamente los mismos jugadores"""
         if not player_ids:
             return None
@@ -665,7 +1311,7 @@ class TrucoGame:
                 (team_id, player_id),
             )
 
-        self.conn.commit()
+        self._commit()
         return team_id
 
     def get_or_create_team(self, name: str, player_ids: List[int]) -> int:
@@ -688,9 +1334,9 @@ class TrucoGame:
                 (match_id, team_id),
             )
 
-        self.conn.commit()
+        self._commit()
 
-    def get_match_teams_with_players(self, match_id: int) -> List[Dict]:
+    def get_match_teams_with_players(self, match_id: int) -> List[Team]:
         """Obtener equipos de una partida con información de jugadores"""
         cursor = self.conn.cursor()
         cursor.execute(
@@ -707,17 +1353,12 @@ class TrucoGame:
             (match_id,),
         )
 
-        teams = []
-        for row in cursor.fetchall():
-            team = {
-                "id": row[0],
-                "name": row[1],
-                "player_names": row[2].split(",") if row[2] else [],
-            }
-            teams.append(team)
-        return teams
+        return [
+            Team(row[0], row[1], player_names=row[2].split(",") if row[2] else [])
+            for row in cursor.fetchall()
+        ]
 
-    def get_match_teams_with_player_ids(self, match_id: int) -> List[Dict]:
+    def get_match_teams_with_player_ids(self, match_id: int) -> List[Team]:
         """Obtener equipos de una partida con IDs de jugadores"""
         cursor = self.conn.cursor()
         cursor.execute(
@@ -733,20 +1374,34 @@ class TrucoGame:
             (match_id,),
         )
 
-        teams = []
-        for row in cursor.fetchall():
-            team = {
-                "id": row[0],
-                "name": row[1],
-                "player_ids": [int(pid) for pid in row[2].split(",")] if row[2] else [],
-            }
-            teams.append(team)
-        return teams
+        return [
+            Team(row[0], row[1], [int(pid) for pid in row[2].split(",")] if row[2] else [])
+            for row in cursor.fetchall()
+        ]
 
     def delete_match(self, match_id: int):
         """Eliminar una partida y todos sus datos relacionados"""
         cursor = self.conn.cursor()
 
+        # Descontar la partida del historial entre equipos y jugadores
+        cursor.execute(
+            """
+            SELECT r.match_id, ps.truco_winner_id, ps.truco_points,
+                   ps.envido_winner_id, ps.envido_points
+            FROM pica_pica_scores ps
+            JOIN rounds r ON ps.round_id = r.id
+            WHERE r.match_id = ?
+        """,
+            (match_id,),
+        )
+        for row in cursor.fetchall():
+            self._record_duel(cursor, *row, sign=-1)
+        self._remove_match_result(cursor, match_id)
+
+        # Equipos de la partida: después del paso 5 ya no se pueden leer
+        cursor.execute("SELECT team_id FROM match_teams WHERE match_id = ?", (match_id,))
+        team_ids = [row[0] for row in cursor.fetchall()]
+
         # Delete in reverse order of dependencies to avoid foreign key constraints
 
         # 1. Delete pica_pica_scores (references rounds)
@@ -761,16 +1416,870 @@ class TrucoGame:
             WHERE round_id IN (SELECT id FROM rounds WHERE match_id = ?)
         """, (match_id,))
 
-        # 3. Delete rounds (references matches)
+        # 3. Delete rounds and their checkpoints (references matches)
+        cursor.execute("DELETE FROM round_checkpoints WHERE match_id = ?", (match_id,))
         cursor.execute("DELETE FROM rounds WHERE match_id = ?", (match_id,))
 
         # 4. Delete player_positions (references matches)
         cursor.execute("DELETE FROM player_positions WHERE match_id = ?", (match_id,))
 
-        # 5. Delete match_teams (references matches)
+        # 5. Delete match_teams and the stored totals (references matches)
         cursor.execute("DELETE FROM match_teams WHERE match_id = ?", (match_id,))
+        cursor.execute("DELETE FROM match_scores WHERE match_id = ?", (match_id,))
 
         # 6. Finally delete the match itself
         cursor.execute("DELETE FROM matches WHERE id = ?", (match_id,))
 
-        self.conn.commit()
+        # 7. Remove it from its tournament; the round may be complete without it
+        tournament_match = self._tournament_match(cursor, match_id)
+        if tournament_match:
+            # El cruce deja de contar como revancha y para el Buchholz, salvo que otra
+            # partida del torneo entre los mismos equipos lo siga sosteniendo
+            cursor.executemany(
+                """
+                DELETE FROM tournament_opponents
+                WHERE tournament_id = :tournament_id
+                  AND team_id = :team_id AND opponent_id = :opponent_id
+                  AND NOT EXISTS (
+                      SELECT 1
+                      FROM tournament_matches tm
+                      JOIN match_teams a ON a.match_id = tm.match_id AND a.team_id = :team_id
+                      JOIN match_teams b
+                          ON b.match_id = tm.match_id AND b.team_id = :opponent_id
+                      WHERE tm.tournament_id = :tournament_id AND tm.match_id != :match_id
+                  )
+            """,
+                [
+                    {
+                        "tournament_id": tournament_match["tournament_id"],
+                        "team_id": team_id,
+                        "opponent_id": opponent_id,
+                        "match_id": match_id,
+                    }
+                    for team_id in team_ids
+                    for opponent_id in team_ids
+                    if team_id != opponent_id
+                ],
+            )
+            cursor.execute("DELETE FROM tournament_matches WHERE match_id = ?", (match_id,))
+            self._advance_tournament(cursor, *tournament_match)
+
+        self._commit()
+
+    def finish_match(self, match_id: int):
+        """Marcar la partida como terminada y registrar su resultado"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            "UPDATE matches SET status = 'terminada' WHERE id = ? AND status != 'terminada'",
+            (match_id,),
+        )
+
+        # Solo se registra el resultado la primera vez que se termina la partida
+        if cursor.rowcount:
+            self._record_match_result(cursor, match_id)
+
+            # En un torneo, la última partida de la ronda genera la siguiente
+            tournament_match = self._tournament_match(cursor, match_id)
+            if tournament_match:
+                self._advance_tournament(cursor, *tournament_match)
+
+        self._commit()
+
+    def _record_match_result(self, cursor, match_id: int):
+        """Guardar el resultado de una partida y actualizar el historial entre equipos"""
+        team_scores = self.get_team_scores(match_id)
+        if len(team_scores) != 2:
+            return
+
+        # Mismo criterio que check_match_finished: ante empate gana el primer equipo
+        winner_id = max(team_scores, key=lambda team_id: team_scores[team_id])
+        loser_id = next(team_id for team_id in team_scores if team_id != winner_id)
+
+        # La partida termina con su última ronda (o al crearse si no tiene rondas)
+        cursor.execute(
+            """
+            INSERT OR REPLACE INTO match_results
+            (match_id, players_count, winner_team_id, loser_team_id, winner_points,
+             loser_points, finished_at)
+            SELECT m.id, m.players_count, ?, ?, ?, ?,
+                   COALESCE(MAX(r.created_at), m.created_at)
+            FROM matches m
+            LEFT JOIN rounds r ON r.match_id = m.id
+            WHERE m.id = ?
+            GROUP BY m.id
+        """,
+            (
+                winner_id,
+                loser_id,
+                team_scores[winner_id],
+                team_scores[loser_id],
+                match_id,
+            ),
+        )
+
+        self._update_head_to_head(
+            cursor,
+            "team",
+            {winner_id: team_scores[winner_id], loser_id: team_scores[loser_id]},
+            winner_id,
+        )
+        self._update_leaderboard(cursor, match_id)
+        self._update_tournament_standings(
+            cursor,
+            match_id,
+            winner_id,
+            loser_id,
+            team_scores[winner_id],
+            team_scores[loser_id],
+        )
+
+    def _apply_stored_result(self, cursor, match_id: int, sign: int = 1):
+        """Sumar (o restar) el resultado guardado de una partida al ranking e historial"""
+        cursor.execute(
+            """
+            SELECT winner_team_id, loser_team_id, winner_points, loser_points
+            FROM match_results
+            WHERE match_id = ?
+        """,
+            (match_id,),
+        )
+        result = cursor.fetchone()
+        if result is None:
+            return None
+
+        winner_id, loser_id, winner_points, loser_points = result
+        self._update_head_to_head(
+            cursor,
+            "team",
+            {winner_id: winner_points, loser_id: loser_points},
+            winner_id,
+            sign=sign,
+        )
+        self._update_leaderboard(cursor, match_id, sign=sign)
+        return result
+
+    def _remove_match_result(self, cursor, match_id: int):
+        """Descontar el resultado guardado de una partida"""
+        result = self._apply_stored_result(cursor, match_id, sign=-1)
+        if result is None:
+            return
+
+        winner_id, loser_id, winner_points, loser_points = result
+        self._update_tournament_standings(
+            cursor, match_id, winner_id, loser_id, winner_points, loser_points, sign=-1
+        )
+        cursor.execute("DELETE FROM match_results WHERE match_id = ?", (match_id,))
+
+    def _update_leaderboard(self, cursor, match_id: int, sign: int = 1):
+        """Sumar (o restar con sign=-1) el resultado guardado de una partida al ranking"""
+        cursor.execute(
+            """
+            INSERT INTO leaderboard_stats
+            (kind, players_count, day, entity_id, played, wins, points_for, points_against)
+            SELECT e.kind, mr.players_count, DATE(mr.finished_at), e.entity_id,
+                   ?,
+                   ? * (e.team_id = mr.winner_team_id),
+                   ? * CASE WHEN e.team_id = mr.winner_team_id
+                            THEN mr.winner_points ELSE mr.loser_points END,
+                   ? * CASE WHEN e.team_id = mr.winner_team_id
+                            THEN mr.loser_points ELSE mr.winner_points END
+            FROM match_results mr
+            JOIN (
+                SELECT 'team' AS kind, team_id AS entity_id, team_id
+                FROM match_teams
+                WHERE match_id = ?
+                UNION ALL
+                SELECT 'player', tm.player_id, tm.team_id
+                FROM match_teams mt
+                JOIN team_members tm ON tm.team_id = mt.team_id
+                WHERE mt.match_id = ?
+            ) e
+            WHERE mr.match_id = ?
+            ON CONFLICT (kind, players_count, day, entity_id) DO UPDATE SET
+                played = played + excluded.played,
+                wins = wins + excluded.wins,
+                points_for = points_for + excluded.points_for,
+                points_against = points_against + excluded.points_against
+        """,
+            (sign, sign, sign, sign, match_id, match_id, match_id),
+        )
+
+    def _record_duel(
+        self,
+        cursor,
+        match_id: int,
+        truco_winner_id: Optional[int],
+        truco_points: int,
+        envido_winner_id: Optional[int],
+        envido_points: int,
+        sign: int = 1,
+    ):
+        """Actualizar el historial entre los dos jugadores de una sub-ronda pica-pica"""
+        player_id = truco_winner_id or envido_winner_id
+        if not player_id:
+            return
+
+        # En pica-pica cada jugador se enfrenta al que está sentado enfrente
+        cursor.execute(
+            """
+            SELECT opponent.player_id
+            FROM player_positions pp
+            JOIN matches m ON m.id = pp.match_id
+            JOIN player_positions opponent
+                ON opponent.match_id = pp.match_id
+                AND opponent.position = (pp.position + m.players_count / 2) % m.players_count
+            WHERE pp.match_id = ? AND pp.player_id = ?
+        """,
+            (match_id, player_id),
+        )
+        result = cursor.fetchone()
+        if result is None:
+            return
+
+        points = {player_id: 0, result[0]: 0}
+        if truco_winner_id in points:
+            points[truco_winner_id] += truco_points or 0
+        if envido_winner_id in points:
+            points[envido_winner_id] += envido_points or 0
+
+        player_points, opponent_points = points.values()
+        if player_points == opponent_points:
+            winner_id = None
+        else:
+            winner_id = max(points, key=lambda pid: points[pid])
+
+        self._update_head_to_head(cursor, "player", points, winner_id, sign)
+
+    def _update_head_to_head(
+        self,
+        cursor,
+        kind: str,
+        points: Dict[int, int],
+        winner_id: Optional[int],
+        sign: int = 1,
+    ):
+        """Sumar (o restar con sign=-1) un resultado al historial del par no ordenado"""
+        low_id, high_id = sorted(points.keys())
+        cursor.execute(
+            """
+            INSERT INTO head_to_head
+            (kind, low_id, high_id, low_wins, high_wins, draws, low_points, high_points)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT (kind, low_id, high_id) DO UPDATE SET
+                low_wins = low_wins + excluded.low_wins,
+                high_wins = high_wins + excluded.high_wins,
+                draws = draws + excluded.draws,
+                low_points = low_points + excluded.low_points,
+                high_points = high_points + excluded.high_points
+        """,
+            (
+                kind,
+                low_id,
+                high_id,
+                sign * (winner_id == low_id),
+                sign * (winner_id == high_id),
+                sign * (winner_id is None),
+                sign * points[low_id],
+                sign * points[high_id],
+            ),
+        )
+
+    def get_head_to_head(self, kind: str, first_id: int, second_id: int) -> Dict:
+        """Obtener el historial entre dos equipos (kind='team') o jugadores (kind='player')"""
+        low_id, high_id = sorted((first_id, second_id))
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT low_wins, high_wins, draws, low_points, high_points
+            FROM head_to_head
+            WHERE kind = ? AND low_id = ? AND high_id = ?
+        """,
+            (kind, low_id, high_id),
+        )
+        row = cursor.fetchone()
+        low_wins, high_wins, draws, low_points, high_points = row or (0, 0, 0, 0, 0)
+
+        if first_id == low_id:
+            wins, losses, points_for, points_against = (
+                low_wins,
+                high_wins,
+                low_points,
+                high_points,
+            )
+        else:
+            wins, losses, points_for, points_against = (
+                high_wins,
+                low_wins,
+                high_points,
+                low_points,
+            )
+
+        return {
+            "played": wins + losses + draws,
+            "wins": wins,
+            "losses": losses,
+            "draws": draws,
+            "points_for": points_for,
+            "points_against": points_against,
+        }
+
+    def add_archived_results(self, match_ids: List[int]):
+        """Sumar al ranking e historiales de esta base (un archivo) las partidas recién
+        archivadas, cuyos resultados y rondas ya se copiaron"""
+        cursor = self.conn.cursor()
+        for match_id in match_ids:
+            self._apply_stored_result(cursor, match_id)
+
+        placeholders = ",".join("?" for _ in match_ids)
+        cursor.execute(
+            f"""
+            SELECT r.match_id, ps.truco_winner_id, ps.truco_points,
+                   ps.envido_winner_id, ps.envido_points
+            FROM pica_pica_scores ps
+            JOIN rounds r ON ps.round_id = r.id
+            WHERE r.match_id IN ({placeholders})
+        """,
+            match_ids,
+        )
+        for row in cursor.fetchall():
+            self._record_duel(cursor, *row)
+
+        self._commit()
+
+    def rebuild_match_results(self):
+        """Recalcular totales, resultados e historiales a partir de todas las partidas guardadas.
+
+        Las partidas movidas a bases de archivo ya no están acá: el ranking y los
+        historiales les vuelven a sumar los de cada archivo, así que sin alguno de
+        ellos la reconstrucción se niega a borrar ese historial.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT path FROM archive_databases ORDER BY path")
+        archives = [path for (path,) in cursor.fetchall()]
+        missing = [path for path in archives if not os.path.exists(path)]
+        if missing:
+            raise ValueError(
+                "No se encuentran las bases de archivo " + ", ".join(missing)
+                + ": reconstruir sin ellas borraría sus partidas del ranking"
+            )
+        for index, path in enumerate(archives):
+            cursor.execute(f"ATTACH DATABASE ? AS archive_{index}", (path,))
+        try:
+            self._rebuild_match_results(cursor, len(archives))
+        finally:
+            for index in range(len(archives)):
+                cursor.execute(f"DETACH DATABASE archive_{index}")
+
+    def _rebuild_match_results(self, cursor, archives_count: int):
+        """Reconstrucción con los archivos ya adjuntos como archive_0, archive_1, ..."""
+        self.rebuild_match_scores()
+        cursor.execute("DELETE FROM head_to_head")
+        cursor.execute("DELETE FROM leaderboard_stats")
+        cursor.execute("DELETE FROM match_results")
+        cursor.execute(
+            """
+            UPDATE tournament_teams
+            SET played = 0, wins = 0, losses = 0, points_for = 0, points_against = 0
+        """
+        )
+
+        cursor.execute("SELECT id FROM matches WHERE status = 'terminada'")
+        for (match_id,) in cursor.fetchall():
+            self._record_match_result(cursor, match_id)
+
+        cursor.execute(
+            """
+            SELECT r.match_id, ps.truco_winner_id, ps.truco_points,
+                   ps.envido_winner_id, ps.envido_points
+            FROM pica_pica_scores ps
+            JOIN rounds r ON ps.round_id = r.id
+        """
+        )
+        for row in cursor.fetchall():
+            self._record_duel(cursor, *row)
+
+        for index in range(archives_count):
+            cursor.execute(
+                f"""
+                INSERT INTO head_to_head
+                SELECT * FROM archive_{index}.head_to_head WHERE true
+                ON CONFLICT (kind, low_id, high_id) DO UPDATE SET
+                    low_wins = low_wins + excluded.low_wins,
+                    high_wins = high_wins + excluded.high_wins,
+                    draws = draws + excluded.draws,
+                    low_points = low_points + excluded.low_points,
+                    high_points = high_points + excluded.high_points
+            """
+            )
+            cursor.execute(
+                f"""
+                INSERT INTO leaderboard_stats
+                SELECT * FROM archive_{index}.leaderboard_stats WHERE true
+                ON CONFLICT (kind, players_count, day, entity_id) DO UPDATE SET
+                    played = played + excluded.played,
+                    wins = wins + excluded.wins,
+                    points_for = points_for + excluded.points_for,
+                    points_against = points_against + excluded.points_against
+            """
+            )
+
+        self._commit()
+
+    def _leaderboard_filters(
+        self,
+        kind: str,
+        players_counts: Optional[List[int]],
+        date_from: Optional[str],
+        date_to: Optional[str],
+    ) -> tuple[str, list]:
+        """Armar la condición WHERE del ranking"""
+        conditions = ["s.kind = ?"]
+        params = [kind]
+        if players_counts:
+            placeholders = ",".join(["?" for _ in players_counts])
+            conditions.append(f"s.players_count IN ({placeholders})")
+            params.extend(players_counts)
+        if date_from:
+            conditions.append("s.day >= ?")
+            params.append(date_from)
+        if date_to:
+            conditions.append("s.day <= ?")
+            params.append(date_to)
+        return " AND ".join(conditions), params
+
+    def get_leaderboard(
+        self,
+        kind: str = "player",
+        players_counts: Optional[List[int]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+        order_by: str = "wins",
+        limit: int = 20,
+        offset: int = 0,
+    ) -> List[Dict]:
+        """Obtener una página del ranking de jugadores (kind='player') o equipos (kind='team')"""
+        orders = {
+            "wins": "wins DESC, win_rate DESC, points_for DESC",
+            "win_rate": "win_rate DESC, wins DESC, points_for DESC",
+            "points": "points_for DESC, wins DESC, win_rate DESC",
+        }
+        if order_by not in orders:
+            raise ValueError(f"Orden de ranking desconocido: {order_by}")
+
+        where, params = self._leaderboard_filters(
+            kind, players_counts, date_from, date_to
+        )
+        if kind == "player":
+            name_join = "JOIN users n ON n.id = ranking.entity_id"
+            name_column = "n.nickname"
+        else:
+            name_join = "JOIN teams n ON n.id = ranking.entity_id"
+            name_column = "n.name"
+
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT ranking.entity_id AS id, {name_column} AS name, ranking.played,
+                   ranking.wins, ranking.played - ranking.wins AS losses,
+                   ranking.win_rate, ranking.points_for, ranking.points_against
+            FROM (
+                SELECT s.entity_id, SUM(s.played) AS played, SUM(s.wins) AS wins,
+                       CAST(SUM(s.wins) AS REAL) / SUM(s.played) AS win_rate,
+                       SUM(s.points_for) AS points_for,
+                       SUM(s.points_against) AS points_against
+                FROM leaderboard_stats s
+                WHERE {where}
+                GROUP BY s.entity_id
+                HAVING SUM(s.played) > 0
+            ) ranking
+            {name_join}
+            ORDER BY {orders[order_by]}, ranking.entity_id
+            LIMIT ? OFFSET ?
+        """,
+            params + [limit, offset],
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def count_leaderboard(
+        self,
+        kind: str = "player",
+        players_counts: Optional[List[int]] = None,
+        date_from: Optional[str] = None,
+        date_to: Optional[str] = None,
+    ) -> int:
+        """Contar las entradas del ranking para paginar"""
+        where, params = self._leaderboard_filters(
+            kind, players_counts, date_from, date_to
+        )
+        cursor = self.conn.cursor()
+        cursor.execute(
+            f"""
+            SELECT COUNT(*) FROM (
+                SELECT s.entity_id
+                FROM leaderboard_stats s
+                WHERE {where}
+                GROUP BY s.entity_id
+                HAVING SUM(s.played) > 0
+            )
+        """,
+            params,
+        )
+        return cursor.fetchone()[0]
+
+    def create_tournament(
+        self,
+        name: str,
+        tournament_format: str,
+        players_count: int,
+        pica_pica_end_points: int,
+        team_ids: List[int],
+        rounds_count: Optional[int] = None,
+    ) -> int:
+        """Crear un torneo (team_ids en orden de siembra) con todas las partidas de la primera ronda"""
+        if tournament_format not in TOURNAMENT_FORMATS:
+            raise ValueError(f"Formato de torneo desconocido: {tournament_format}")
+        if len(set(team_ids)) != len(team_ids) or len(team_ids) < 2:
+            raise ValueError("El torneo necesita al menos 2 equipos distintos")
+
+        if tournament_format == "single_elimination":
+            rounds_count = elimination_rounds(len(team_ids))
+        elif tournament_format == "round_robin":
+            rounds_count = round_robin_rounds(len(team_ids))
+        else:
+            # Más rondas que en un todos contra todos obligaría a repetir cruces
+            rounds_count = min(
+                rounds_count or swiss_rounds(len(team_ids)),
+                round_robin_rounds(len(team_ids)),
+            )
+
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            INSERT INTO tournaments
+            (name, format, players_count, pica_pica_end_points, rounds_count)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            (name, tournament_format, players_count, pica_pica_end_points, rounds_count),
+        )
+        tournament_id = cursor.lastrowid
+        cursor.executemany(
+            "INSERT INTO tournament_teams (tournament_id, team_id, seed) VALUES (?, ?, ?)",
+            [(tournament_id, team_id, seed) for seed, team_id in enumerate(team_ids, start=1)],
+        )
+
+        # Todas las partidas de la ronda se crean en la misma transacción que el torneo
+        self._schedule_tournament_round(cursor, tournament_id)
+        self._commit()
+        return tournament_id
+
+    def _schedule_tournament_round(self, cursor, tournament_id: int):
+        """Generar la ronda siguiente del torneo, o cerrarlo si ya se jugaron todas"""
+        cursor.execute("SELECT * FROM tournaments WHERE id = ?", (tournament_id,))
+        tournament = cursor.fetchone()
+        round_number = tournament["current_round"] + 1
+
+        if tournament["format"] == "single_elimination":
+            if round_number == 1:
+                pairings = single_elimination_first_round(
+                    self._tournament_seeds(cursor, tournament_id)
+                )
+            else:
+                winners = self._tournament_round_winners(cursor, tournament, round_number - 1)
+                if round_number > tournament["rounds_count"]:
+                    self._finish_tournament(cursor, tournament_id, winners[0])
+                    return
+                pairings = next_elimination_round(winners)
+        elif round_number > tournament["rounds_count"]:
+            standings = self.get_tournament_standings(tournament_id)
+            self._finish_tournament(cursor, tournament_id, standings[0]["team_id"])
+            return
+        elif tournament["format"] == "round_robin":
+            pairings = round_robin_round(
+                self._tournament_seeds(cursor, tournament_id), round_number
+            )
+        else:
+            # Tabla, rivales y byes salen de los acumulados, sin recorrer las partidas
+            standings = self.get_tournament_standings(tournament_id)
+            cursor.execute(
+                "SELECT team_id, opponent_id FROM tournament_opponents WHERE tournament_id = ?",
+                (tournament_id,),
+            )
+            opponents = {}
+            for team_id, opponent_id in cursor.fetchall():
+                opponents.setdefault(team_id, set()).add(opponent_id)
+            pairings = swiss_pairings(
+                [row["team_id"] for row in standings],
+                {row["team_id"]: row["score"] for row in standings},
+                opponents,
+                {row["team_id"] for row in standings if row["byes"]},
+            )
+
+        self._create_tournament_matches(cursor, tournament, round_number, pairings)
+        cursor.execute(
+            "UPDATE tournaments SET current_round = ? WHERE id = ?",
+            (round_number, tournament_id),
+        )
+
+    def _tournament_seeds(self, cursor, tournament_id: int) -> List[int]:
+        """Equipos del torneo en orden de siembra"""
+        cursor.execute(
+            "SELECT team_id FROM tournament_teams WHERE tournament_id = ? ORDER BY seed",
+            (tournament_id,),
+        )
+        return [row[0] for row in cursor.fetchall()]
+
+    def _tournament_round_winners(self, cursor, tournament, round_number: int) -> List[Optional[int]]:
+        """Ganador de cada llave de una ronda del cuadro (None si la llave quedó vacía)"""
+        cursor.execute(
+            """
+            SELECT tm.slot, COALESCE(tm.bye_team_id, mr.winner_team_id)
+            FROM tournament_matches tm
+            LEFT JOIN match_results mr ON mr.match_id = tm.match_id
+            WHERE tm.tournament_id = ? AND tm.round_number = ?
+        """,
+            (tournament["id"], round_number),
+        )
+        by_slot = dict(cursor.fetchall())
+        slots = 2 ** (tournament["rounds_count"] - round_number)
+        return [by_slot.get(slot) for slot in range(slots)]
+
+    def _create_tournament_matches(self, cursor, tournament, round_number: int, pairings):
+        """Crear de una vez las partidas de una ronda con sus equipos, asientos y pie inicial"""
+        team_ids = [team_id for pairing in pairings for team_id in pairing if team_id is not None]
+        placeholders = ",".join("?" for _ in team_ids)
+        cursor.execute(
+            f"""
+            SELECT team_id, player_id FROM team_members
+            WHERE team_id IN ({placeholders})
+            ORDER BY team_id, player_id
+        """,
+            team_ids,
+        )
+        members = {}
+        for team_id, player_id in cursor.fetchall():
+            members.setdefault(team_id, []).append(player_id)
+        cursor.execute(f"SELECT id, name FROM teams WHERE id IN ({placeholders})", team_ids)
+        names = dict(cursor.fetchall())
+
+        players_per_team = tournament["players_count"] // 2
+        slots, match_teams, positions, opponents, byes = [], [], [], [], []
+        for slot, (first, second) in enumerate(pairings):
+            if first is None:
+                continue
+            if second is None:
+                slots.append((tournament["id"], round_number, slot, None, first))
+                byes.append((tournament["id"], first))
+                continue
+
+            for team_id in (first, second):
+                if len(members.get(team_id, [])) != players_per_team:
+                    raise ValueError(
+                        f"El equipo {names.get(team_id, team_id)} no tiene "
+                        f"{players_per_team} jugadores"
+                    )
+
+            # Asientos alternando equipos, como en una partida creada a mano
+            seats = [player for pair in zip(members[first], members[second]) for player in pair]
+            cursor.execute(
+                """
+                INSERT INTO matches (name, players_count, pica_pica_end_points, starting_dealer_id)
+                VALUES (?, ?, ?, ?)
+            """,
+                (
+                    f"{tournament['name']} R{round_number}: {names[first]} vs {names[second]}",
+                    tournament["players_count"],
+                    tournament["pica_pica_end_points"],
+                    random.choice(seats),
+                ),
+            )
+            match_id = cursor.lastrowid
+            match_teams += [(match_id, first), (match_id, second)]
+            opponents += [
+                (tournament["id"], first, second),
+                (tournament["id"], second, first),
+            ]
+            positions += [(match_id, player_id, i) for i, player_id in enumerate(seats)]
+            slots.append((tournament["id"], round_number, slot, match_id, None))
+
+        cursor.executemany(
+            "INSERT INTO match_teams (match_id, team_id) VALUES (?, ?)", match_teams
+        )
+        cursor.executemany(
+            "INSERT INTO player_positions (match_id, player_id, position) VALUES (?, ?, ?)",
+            positions,
+        )
+        cursor.executemany(
+            """
+            INSERT INTO tournament_matches
+            (tournament_id, round_number, slot, match_id, bye_team_id)
+            VALUES (?, ?, ?, ?, ?)
+        """,
+            slots,
+        )
+        cursor.executemany(
+            """
+            INSERT OR IGNORE INTO tournament_opponents (tournament_id, team_id, opponent_id)
+            VALUES (?, ?, ?)
+        """,
+            opponents,
+        )
+        cursor.executemany(
+            "UPDATE tournament_teams SET byes = byes + 1 WHERE tournament_id = ? AND team_id = ?",
+            byes,
+        )
+
+    def _finish_tournament(self, cursor, tournament_id: int, winner_team_id: Optional[int]):
+        cursor.execute(
+            "UPDATE tournaments SET status = 'terminado', winner_team_id = ? WHERE id = ?",
+            (winner_team_id, tournament_id),
+        )
+
+    def _advance_tournament(self, cursor, tournament_id: int, round_number: int):
+        """Si la ronda actual del torneo terminó, generar la siguiente"""
+        cursor.execute(
+            "SELECT format, current_round, status FROM tournaments WHERE id = ?",
+            (tournament_id,),
+        )
+        tournament = cursor.fetchone()
+        if (
+            tournament is None
+            or tournament["status"] != "en_progreso"
+            or tournament["current_round"] != round_number
+        ):
+            return
+
+        cursor.execute(
+            """
+            SELECT COUNT(*)
+            FROM tournament_matches tm
+            JOIN matches m ON m.id = tm.match_id
+            WHERE tm.tournament_id = ? AND tm.round_number = ? AND m.status != 'terminada'
+        """,
+            (tournament_id, round_number),
+        )
+        if cursor.fetchone()[0]:
+            return
+
+        if tournament["format"] == "single_elimination":
+            cursor.execute(
+                """
+                UPDATE tournament_teams SET eliminated = 1
+                WHERE tournament_id = ? AND team_id IN (
+                    SELECT mr.loser_team_id
+                    FROM tournament_matches tm
+                    JOIN match_results mr ON mr.match_id = tm.match_id
+                    WHERE tm.tournament_id = ? AND tm.round_number = ?
+                )
+            """,
+                (tournament_id, tournament_id, round_number),
+            )
+        self._schedule_tournament_round(cursor, tournament_id)
+
+    def _tournament_match(self, cursor, match_id: int) -> Optional[sqlite3.Row]:
+        """Torneo y ronda a los que pertenece una partida (None si no es de torneo)"""
+        cursor.execute(
+            "SELECT tournament_id, round_number FROM tournament_matches WHERE match_id = ?",
+            (match_id,),
+        )
+        return cursor.fetchone()
+
+    def _update_tournament_standings(
+        self,
+        cursor,
+        match_id: int,
+        winner_id: int,
+        loser_id: int,
+        winner_points: int,
+        loser_points: int,
+        sign: int = 1,
+    ):
+        """Sumar (o restar con sign=-1) el resultado de una partida de torneo a la tabla"""
+        cursor.execute(
+            """
+            UPDATE tournament_teams SET
+                played = played + :sign,
+                wins = wins + :sign * (team_id = :winner),
+                losses = losses + :sign * (team_id = :loser),
+                points_for = points_for + :sign * CASE WHEN team_id = :winner
+                    THEN :winner_points ELSE :loser_points END,
+                points_against = points_against + :sign * CASE WHEN team_id = :winner
+                    THEN :loser_points ELSE :winner_points END
+            WHERE team_id IN (:winner, :loser) AND tournament_id = (
+                SELECT tournament_id FROM tournament_matches WHERE match_id = :match_id
+            )
+        """,
+            {
+                "sign": sign,
+                "winner": winner_id,
+                "loser": loser_id,
+                "winner_points": winner_points,
+                "loser_points": loser_points,
+                "match_id": match_id,
+            },
+        )
+
+    def get_tournaments(self) -> List[Dict]:
+        """Obtener los torneos, los más nuevos primero"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT t.*, w.name AS winner_name,
+                   (SELECT COUNT(*) FROM tournament_teams tt WHERE tt.tournament_id = t.id)
+                       AS teams_count
+            FROM tournaments t
+            LEFT JOIN teams w ON w.id = t.winner_team_id
+            ORDER BY t.created_at DESC, t.id DESC
+        """
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_tournament_standings(self, tournament_id: int) -> List[Dict]:
+        """Tabla de posiciones del torneo (leída de los acumulados, sin recorrer partidas)"""
+        cursor = self.conn.cursor()
+        # Buchholz: suma de los puntajes de los rivales enfrentados
+        cursor.execute(
+            """
+            SELECT tt.team_id, t.name, tt.seed, tt.played, tt.wins, tt.losses, tt.byes,
+                   tt.wins + tt.byes AS score,
+                   COALESCE(b.buchholz, 0) AS buchholz,
+                   tt.points_for, tt.points_against,
+                   tt.points_for - tt.points_against AS point_diff,
+                   tt.eliminated
+            FROM tournament_teams tt
+            JOIN teams t ON t.id = tt.team_id
+            LEFT JOIN (
+                SELECT o.team_id, SUM(rival.wins + rival.byes) AS buchholz
+                FROM tournament_opponents o
+                JOIN tournament_teams rival
+                    ON rival.tournament_id = o.tournament_id AND rival.team_id = o.opponent_id
+                WHERE o.tournament_id = ?
+                GROUP BY o.team_id
+            ) b ON b.team_id = tt.team_id
+            WHERE tt.tournament_id = ?
+            ORDER BY tt.eliminated, score DESC, buchholz DESC, point_diff DESC,
+                     tt.points_for DESC, tt.seed
+        """,
+            (tournament_id, tournament_id),
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def get_tournament_matches(self, tournament_id: int) -> List[Dict]:
+        """Cruces del torneo por ronda con su estado y resultado"""
+        cursor = self.conn.cursor()
+        cursor.execute(
+            """
+            SELECT tm.round_number, tm.slot, tm.match_id, m.name AS match_name, m.status,
+                   bye.name AS bye_team, w.name AS winner, l.name AS loser,
+                   mr.winner_points, mr.loser_points
+            FROM tournament_matches tm
+            LEFT JOIN matches m ON m.id = tm.match_id
+            LEFT JOIN teams bye ON bye.id = tm.bye_team_id
+            LEFT JOIN match_results mr ON mr.match_id = tm.match_id
+            LEFT JOIN teams w ON w.id = mr.winner_team_id
+            LEFT JOIN teams l ON l.id = mr.loser_team_id
+            WHERE tm.tournament_id = ?
+            ORDER BY tm.round_number, tm.slot
+        """,
+            (tournament_id,),
+        )
+        return [dict(row) for row in cursor.fetchall()]
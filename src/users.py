@@ -1,7 +1,12 @@
+import math
+
 import streamlit as st
+from src.sharding import list_shards, search_players
 from src.truco import TrucoGame
 import pandas as pd
 
+PAGE_SIZE = 50
+
 
 def users_management(game: TrucoGame):
     st.header("👥 Gestión de Jugadores")
@@ -18,12 +23,41 @@ def users_management(game: TrucoGame):
             else:
                 st.error("Por favor ingrese un apodo")
 
-    # Mostrar jugadores
-    users = game.get_users()
-    if users:
+    # Mostrar jugadores (búsqueda por prefijo y paginado)
+    search = st.text_input(
+        "Buscar jugador", key="users_search", placeholder="Inicio del apodo"
+    )
+    # Con varias sedes se puede buscar el apodo en todas a la vez
+    all_shards = len(list_shards()) > 1 and st.toggle(
+        "Todas las sedes", key="users_all_shards"
+    )
+    if all_shards:
+        players = search_players(search, PAGE_SIZE)
+        if players:
+            st.subheader("Jugadores Registrados")
+            df = pd.DataFrame(
+                [(player["nickname"], ", ".join(player["shards"])) for player in players],
+                columns=["Apodo", "Sedes"],
+            )
+            st.dataframe(df, use_container_width=True)
+        else:
+            st.info("No se encontraron jugadores con ese apodo.")
+        return
+
+    total = game.count_users(search)
+    if total:
         st.subheader("Jugadores Registrados")
+        pages = math.ceil(total / PAGE_SIZE)
+        page = 1
+        if pages > 1:
+            page = st.number_input(
+                f"Página (de {pages})", min_value=1, max_value=pages, value=1
+            )
+        users = game.search_users(search, PAGE_SIZE, (page - 1) * PAGE_SIZE)
         df = pd.DataFrame(users)
         df.columns = ["ID", "Apodo"]
         st.dataframe(df, use_container_width=True)
+    elif search:
+        st.info("No se encontraron jugadores con ese apodo.")
     else:
         st.info("No hay jugadores registrados aún.")
@@ -0,0 +1,211 @@
+import os
+import threading
+from functools import lru_cache
+from typing import Dict, Optional
+
+import numpy as np
+
+from src.truco import TrucoGame
+from src.simulation import (
+    PICA_PICA_START_POINTS,
+    WINNING_POINTS,
+    falta_envido_redondo,
+    fit_point_distributions,
+    pica_pica_outcomes,
+    round_outcomes,
+)
+
+PLAYER_COUNTS = (2, 4, 6)
+END_POINTS = (20, 25, 30)
+ROUND_TYPES = ("redondo", "pica-pica")
+# Probabilidades guardadas como uint16 (resolución 1/65535) para que la tabla sea compacta
+SCALE = np.iinfo(np.uint16).max
+
+
+def _solve(
+    redondo: Dict[str, np.ndarray],
+    pica_pica: Dict[str, np.ndarray],
+    pica_pica_allowed: bool,
+    pica_pica_end_points: int,
+) -> np.ndarray:
+    """Resolver por programación dinámica la probabilidad de que gane el primer equipo
+
+    Devuelve un arreglo [tipo de próxima ronda, puntaje equipo 1, puntaje equipo 2].
+    Cada ronda suma al menos un punto, así que alcanza con recorrer los estados
+    de mayor a menor suma de puntajes.
+    """
+    size = WINNING_POINTS + 1
+    values = np.zeros((len(ROUND_TYPES), size, size))
+    # Como en check_match_finished, ante empate en 30 gana el primer equipo
+    values[:, WINNING_POINTS, :] = 1.0
+
+    for total in range(2 * (WINNING_POINTS - 1), -1, -1):
+        for score1 in range(max(0, total - WINNING_POINTS + 1), min(total, WINNING_POINTS - 1) + 1):
+            score2 = total - score1
+            max_score = max(score1, score2)
+
+            for round_type_index, outcomes in enumerate((redondo, pica_pica)):
+                if round_type_index == 1 and not pica_pica_allowed:
+                    continue
+                falta = falta_envido_redondo(np.array(max_score)) if round_type_index == 0 else 0
+                new1 = np.minimum(
+                    score1 + outcomes["team1"] + outcomes["falta1"] * falta, WINNING_POINTS
+                )
+                new2 = np.minimum(
+                    score2 + outcomes["team2"] + outcomes["falta2"] * falta, WINNING_POINTS
+                )
+
+                # Misma lógica que determine_round_type para la próxima ronda
+                new_max = np.maximum(new1, new2)
+                next_round = (
+                    pica_pica_allowed
+                    & (round_type_index == 0)
+                    & (new_max >= PICA_PICA_START_POINTS)
+                    & (new_max < pica_pica_end_points)
+                ).astype(np.intp)
+
+                values[round_type_index, score1, score2] = np.dot(
+                    outcomes["probability"], values[next_round, new1, new2]
+                )
+
+    return values
+
+
+def table_path(db_path: str) -> str:
+    """Archivo de la tabla de una base: cada sede ajusta la suya con sus propias rondas"""
+    return f"{db_path}-win_probability.npy"
+
+
+def _version_path(path: str) -> str:
+    """Archivo con la versión del historial con la que se generó la tabla"""
+    return f"{path}.version"
+
+
+def history_version(game: TrucoGame) -> int:
+    """Versión del historial del que se ajustan las distribuciones: partidas terminadas"""
+    return game.conn.execute("SELECT COUNT(*) FROM match_results").fetchone()[0]
+
+
+def is_table_current(game: TrucoGame, path: Optional[str] = None) -> bool:
+    """Si la tabla existe y se generó con el historial actual"""
+    path = path or table_path(game.db_path)
+    try:
+        with open(_version_path(path)) as version_file:
+            built_version = int(version_file.read())
+    except (OSError, ValueError):
+        return False
+    return os.path.exists(path) and built_version == history_version(game)
+
+
+def build_win_probability_table(game: TrucoGame, path: Optional[str] = None) -> np.ndarray:
+    """Precalcular la probabilidad de victoria de todos los estados y guardarla en disco"""
+    path = path or table_path(game.db_path)
+    # La versión se lee antes de ajustar: si se termina una partida mientras tanto, la
+    # tabla queda vieja y se vuelve a generar
+    version = history_version(game)
+    distributions = fit_point_distributions(game)
+    redondo = round_outcomes(distributions["redondo"])
+
+    size = WINNING_POINTS + 1
+    table = np.zeros(
+        (len(PLAYER_COUNTS), len(END_POINTS), len(ROUND_TYPES), size, size),
+        dtype=np.uint16,
+    )
+    for i, players_count in enumerate(PLAYER_COUNTS):
+        pica_pica = pica_pica_outcomes(distributions["pica-pica"], players_count // 2)
+        for j, end_points in enumerate(END_POINTS):
+            values = _solve(redondo, pica_pica, players_count == 6, end_points)
+            table[i, j] = np.rint(values * SCALE).astype(np.uint16)
+
+    # Escribir a un archivo temporal para no dejar una tabla a medio guardar
+    temp_path = f"{path}.tmp.npy"
+    np.save(temp_path, table)
+    os.replace(temp_path, path)
+    with open(f"{temp_path}.version", "w") as version_file:
+        version_file.write(str(version))
+    os.replace(f"{temp_path}.version", _version_path(path))
+    load_win_probability_table.cache_clear()
+    return table
+
+
+def refresh_win_probability_table(db_path: str) -> bool:
+    """Regenerar la tabla de una base si falta o hay partidas nuevas; True si la generó"""
+    game = TrucoGame(db_path, read_only=True)
+    try:
+        if is_table_current(game):
+            return False
+        build_win_probability_table(game)
+        return True
+    finally:
+        game.conn.close()
+
+
+_builds = {}
+_builds_lock = threading.Lock()
+
+
+def start_table_build(db_path: str):
+    """Generar la tabla en segundo plano (una sola generación a la vez por base)"""
+    with _builds_lock:
+        build = _builds.get(db_path)
+        if build is not None and build.is_alive():
+            return
+        _builds[db_path] = threading.Thread(
+            target=refresh_win_probability_table,
+            args=(db_path,),
+            name="truco-win-probability",
+            daemon=True,
+        )
+        _builds[db_path].start()
+
+
+@lru_cache(maxsize=None)
+def load_win_probability_table(path: str) -> np.ndarray:
+    """Abrir la tabla de probabilidades como memory-map (solo lectura)"""
+    return np.load(path, mmap_mode="r")
+
+
+def get_win_probability_table(game: TrucoGame) -> Optional[np.ndarray]:
+    """Obtener la tabla de probabilidades de la base del juego.
+
+    Nunca la genera mientras se anota: si todavía no existe la pide en segundo plano
+    y devuelve None. La primera consulta del proceso también la regenera en segundo
+    plano si quedó vieja, y después lo hace el mantenimiento.
+    """
+    path = table_path(game.db_path)
+    if game.db_path not in _builds or not os.path.exists(path):
+        start_table_build(game.db_path)
+    if not os.path.exists(path):
+        return None
+    return load_win_probability_table(path)
+
+
+def lookup_win_probability(
+    table: Optional[np.ndarray],
+    team_scores: Dict[int, int],
+    round_type: str,
+    players_count: int,
+    pica_pica_end_points: int,
+    pica_pica_enabled: bool = True,
+) -> Optional[Dict[int, float]]:
+    """Consultar en O(1) la probabilidad de victoria de cada equipo"""
+    if table is None or len(team_scores) != 2 or pica_pica_end_points not in END_POINTS:
+        return None
+    if players_count == 6 and not pica_pica_enabled:
+        # Sin pica-pica un juego de 6 se comporta igual que uno de 4
+        players_count = 4
+    if players_count not in PLAYER_COUNTS:
+        return None
+
+    team_ids = list(team_scores.keys())
+    score1 = min(team_scores[team_ids[0]], WINNING_POINTS)
+    score2 = min(team_scores[team_ids[1]], WINNING_POINTS)
+    probability = table[
+        PLAYER_COUNTS.index(players_count),
+        END_POINTS.index(pica_pica_end_points),
+        ROUND_TYPES.index(round_type),
+        score1,
+        score2,
+    ] / SCALE
+
+    return {team_ids[0]: float(probability), team_ids[1]: float(1 - probability)}
@@ -0,0 +1,191 @@
+import os
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+from src.db_connection import DB_PATH
+from src.metrics import Histogram
+from src.truco import TrucoGame
+
+# Escritor único con commit agrupado (TRUCO_GROUP_COMMIT=0 lo desactiva)
+ENABLED = os.environ.get("TRUCO_GROUP_COMMIT", "1") != "0"
+# Tiempo que se espera a que lleguen más operaciones antes de confirmar el lote
+GROUP_COMMIT_MS = 5
+MAX_BATCH = 64
+# Tiempo máximo que una sesión espera a que se confirme su escritura
+WRITE_TIMEOUT_SECONDS = 30
+
+# Métodos de TrucoGame que escriben y por lo tanto pasan por el escritor
+WRITE_METHODS = frozenset(
+    {
+        "add_user",
+        "create_match",
+        "add_round",
+        "add_pica_pica_score",
+        "add_redondo_score",
+        "delete_redondo_scores",
+        "delete_round",
+        "create_team",
+        "get_or_create_team",
+        "assign_teams_to_match",
+        "delete_match",
+        "finish_match",
+        "create_tournament",
+        "submit_round",
+        "edit_round",
+    }
+)
+
+BATCH_SIZE = Histogram(
+    "truco_writer_batch_size",
+    "Operaciones confirmadas en cada transacción del escritor.",
+    buckets=(1, 2, 4, 8, 16, 32, 64),
+)
+
+
+class WriterThread:
+    """Hilo dueño de la única conexión que escribe; agrupa operaciones en una transacción"""
+
+    def __init__(self, db_path: str = DB_PATH):
+        self.db_path = db_path
+        self._queue = queue.Queue()
+        self._thread = threading.Thread(target=self._loop, name="truco-writer", daemon=True)
+        self._thread.start()
+
+    def submit(self, method: str, *args, **kwargs) -> Future:
+        """Encolar una operación de escritura; el futuro se resuelve al confirmarse"""
+        if method not in WRITE_METHODS:
+            raise ValueError(f"{method} no es una operación de escritura")
+        future = Future()
+        self._queue.put((future, method, args, kwargs))
+        return future
+
+    def stop(self):
+        self._queue.put(None)
+        self._thread.join()
+
+    def _next_batch(self) -> list:
+        """Esperar una operación y juntar las que lleguen dentro de la ventana"""
+        first = self._queue.get()
+        if first is None:
+            return None
+        batch = [first]
+        deadline = time.monotonic() + GROUP_COMMIT_MS / 1000
+        while len(batch) < MAX_BATCH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            if item is None:
+                self._queue.put(None)  # terminar después de este lote
+                break
+            batch.append(item)
+        return batch
+
+    def _loop(self):
+        game = TrucoGame(self.db_path)
+        game.defer_commit = True
+        conn = game.conn
+
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+
+            try:
+                results = self._apply_batch(game, batch)
+            except Exception as error:
+                # Cualquier falla fuera de una operación (BEGIN, savepoints, commit)
+                # deshace el lote entero y se la entrega a todos los que esperan
+                if conn.in_transaction:
+                    conn.rollback()
+                del game.pending_metrics[:]
+                for future, *_ in batch:
+                    future.set_exception(error)
+                continue
+
+            # Los llamadores se enteran recién cuando los datos están confirmados
+            for future, result, error in results:
+                if error is not None:
+                    future.set_exception(error)
+                else:
+                    future.set_result(result)
+
+        game.conn.close()
+
+    def _apply_batch(self, game: TrucoGame, batch: list) -> list:
+        """Ejecutar y confirmar un lote; devuelve (futuro, resultado, error) por operación"""
+        conn = game.conn
+        results = []
+        conn.execute("BEGIN IMMEDIATE")
+        for future, method, args, kwargs in batch:
+            # Cada operación en su savepoint: si falla, sólo se deshace ella (y sus métricas)
+            conn.execute("SAVEPOINT operation")
+            metrics_mark = len(game.pending_metrics)
+            try:
+                result = getattr(game, method)(*args, **kwargs)
+            except Exception as error:
+                conn.execute("ROLLBACK TO operation")
+                conn.execute("RELEASE operation")
+                del game.pending_metrics[metrics_mark:]
+                results.append((future, None, error))
+                continue
+            conn.execute("RELEASE operation")
+            results.append((future, result, None))
+
+        # Lo último que puede fallar es el commit: si falla algo, nada quedó confirmado
+        BATCH_SIZE.observe(len(batch))
+        conn.commit()
+        # Los contadores de rondas y puntos sólo cuentan lo que quedó en la base
+        game.flush_metrics()
+        return results
+
+
+class QueuedTrucoGame:
+    """TrucoGame que lee con su propia conexión y escribe a través del escritor único"""
+
+    def __init__(self, db_path: str = DB_PATH, writer: WriterThread = None, on_write=None):
+        self._game = TrucoGame(db_path)
+        self._writer = writer or get_writer(db_path)
+        # Se llama después de cada escritura confirmada, como TrucoGame.on_write
+        self.on_write = on_write
+
+    def __getattr__(self, name):
+        if name in WRITE_METHODS:
+            def write(*args, **kwargs):
+                future = self._writer.submit(name, *args, **kwargs)
+                result = future.result(timeout=WRITE_TIMEOUT_SECONDS)
+                if self.on_write is not None:
+                    self.on_write()
+                return result
+
+            return write
+        return getattr(self._game, name)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def get_writer(db_path: str = DB_PATH) -> WriterThread:
+    """Obtener el escritor de una base (uno por archivo y por proceso)"""
+    with _writers_lock:
+        if db_path not in _writers:
+            _writers[db_path] = WriterThread(db_path)
+        return _writers[db_path]
+
+
+def open_game(db_path: str = DB_PATH, on_write=None):
+    """Abrir la base para una sesión, usando el escritor agrupado si está activo.
+
+    on_write se llama después de cada escritura confirmada de la sesión.
+    """
+    if ENABLED:
+        return QueuedTrucoGame(db_path, on_write=on_write)
+    game = TrucoGame(db_path)
+    game.on_write = on_write
+    return game